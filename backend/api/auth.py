@@ -1,11 +1,14 @@
 from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from pydantic import BaseModel, Field
+from starlette.concurrency import run_in_threadpool
 from .deps import get_auth_service, get_db
 from ..services.auth_service import AuthService
 from ..core.entities.user import User
+from ..core.exceptions import AuthenticationError, ServiceBusyError
 from ..infrastructure.db.repositories import SystemSettingsRepository
 from ..infrastructure.security.rate_limiter import limiter
+from ..config import settings as app_settings
 
 router = APIRouter()
 
@@ -28,10 +31,27 @@ class Token(BaseModel):
     access_token: str
     token_type: str
     user: UserResponse
+    refresh_token: Optional[str] = None
+    expires_in: Optional[int] = None  # Access token lifetime in seconds
+
+
+class RefreshRequest(BaseModel):
+    refresh_token: str = Field(..., max_length=100)
+
+
+class RefreshedToken(BaseModel):
+    access_token: str
+    token_type: str
+    refresh_token: str
+    expires_in: int
+
+
+def _access_token_lifetime() -> int:
+    return (app_settings.ACCESS_TOKEN_EXPIRE_MINUTES if app_settings else 60) * 60
 
 
 @router.post("/login", response_model=Token)
-def login(
+async def login(
     request: Request,
     form_data: LoginRequest,
     auth_service: AuthService = Depends(get_auth_service),
@@ -40,6 +60,10 @@ def login(
     """
     Authenticate user and return JWT token.
     Protected by rate limiting: 5 attempts per minute per IP.
+
+    ⚡ Bolt: Async so a login storm waits on the password pool, not on
+    threadpool threads every other endpoint needs. The short database steps
+    still run in the threadpool.
     """
     # Rate Limiting
     # Use client IP as the key. Fallback to 'unknown' if not present.
@@ -52,7 +76,14 @@ def login(
             detail="Too many login attempts. Please try again later."
         )
 
-    user = auth_service.authenticate_user(form_data.username, form_data.password)
+    try:
+        user = await auth_service.authenticate_user(form_data.username, form_data.password)
+    except ServiceBusyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "1"},
+        )
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -68,14 +99,16 @@ def login(
         )
     
     # Get namespace for email address
-    settings_repo = SystemSettingsRepository(db)
-    settings = settings_repo.get()
+    settings = await run_in_threadpool(SystemSettingsRepository(db).get)
     email_address = f"{user.username}@{settings.mail_namespace}"
 
     access_token = auth_service.create_token(user)
+    refresh_token = await run_in_threadpool(auth_service.create_refresh_token, user)
     return {
         "access_token": access_token,
         "token_type": "bearer",
+        "refresh_token": refresh_token,
+        "expires_in": _access_token_lifetime(),
         "user": UserResponse(
             id=user.id, 
             username=user.username, 
@@ -84,3 +117,46 @@ def login(
             is_admin=user.is_admin
         )
     }
+
+
+@router.post("/refresh", response_model=RefreshedToken)
+def refresh(
+    form_data: RefreshRequest,
+    auth_service: AuthService = Depends(get_auth_service)
+):
+    """
+    Exchange a refresh token for a new access token.
+
+    ⚡ Bolt: No bcrypt and no login rate limit: the token is checked by its
+    SHA-256 digest. Refresh tokens rotate, so the one sent here stops working
+    and the response carries its replacement. Presenting an old token again
+    revokes every token from that login.
+    """
+    try:
+        user, refresh_token = auth_service.refresh(form_data.refresh_token)
+    except AuthenticationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=str(e),
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    return {
+        "access_token": auth_service.create_token(user),
+        "token_type": "bearer",
+        "refresh_token": refresh_token,
+        "expires_in": _access_token_lifetime(),
+    }
+
+
+@router.post("/logout")
+def logout(
+    form_data: RefreshRequest,
+    auth_service: AuthService = Depends(get_auth_service)
+):
+    """
+    Revoke a refresh token and all tokens rotated from the same login.
+    Access tokens already issued stay valid until they expire.
+    """
+    auth_service.revoke_refresh_token(form_data.refresh_token)
+    return {"message": "Signed out"}
@@ -0,0 +1,39 @@
+"""
+Conditional GET (ETag / If-None-Match) for mailbox reads.
+
+ETags are weak and built from the mailbox modseq, which every email change
+and folder creation advances (see ChangeLogRepository). Checking one costs a
+primary-key read, so an unchanged resource is answered 304 before any rows
+are fetched, serialized or compressed.
+
+`private, no-cache` lets the browser keep the response but revalidate it on
+every use, which is what sends If-None-Match back.
+"""
+from typing import Optional
+from fastapi import Response
+
+CACHE_CONTROL = "private, no-cache"
+
+
+def weak_etag(*parts) -> str:
+    return 'W/"' + "-".join(str(part) for part in parts) + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison against an If-None-Match list (or `*`)."""
+    if not if_none_match:
+        return False
+    opaque = etag[2:]
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == opaque:
+            return True
+    return False
+
+
+def cache_headers(etag: str) -> dict:
+    return {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers=cache_headers(etag))
@@ -6,13 +6,15 @@ from ..infrastructure.db.session import SessionLocal
 from ..infrastructure.db.repositories import (
     UserRepository, FolderRepository, EmailRepository, SystemSettingsRepository
 )
-from ..infrastructure.smtp.smtp_client import SMTPClient
+from ..infrastructure.db.writer import WriteQueue, write_queue
+from ..infrastructure.smtp.smtp_client import SMTPClient, smtp_client
 from ..services.auth_service import AuthService
 from ..services.user_service import UserService
 from ..services.folder_service import FolderService
 from ..services.mail_service import MailService
 from ..services.system_settings_service import SystemSettingsService
 from ..infrastructure.security.jwt import decode_access_token
+from ..infrastructure.security.principal_cache import principal_cache
 from ..core.entities.user import User
 from ..config import settings
 
@@ -51,25 +53,36 @@ def get_settings_repo(db: Session = Depends(get_db)) -> SystemSettingsRepository
 
 
 # Infrastructure
+def get_writer() -> WriteQueue:
+    return write_queue
+
+
 def get_smtp_client() -> SMTPClient:
-    return SMTPClient()
+    return smtp_client
 
 
 # Services
-def get_auth_service(user_repo: UserRepository = Depends(get_user_repo)) -> AuthService:
-    return AuthService(user_repo)
+def get_auth_service(
+    user_repo: UserRepository = Depends(get_user_repo),
+    writer: WriteQueue = Depends(get_writer)
+) -> AuthService:
+    return AuthService(user_repo, writer)
 
 
 def get_user_service(
     user_repo: UserRepository = Depends(get_user_repo),
     folder_repo: FolderRepository = Depends(get_folder_repo),
-    settings_repo: SystemSettingsRepository = Depends(get_settings_repo)
+    settings_repo: SystemSettingsRepository = Depends(get_settings_repo),
+    writer: WriteQueue = Depends(get_writer)
 ) -> UserService:
-    return UserService(user_repo, folder_repo, settings_repo)
+    return UserService(user_repo, folder_repo, settings_repo, writer)
 
 
-def get_folder_service(folder_repo: FolderRepository = Depends(get_folder_repo)) -> FolderService:
-    return FolderService(folder_repo)
+def get_folder_service(
+    folder_repo: FolderRepository = Depends(get_folder_repo),
+    writer: WriteQueue = Depends(get_writer)
+) -> FolderService:
+    return FolderService(folder_repo, writer)
 
 
 def get_mail_service(
@@ -77,44 +90,63 @@ def get_mail_service(
     folder_repo: FolderRepository = Depends(get_folder_repo),
     user_repo: UserRepository = Depends(get_user_repo),
     smtp_client: SMTPClient = Depends(get_smtp_client),
-    settings_repo: SystemSettingsRepository = Depends(get_settings_repo)
+    settings_repo: SystemSettingsRepository = Depends(get_settings_repo),
+    writer: WriteQueue = Depends(get_writer)
 ) -> MailService:
-    return MailService(email_repo, folder_repo, user_repo, smtp_client, settings_repo)
+    return MailService(email_repo, folder_repo, user_repo, smtp_client, settings_repo, writer)
 
 
 def get_settings_service(
-    settings_repo: SystemSettingsRepository = Depends(get_settings_repo)
+    settings_repo: SystemSettingsRepository = Depends(get_settings_repo),
+    writer: WriteQueue = Depends(get_writer)
 ) -> SystemSettingsService:
-    return SystemSettingsService(settings_repo)
+    return SystemSettingsService(settings_repo, writer)
 
 
 # Current User
 def get_current_user(
     token: str = Depends(oauth2_scheme),
-    user_service: UserService = Depends(get_user_service)
+    db: Session = Depends(get_db)
 ) -> User:
     """
     Synchronous dependency. FastAPI runs this in threadpool.
+
+    ⚡ Bolt: Verified principals are cached by token (see principal_cache), so a
+    warm request costs a dict lookup instead of a JWT decode plus user and
+    settings queries. The session is only touched on a cache miss.
     """
-    payload = decode_access_token(token)
-    if payload is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    username: str = payload.get("sub")
-    if username is None:
-        raise HTTPException(status_code=401, detail="Invalid token")
-
-    user = user_service.get_user_by_username(username)
+    return authenticate_token(token, db)
+
+
+def authenticate_token(token: str, db: Session) -> User:
+    """Resolve a bearer token to its active user, or raise 401."""
+    users = UserRepository(db)
+    user = principal_cache.get(token, users.get_principal_version)
     if user is None:
-        raise HTTPException(status_code=401, detail="User not found")
-    
-    # Check if user is active
-    if hasattr(user, 'is_active') and not user.is_active:
-        raise HTTPException(status_code=401, detail="User account is deactivated")
-    
+        payload = decode_access_token(token)
+        if payload is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Could not validate credentials",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        username: str = payload.get("sub")
+        if username is None:
+            raise HTTPException(status_code=401, detail="Invalid token")
+
+        principal = users.get_principal(username)
+        if principal is None:
+            raise HTTPException(status_code=401, detail="User not found")
+        user, version = principal
+
+        # Check if user is active
+        if not user.is_active:
+            raise HTTPException(status_code=401, detail="User account is deactivated")
+
+        principal_cache.put(token, user, version, payload.get("exp"))
+
+    # Email address follows the current namespace (settings are cached separately)
+    user.email_address = SystemSettingsRepository(db).get().get_email_address(user.username)
     return user
 
 
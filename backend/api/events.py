@@ -0,0 +1,76 @@
+"""
+Events API
+
+Server-sent events stream of the current user's mailbox changes.
+"""
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from .deps import authenticate_token, oauth2_scheme
+from ..infrastructure.db.session import SessionLocal
+from ..infrastructure.events.bus import event_bus
+from ..config import settings
+
+router = APIRouter()
+
+HEARTBEAT_SECONDS = settings.EVENTS_HEARTBEAT_SECONDS if settings else 15.0
+
+# Clients reconnect after this many milliseconds when the stream drops
+RETRY_MS = 3000
+
+
+def _authenticate(token: str):
+    # Own short-lived session: a stream must not hold a pooled connection open
+    with SessionLocal() as db:
+        return authenticate_token(token, db)
+
+
+@router.get("/events")
+async def stream_events(request: Request, bearer: str = Depends(oauth2_scheme)):
+    """
+    Stream mailbox changes as server-sent events.
+
+    Events:
+    - `message`: a new email, with the same fields as a folder listing item
+    - `folder`: counter change, `{"folder_id", "unread", "total"}` as deltas
+    - `resync`: events were dropped (client too slow); re-fetch folders and listings
+
+    ⚡ Bolt: Replaces polling /api/folders and /api/mail/{folder_id}. An idle
+    stream costs one comment line per heartbeat, and a stream's token is
+    re-checked on every heartbeat, so deactivated users are disconnected.
+
+    🛡️ Sentinel: The token is only accepted in the Authorization header,
+    never as a query parameter, where access logs and browser history would
+    keep it. Use fetch() streaming rather than EventSource, which cannot set
+    headers.
+    """
+    user = await run_in_threadpool(_authenticate, bearer)
+
+    subscription = event_bus.subscribe(user.id)
+    if subscription is None:
+        raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail="Too many open event streams")
+
+    async def frames():
+        try:
+            yield f"retry: {RETRY_MS}\n\n"
+            while True:
+                batch = await subscription.next_frames(HEARTBEAT_SECONDS)
+                if batch:
+                    yield "".join(batch)
+                    continue
+
+                if await request.is_disconnected():
+                    break
+                try:
+                    await run_in_threadpool(_authenticate, bearer)
+                except HTTPException:
+                    break
+                yield ": ping\n\n"
+        finally:
+            event_bus.unsubscribe(subscription)
+
+    return StreamingResponse(
+        frames(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,8 +1,10 @@
-from typing import List
+from typing import List, Optional
 import re
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException
 from pydantic import BaseModel, Field, field_validator
 from .deps import get_folder_service, get_current_user
+from .serialization import json_response
+from .conditional import weak_etag, etag_matches, cache_headers, not_modified
 from ..services.folder_service import FolderService
 from ..core.entities.user import User
 from ..core.exceptions import SandeshError
@@ -16,6 +18,17 @@ class FolderResponse(BaseModel):
     id: int
     name: str
     unread_count: int = 0
+    total_count: int = 0
+
+    @staticmethod
+    def as_dict(folder) -> dict:
+        """Same fields, in the same order, as a plain dict for `json_response`."""
+        return {
+            "id": folder.id,
+            "name": folder.name,
+            "unread_count": folder.unread_count,
+            "total_count": folder.total_count,
+        }
 
 
 class FolderCreate(BaseModel):
@@ -37,14 +50,22 @@ class FolderCreate(BaseModel):
 
 @router.get("", response_model=List[FolderResponse])
 def get_folders(
+    if_none_match: Optional[str] = Header(None, max_length=1000),
     current_user: User = Depends(get_current_user),
     folder_service: FolderService = Depends(get_folder_service)
 ):
     """
     Get all folders for the current user.
+
+    ⚡ Bolt: Carries a weak ETag from the mailbox modseq; a matching
+    If-None-Match gets 304 without reading the folders.
     """
+    etag = weak_etag("m", current_user.id, folder_service.get_version(current_user.id))
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
     folders = folder_service.get_user_folders(current_user.id)
-    return [FolderResponse(id=f.id, name=f.name, unread_count=f.unread_count) for f in folders]
+    return json_response([FolderResponse.as_dict(f) for f in folders], headers=cache_headers(etag))
 
 
 @router.post("", response_model=FolderResponse)
@@ -3,18 +3,41 @@ Mail API
 
 Endpoints for email operations.
 """
-from typing import List, Optional
+from typing import List, Literal, Optional
+import hashlib
 import re
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
 from pydantic import BaseModel, Field, field_validator
 from .deps import get_mail_service, get_current_user
+from .folders import FolderResponse
+from .serialization import json_response
+from .conditional import weak_etag, etag_matches, cache_headers, not_modified
 from ..services.mail_service import MailService
 from ..core.entities.user import User
-from ..core.exceptions import EntityNotFoundError
+from ..core.entities.email import sender_name
+from ..core.exceptions import EntityNotFoundError, InvalidCursorError, SyncExpiredError, ValidationError
+from ..core.value_objects.page_cursor import PageCursor
 from ..infrastructure.security.rate_limiter import limiter
+from ..infrastructure.smtp.outbox import outbox_workers
 
 router = APIRouter()
 
+# Folder listing page size (keyset pagination)
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+# Search page size (ranked, offset pagination)
+DEFAULT_SEARCH_SIZE = 25
+MAX_SEARCH_SIZE = 100
+MAX_SEARCH_OFFSET = 1000
+
+# Ids per bulk action (one IN list each)
+MAX_BATCH_IDS = 5000
+
+# Changes per delta sync response
+DEFAULT_SYNC_SIZE = 500
+MAX_SYNC_SIZE = 5000
+
 # ⚡ Bolt: Pre-compile regex for performance
 # Used to sanitize email subjects against Header Injection (CRLF)
 SUBJECT_SANITIZER_REGEX = re.compile(r'[\r\n]')
@@ -61,6 +84,17 @@ class MoveEmailRequest(BaseModel):
     folder_id: int
 
 
+class BatchRequest(BaseModel):
+    action: Literal["move", "read", "unread", "delete"]
+    ids: List[int] = Field(..., min_length=1, max_length=MAX_BATCH_IDS, description=f"Max {MAX_BATCH_IDS} ids")
+    folder_id: Optional[int] = Field(None, description="Target folder, required for move")
+
+
+class BatchResponse(BaseModel):
+    action: str
+    updated: int
+
+
 class EmailResponse(BaseModel):
     """Email response with full sender identity."""
     id: int
@@ -127,40 +161,219 @@ class EmailListResponse(BaseModel):
             folder_id=entity.folder_id
         )
 
+    @staticmethod
+    def as_dict(entity) -> dict:
+        """Same fields, in the same order, as a plain dict for `json_response`."""
+        return {
+            "id": entity.id,
+            "sender": entity.sender,
+            "sender_display_name": entity.get_sender_name(),
+            "sender_email": entity.sender_email,
+            "subject": entity.subject or "",
+            "body": (entity.body or "")[:100],
+            "timestamp": entity.timestamp.isoformat(),
+            "is_read": entity.is_read,
+            "folder_id": entity.folder_id,
+        }
+
+    @staticmethod
+    def row_dicts(rows) -> List[dict]:
+        """
+        `as_dict` for preview rows (columns of EmailRepository._select_previews).
+        ⚡ Bolt: Unpacks rows positionally; name lookups on SQLAlchemy rows cost
+        more than building the dict itself.
+        """
+        return [
+            {
+                "id": email_id,
+                "sender": sender,
+                "sender_display_name": sender_name(sender, display_name),
+                "sender_email": sender_email,
+                "subject": subject or "",
+                "body": (body or "")[:100],
+                "timestamp": timestamp.isoformat(),
+                "is_read": is_read,
+                "folder_id": folder_id,
+            }
+            for email_id, _, folder_id, sender, display_name, sender_email, subject, body, is_read, timestamp in rows
+        ]
+
 
-@router.get("/mail/{folder_id}", response_model=List[EmailListResponse])
+class EmailPageResponse(BaseModel):
+    """
+    One page of a folder listing.
+    Pass `next_cursor` back as `cursor` to fetch the following page; it is null on the last page.
+    """
+    items: List[EmailListResponse]
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+
+
+@router.get("/mail/{folder_id}", response_model=EmailPageResponse)
 def get_mail_in_folder(
     folder_id: int,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, max_length=200),
+    include_total: bool = False,
+    if_none_match: Optional[str] = Header(None, max_length=1000),
     current_user: User = Depends(get_current_user),
     mail_service: MailService = Depends(get_mail_service)
 ):
     """
-    Get all emails in a specific folder.
+    Get one page of emails in a specific folder, newest first.
     Returns lightweight objects with truncated bodies.
+
+    Uses keyset pagination over (timestamp, id), so page latency does not
+    grow with folder size. `include_total` adds a COUNT over the folder.
+
+    ⚡ Bolt: Rows go from the query straight to dicts and one JSON encode,
+    skipping per-row models and response validation (see serialization.py).
+    A weak ETag from the mailbox modseq and the page parameters lets an
+    unchanged page answer 304 before the listing query runs.
     """
     try:
-        emails = mail_service.get_folder_emails(folder_id, current_user.id)
-        return [EmailListResponse.from_entity(e) for e in emails]
+        # Validated first: a malformed cursor is a 400, never a 304
+        after = PageCursor.decode(cursor) if cursor else None
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    page_key = hashlib.sha256(f"{folder_id}:{after}:{limit}:{include_total}".encode()).hexdigest()[:16]
+    etag = weak_etag("l", current_user.id, mail_service.get_mailbox_version(current_user.id), page_key)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    try:
+        page = mail_service.get_folder_emails_page(
+            folder_id,
+            current_user.id,
+            limit=limit,
+            cursor=cursor,
+            include_total=include_total,
+            as_rows=True
+        )
+        return json_response({
+            "items": EmailListResponse.row_dicts(page.items),
+            "next_cursor": page.next_cursor,
+            "total": page.total,
+        }, headers=cache_headers(etag))
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except EntityNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
 
+class SearchResponse(BaseModel):
+    """
+    One page of search hits, best match first.
+    Pass `next_offset` back as `offset` for the following page; it is null on the last page.
+    """
+    items: List[EmailListResponse]
+    next_offset: Optional[int] = None
+
+
+@router.get("/search", response_model=SearchResponse)
+def search_mail(
+    q: str = Query(..., min_length=1, max_length=200),
+    folder_id: Optional[int] = None,
+    limit: int = Query(DEFAULT_SEARCH_SIZE, ge=1, le=MAX_SEARCH_SIZE),
+    offset: int = Query(0, ge=0, le=MAX_SEARCH_OFFSET),
+    current_user: User = Depends(get_current_user),
+    mail_service: MailService = Depends(get_mail_service)
+):
+    """
+    Search subject, body and sender of the current user's emails.
+
+    Words are ANDed and matched case/accent-insensitively; end a word with `*`
+    for prefix matching. Other search syntax is treated as plain text.
+    Backed by the SQLite FTS5 index and ranked with bm25.
+    """
+    try:
+        page = mail_service.search_emails(
+            current_user.id, q, folder_id=folder_id, limit=limit, offset=offset, as_rows=True
+        )
+        return json_response({
+            "items": EmailListResponse.row_dicts(page.items),
+            "next_offset": page.next_offset,
+        })
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+class SyncResponse(BaseModel):
+    """
+    Mailbox changes after `since`. Pass `modseq` back as `since`; when `more`
+    is true, call again right away for the rest.
+    """
+    modseq: int
+    added: List[EmailListResponse]
+    changed: List[EmailListResponse]
+    removed: List[int]
+    folders: List[FolderResponse]
+    more: bool = False
+
+
+@router.get("/sync", response_model=SyncResponse)
+def sync_mail(
+    since: Optional[int] = Query(None, ge=0),
+    limit: int = Query(DEFAULT_SYNC_SIZE, ge=1, le=MAX_SYNC_SIZE),
+    current_user: User = Depends(get_current_user),
+    mail_service: MailService = Depends(get_mail_service)
+):
+    """
+    Delta sync: message headers added, changed (moved or read flag) and
+    removed since modseq `since`, plus current folder counters when anything
+    changed. Without `since`, returns the current modseq and folders.
+
+    ⚡ Bolt: Replaces re-downloading whole folder listings. Served from a
+    change log indexed by (user, modseq), so the cost follows the number of
+    changes rather than the mailbox size. 410 means the sync point expired.
+    """
+    try:
+        changes = mail_service.sync(current_user.id, since, limit)
+    except SyncExpiredError as e:
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail=str(e))
+    return json_response({
+        "modseq": changes.modseq,
+        "added": [EmailListResponse.as_dict(e) for e in changes.added],
+        "changed": [EmailListResponse.as_dict(e) for e in changes.changed],
+        "removed": changes.removed,
+        "folders": [FolderResponse.as_dict(f) for f in changes.folders],
+        "more": changes.more,
+    })
+
+
 @router.get("/message/{email_id}", response_model=EmailResponse)
 def get_email(
     email_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None, max_length=1000),
     current_user: User = Depends(get_current_user),
     mail_service: MailService = Depends(get_mail_service)
 ):
     """
     Get a specific email by ID and mark it as read.
     Returns full email body.
+
+    ⚡ Bolt: The weak ETag is the modseq of the email's last change (move or
+    read flag); a matching If-None-Match gets 304 without loading the body.
     """
+    version = mail_service.get_email_version(email_id, current_user.id)
+    if version is not None:
+        etag = weak_etag("e", email_id, version)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
     try:
         email = mail_service.get_email(email_id, current_user.id)
-        return EmailResponse.from_entity(email)
     except EntityNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
+    # Reading marks the email read, which gives it a new version
+    version = mail_service.get_email_version(email_id, current_user.id)
+    if version is not None:
+        response.headers.update(cache_headers(weak_etag("e", email_id, version)))
+    return EmailResponse.from_entity(email)
+
 
 @router.put("/message/{email_id}/move")
 def move_email(
@@ -179,18 +392,83 @@ def move_email(
         raise HTTPException(status_code=404, detail=str(e))
 
 
-@router.post("/mail/send")
+class OutboxStatusResponse(BaseModel):
+    """
+    Progress of a queued send: `queued`, `relaying` (handing external
+    recipients to SMTP), `sent` or `failed` (see `error`).
+    """
+    id: int
+    status: str
+    error: Optional[str] = None
+    created_at: str
+    updated_at: str
+
+    @staticmethod
+    def from_entity(entity):
+        return OutboxStatusResponse(
+            id=entity.id,
+            status=entity.status,
+            error=entity.error,
+            created_at=entity.created_at.isoformat(),
+            updated_at=entity.updated_at.isoformat()
+        )
+
+
+@router.post("/messages/batch", response_model=BatchResponse)
+def batch_messages(
+    batch: BatchRequest,
+    current_user: User = Depends(get_current_user),
+    mail_service: MailService = Depends(get_mail_service)
+):
+    """
+    Move, mark read/unread or permanently delete many emails at once.
+
+    ⚡ Bolt: Runs as a few set-based statements (`... WHERE id IN (...) AND
+    owner_id = ?`) in one transaction instead of a request per email. Ids the
+    user doesn't own are skipped; `updated` counts the emails changed.
+    """
+    try:
+        updated = mail_service.batch_update(current_user.id, batch.action, batch.ids, batch.folder_id)
+        return BatchResponse(action=batch.action, updated=updated)
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except EntityNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.post("/mail/{folder_id}/read", response_model=BatchResponse)
+def mark_folder_read(
+    folder_id: int,
+    current_user: User = Depends(get_current_user),
+    mail_service: MailService = Depends(get_mail_service)
+):
+    """Mark every email in a folder as read."""
+    try:
+        updated = mail_service.mark_folder_read(folder_id, current_user.id)
+        return BatchResponse(action="read", updated=updated)
+    except EntityNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.post("/mail/send", status_code=status.HTTP_202_ACCEPTED, response_model=OutboxStatusResponse)
 def send_mail(
     email_in: EmailSendRequest,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, max_length=200),
     current_user: User = Depends(get_current_user),
     mail_service: MailService = Depends(get_mail_service)
 ):
     """
-    Send an email to recipients.
+    Queue an email for sending; returns 202 with the outbox entry.
     
     Sender identity is automatically set from the current user's profile:
     - Display name from user settings
     - Email address derived from username@namespace
+
+    ⚡ Bolt: Only validation and one INSERT happen in the request; the send
+    itself runs on background workers. Poll the `Location` URL for progress.
+    Retrying with the same `Idempotency-Key` header returns the original
+    entry instead of sending twice.
     """
     # Rate limit: 20 emails per minute per user to prevent spam/abuse
     if not limiter.is_allowed(f"send_mail:{current_user.username}", limit=20, window_seconds=60):
@@ -200,13 +478,34 @@ def send_mail(
         )
 
     try:
-        mail_service.send_mail(
+        message, created = mail_service.queue_mail(
             sender_user=current_user,
             to=email_in.to,
             subject=email_in.subject,
             body=email_in.body,
-            cc=email_in.cc
+            cc=email_in.cc,
+            idempotency_key=idempotency_key
         )
-        return {"status": "sent"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to send mail: {str(e)}")
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if created:
+        outbox_workers.submit(message.id)
+
+    response.headers["Location"] = f"/api/mail/outbox/{message.id}"
+    return OutboxStatusResponse.from_entity(message)
+
+
+@router.get("/mail/outbox/{message_id}", response_model=OutboxStatusResponse)
+def get_outbox_status(
+    message_id: int,
+    current_user: User = Depends(get_current_user),
+    mail_service: MailService = Depends(get_mail_service)
+):
+    """
+    Delivery status of a message queued by `POST /mail/send`.
+    Finished entries are kept for a day.
+    """
+    try:
+        return OutboxStatusResponse.from_entity(mail_service.get_outbox_message(message_id, current_user.id))
+    except EntityNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
@@ -0,0 +1,30 @@
+"""
+Fast JSON responses for list endpoints.
+
+FastAPI validates a returned value against `response_model` and then encodes
+it; for a page of rows that means one Pydantic model per row, validated again.
+List endpoints instead build plain dicts straight from repository rows and
+return `json_response(...)`, which FastAPI passes through untouched (the
+`response_model` still documents the shape in OpenAPI).
+
+The bytes match FastAPI's own encoding: compact separators, UTF-8 without
+ASCII escaping. orjson is used when installed, the stdlib json otherwise.
+"""
+import json
+from typing import Any, Dict, Optional
+from fastapi import Response
+
+try:
+    import orjson
+except ImportError:  # Optional: `pip install orjson`
+    orjson = None
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def json_response(content: Any, status_code: int = 200, headers: Optional[Dict[str, str]] = None) -> Response:
+    return Response(content=dumps(content), status_code=status_code, headers=headers, media_type="application/json")
@@ -0,0 +1,212 @@
+"""
+Precompressed, in-memory serving of the built frontend.
+
+The Vite build is immutable while the server runs, so every file is read once
+at startup, compressed once (gzip, plus brotli when the module is installed)
+and answered from memory. Requests pick a variant by Accept-Encoding; the
+response already carries Content-Encoding, so GZipMiddleware passes it
+through instead of recompressing the same bundle on every page load.
+
+Bundles under `assets/` have content hashes in their names and are cached
+by the browser for a year (`immutable`). Everything else, `index.html` in
+particular, must be revalidated on use and is answered 304 when its ETag
+still matches.
+
+`.gz` / `.br` files next to a source (see `backend.tools.precompress_static`,
+run in the Docker build) are used as-is instead of compressing at startup.
+"""
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+from starlette.responses import FileResponse, Response
+from .conditional import etag_matches, weak_etag
+
+try:
+    import brotli
+except ImportError:  # Optional: `pip install brotli`
+    brotli = None
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+# Vite names bundles `<name>-<hash>.<ext>`, the hash being 8 base64url characters
+HASHED_NAME = re.compile(r"-[A-Za-z0-9_-]{8,}\.[A-Za-z0-9]+$")
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/javascript",
+    "application/json",
+    "application/manifest+json",
+    "application/wasm",
+    "application/xml",
+    "image/svg+xml",
+)
+
+# Smaller files go out as-is (the same cut-off as GZipMiddleware)
+MIN_COMPRESS_SIZE = 500
+
+# Larger files are streamed from disk instead of held in memory
+MAX_CACHED_SIZE = 8 * 1024 * 1024
+
+# Preferred first when the client weighs them equally
+ENCODINGS: Tuple[Tuple[str, str], ...] = (("br", ".br"), ("gzip", ".gz"))
+
+mimetypes.add_type("application/javascript", ".js")
+mimetypes.add_type("text/css", ".css")
+mimetypes.add_type("image/svg+xml", ".svg")
+
+
+def is_compressible(media_type: str) -> bool:
+    return media_type.startswith(COMPRESSIBLE_TYPES)
+
+
+def compress(encoding: str, data: bytes) -> Optional[bytes]:
+    """Maximum-effort compression; None when the encoder is unavailable."""
+    if encoding == "gzip":
+        # mtime=0 keeps output (and the ETag of rebuilt images) reproducible
+        return gzip.compress(data, compresslevel=9, mtime=0)
+    if encoding == "br" and brotli is not None:
+        return brotli.compress(data, quality=11)
+    return None
+
+
+def negotiate(accept_encoding: Optional[str], available) -> str:
+    """Pick the best of `available` encodings the client accepts, else identity."""
+    if not accept_encoding or not available:
+        return "identity"
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[coding.strip().lower()] = q
+    wildcard = weights.get("*", 0.0)
+    best, best_q = "identity", 0.0
+    for encoding, _ in ENCODINGS:
+        if encoding not in available:
+            continue
+        q = weights.get(encoding, wildcard)
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+@dataclass(frozen=True)
+class StaticAsset:
+    media_type: str
+    cache_control: str
+    etag: str
+    variants: Dict[str, bytes]  # encoding -> body, always including "identity"
+
+    def response(self, accept_encoding: Optional[str], if_none_match: Optional[str]) -> Response:
+        encoding = negotiate(accept_encoding, self.variants)
+        # Weak validator: every encoding of one file is the same representation
+        headers = {"ETag": self.etag, "Cache-Control": self.cache_control}
+        if len(self.variants) > 1:
+            headers["Vary"] = "Accept-Encoding"
+        if etag_matches(if_none_match, self.etag):
+            return Response(status_code=304, headers=headers)
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return Response(content=self.variants[encoding], headers=headers, media_type=self.media_type)
+
+
+class StaticAssets:
+    """The frontend build directory, loaded into memory by `load()`."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._assets: Dict[str, StaticAsset] = {}
+        self._large: Dict[str, str] = {}
+        self.sizes: Dict[str, int] = {}
+
+    def load(self) -> int:
+        assets: Dict[str, StaticAsset] = {}
+        large: Dict[str, str] = {}
+        sizes = {"identity": 0, "gzip": 0, "br": 0}
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                path = os.path.join(root, name)
+                rel = os.path.relpath(path, self.directory).replace(os.sep, "/")
+                if name.endswith((".gz", ".br")) and os.path.exists(path[:-3]):
+                    continue  # A precompressed variant, picked up with its source
+                if os.path.getsize(path) > MAX_CACHED_SIZE:
+                    large[rel] = path
+                    continue
+                asset = self._load_file(rel, path)
+                assets[rel] = asset
+                for encoding, body in asset.variants.items():
+                    sizes[encoding] += len(body)
+        self._assets, self._large, self.sizes = assets, large, sizes
+        return len(assets)
+
+    def _load_file(self, rel: str, path: str) -> StaticAsset:
+        with open(path, "rb") as f:
+            data = f.read()
+        media_type = mimetypes.guess_type(rel)[0] or "application/octet-stream"
+        cache_control = IMMUTABLE if rel.startswith("assets/") and HASHED_NAME.search(rel) else REVALIDATE
+        etag = weak_etag("s", hashlib.sha256(data).hexdigest()[:20])
+
+        variants = {"identity": data}
+        if is_compressible(media_type) and len(data) >= MIN_COMPRESS_SIZE:
+            mtime = os.path.getmtime(path)
+            for encoding, suffix in ENCODINGS:
+                prebuilt = path + suffix
+                if os.path.exists(prebuilt) and os.path.getmtime(prebuilt) >= mtime:
+                    with open(prebuilt, "rb") as f:
+                        body = f.read()
+                else:
+                    body = compress(encoding, data)
+                # Only worth sending when it actually saves bytes
+                if body is not None and len(body) < len(data):
+                    variants[encoding] = body
+        return StaticAsset(media_type=media_type, cache_control=cache_control, etag=etag, variants=variants)
+
+    def get(self, rel: str) -> Optional[StaticAsset]:
+        return self._assets.get(rel)
+
+    def response(self, rel: str, accept_encoding: Optional[str], if_none_match: Optional[str]) -> Optional[Response]:
+        asset = self._assets.get(rel)
+        if asset is not None:
+            return asset.response(accept_encoding, if_none_match)
+        path = self._large.get(rel)
+        if path is not None:
+            return FileResponse(path)
+        return None
+
+
+def precompress(directory: str) -> int:
+    """Write `.gz` / `.br` siblings for compressible files that lack fresh ones."""
+    written = 0
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if name.endswith((".gz", ".br")):
+                continue
+            path = os.path.join(root, name)
+            media_type = mimetypes.guess_type(name)[0] or ""
+            size = os.path.getsize(path)
+            if not is_compressible(media_type) or not MIN_COMPRESS_SIZE <= size <= MAX_CACHED_SIZE:
+                continue
+            with open(path, "rb") as f:
+                data = f.read()
+            mtime = os.path.getmtime(path)
+            for encoding, suffix in ENCODINGS:
+                target = path + suffix
+                if os.path.exists(target) and os.path.getmtime(target) >= mtime:
+                    continue
+                body = compress(encoding, data)
+                if body is None or len(body) >= len(data):
+                    continue
+                with open(target, "wb") as f:
+                    f.write(body)
+                written += 1
+    return written
@@ -8,11 +8,14 @@ import re
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel, Field, field_validator
 
-from .deps import get_current_admin, get_db
+from .deps import get_current_admin, get_db, get_writer
 from ..core.entities.user import User
 from ..core.exceptions import SandeshError, ValidationError
 from ..services.system_settings_service import SystemSettingsService
 from ..infrastructure.db.repositories import SystemSettingsRepository
+from ..infrastructure.smtp.smtp_server import delivery_metrics
+from ..infrastructure.db.message_cache import message_cache
+from ..infrastructure.security.password import password_hasher
 
 router = APIRouter()
 
@@ -50,8 +53,8 @@ class NamespaceChangeWarnings(BaseModel):
 
 
 # Dependency
-def get_settings_service(session=Depends(get_db)) -> SystemSettingsService:
-    return SystemSettingsService(SystemSettingsRepository(session))
+def get_settings_service(session=Depends(get_db), writer=Depends(get_writer)) -> SystemSettingsService:
+    return SystemSettingsService(SystemSettingsRepository(session), writer)
 
 
 # Endpoints
@@ -119,3 +122,33 @@ def get_namespace_change_warnings(
         new_namespace=new_namespace,
         warnings=warnings
     )
+
+
+@router.get("/smtp")
+def get_smtp_delivery_stats(admin: User = Depends(get_current_admin)):
+    """
+    SMTP delivery pool metrics (admin only).
+    `pending` is the current queue depth; `rejected_busy` counts messages
+    deferred with 451 because `max_pending` was reached.
+    """
+    return delivery_metrics.snapshot()
+
+
+@router.get("/message-cache")
+def get_message_cache_stats(admin: User = Depends(get_current_admin)):
+    """
+    Opened-message cache metrics (admin only), for tuning
+    SANDESH_MESSAGE_CACHE_BYTES: a low `hit_ratio` with many `evictions`
+    means the budget is too small for the working set.
+    """
+    return message_cache.snapshot()
+
+
+@router.get("/password-hasher")
+def get_password_hasher_stats(admin: User = Depends(get_current_admin)):
+    """
+    Password hashing pool metrics (admin only).
+    `pending` counts checks queued or running; `rejected_busy` counts logins
+    answered 503 because `max_pending` was reached.
+    """
+    return password_hasher.snapshot()
@@ -9,10 +9,10 @@ import re
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel, Field, field_validator
 
-from .deps import get_user_service, get_current_admin, get_current_user, get_db
+from .deps import get_user_service, get_current_admin, get_current_user, get_db, get_writer
 from ..services.user_service import UserService
 from ..core.entities.user import User
-from ..core.exceptions import SandeshError, ValidationError, EntityNotFoundError
+from ..core.exceptions import SandeshError, ValidationError, EntityNotFoundError, ServiceBusyError
 from ..infrastructure.db.repositories import UserRepository, FolderRepository, SystemSettingsRepository
 
 router = APIRouter()
@@ -84,11 +84,12 @@ class ProfileResponse(BaseModel):
 
 
 # Extended dependency to include settings
-def get_user_service_with_settings(session=Depends(get_db)) -> UserService:
+def get_user_service_with_settings(session=Depends(get_db), writer=Depends(get_writer)) -> UserService:
     return UserService(
         UserRepository(session),
         FolderRepository(session),
-        SystemSettingsRepository(session)
+        SystemSettingsRepository(session),
+        writer
     )
 
 
@@ -139,7 +140,7 @@ def list_users(
 
 
 @router.post("", response_model=UserResponse)
-def create_user(
+async def create_user(
     user_in: UserCreate,
     admin: User = Depends(get_current_admin),
     user_service: UserService = Depends(get_user_service_with_settings)
@@ -150,7 +151,7 @@ def create_user(
     Username becomes part of email address and cannot be changed.
     """
     try:
-        new_user = user_service.create_user(
+        new_user = await user_service.create_user(
             username=user_in.username,
             password=user_in.password,
             display_name=user_in.display_name
@@ -158,6 +159,8 @@ def create_user(
         return _to_response(new_user)
     except ValidationError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except ServiceBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     except SandeshError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
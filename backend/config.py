@@ -10,8 +10,61 @@ class Settings(BaseModel):
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 30
     DATABASE_URL: str = "sqlite:////data/sandesh.db"
 
+    # Connection pool
+    DB_POOL_SIZE: int = 5
+    DB_POOL_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+
+    # SQLite storage profile (see infrastructure/db/storage_profile.py)
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_CACHE_SIZE_KB: int = 65536
+    SQLITE_MMAP_SIZE: int = 268435456
+    SQLITE_TEMP_STORE: str = "MEMORY"
+    SQLITE_BUSY_TIMEOUT_MS: int = 30000
+
+    # Single-writer queue (see infrastructure/db/writer.py)
+    WRITER_MAX_BATCH: int = 64
+    WRITER_MAX_PENDING: int = 1000
+
+    # SMTP spool and delivery workers (see infrastructure/smtp/spool.py)
+    SMTP_SPOOL_DIR: str = ""  # Empty: "spool" next to the SQLite file
+    SMTP_SPOOL_BATCH: int = 32
+    SMTP_DELIVERY_WORKERS: int = 2
+    SMTP_MAX_PENDING: int = 10000
+    SMTP_SPOOL_WRITERS: int = 4  # Threads appending (and fsyncing) accepted mail to the spool
+    SMTP_CLIENT_POOL_SIZE: int = 4  # Outgoing sessions kept open (see infrastructure/smtp/smtp_client.py)
+
+    # Background send workers (see infrastructure/smtp/outbox.py)
+    OUTBOX_WORKERS: int = 2
+
+    # Server-sent events (see infrastructure/events/bus.py)
+    EVENTS_HEARTBEAT_SECONDS: float = 15.0
+    EVENTS_MAX_CONNECTIONS_PER_USER: int = 10
+    EVENTS_MAX_QUEUED_BYTES: int = 262144
+
+    # System settings cache (see infrastructure/db/settings_cache.py)
+    SETTINGS_CACHE_SECONDS: float = 1.0
+
+    # Authenticated principal cache (see infrastructure/security/principal_cache.py)
+    PRINCIPAL_CACHE_SIZE: int = 1024
+    PRINCIPAL_CACHE_SECONDS: float = 30.0
+    PRINCIPAL_CACHE_REVALIDATE_SECONDS: float = 1.0
+
+    # Opened-message cache (see infrastructure/db/message_cache.py)
+    MESSAGE_CACHE_BYTES: int = 33554432
+
+    # bcrypt worker processes (see infrastructure/security/password.py)
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 32
+
+    # Message body storage (see infrastructure/db/body_codec.py)
+    BODY_CODEC: str = "zlib"
+    BODY_COMPRESSION_THRESHOLD: int = 1024
+
     @classmethod
     def load_from_env(cls):
         namespace = os.getenv("SANDESH_NAMESPACE")
@@ -31,12 +84,31 @@ class Settings(BaseModel):
         if not admin_password:
             raise ValueError("SANDESH_ADMIN_PASSWORD environment variable is required")
 
+        # Storage tuning: only override defaults that are explicitly set
+        tuning = {}
+        for name in (
+            "DB_POOL_SIZE", "DB_POOL_MAX_OVERFLOW", "DB_POOL_TIMEOUT",
+            "SQLITE_JOURNAL_MODE", "SQLITE_SYNCHRONOUS", "SQLITE_CACHE_SIZE_KB",
+            "SQLITE_MMAP_SIZE", "SQLITE_TEMP_STORE", "SQLITE_BUSY_TIMEOUT_MS",
+            "WRITER_MAX_BATCH", "WRITER_MAX_PENDING", "SETTINGS_CACHE_SECONDS",
+            "SMTP_SPOOL_DIR", "SMTP_SPOOL_BATCH", "SMTP_DELIVERY_WORKERS", "SMTP_MAX_PENDING",
+            "SMTP_SPOOL_WRITERS", "SMTP_CLIENT_POOL_SIZE", "OUTBOX_WORKERS",
+            "EVENTS_HEARTBEAT_SECONDS", "EVENTS_MAX_CONNECTIONS_PER_USER", "EVENTS_MAX_QUEUED_BYTES",
+            "PRINCIPAL_CACHE_SIZE", "PRINCIPAL_CACHE_SECONDS", "PRINCIPAL_CACHE_REVALIDATE_SECONDS", "MESSAGE_CACHE_BYTES",
+            "BODY_CODEC", "BODY_COMPRESSION_THRESHOLD",
+            "PASSWORD_HASH_WORKERS", "PASSWORD_HASH_MAX_PENDING", "REFRESH_TOKEN_EXPIRE_DAYS",
+        ):
+            value = os.getenv(f"SANDESH_{name}")
+            if value is not None:
+                tuning[name] = value
+
         return cls(
             NAMESPACE=namespace,
             ADMIN_USER=admin_user,
             ADMIN_PASSWORD=admin_password,
             SECRET_KEY=secret_key,
-            DATABASE_URL=database_url
+            DATABASE_URL=database_url,
+            **tuning
         )
 
 
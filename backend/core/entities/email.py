@@ -1,6 +1,19 @@
 from dataclasses import dataclass, field
 from datetime import datetime
 from typing import List, Optional
+from .folder import Folder
+
+
+def sender_name(sender: str, sender_display_name: Optional[str]) -> str:
+    """Display name, else the name part of a stored sender string."""
+    if sender_display_name:
+        return sender_display_name
+    # Try to parse from sender field
+    if '<' in sender:
+        return sender.split('<')[0].strip()
+    if '@' in sender:
+        return sender.split('@')[0]
+    return sender
 
 
 @dataclass
@@ -43,14 +56,7 @@ class Email:
     
     def get_sender_name(self) -> str:
         """Returns just the display name or parsed name from sender."""
-        if self.sender_display_name:
-            return self.sender_display_name
-        # Try to parse from sender field
-        if '<' in self.sender:
-            return self.sender.split('<')[0].strip()
-        if '@' in self.sender:
-            return self.sender.split('@')[0]
-        return self.sender
+        return sender_name(self.sender, self.sender_display_name)
     
     def get_sender_email_only(self) -> str:
         """Returns just the email address portion."""
@@ -62,3 +68,41 @@ class Email:
             end = self.sender.index('>')
             return self.sender[start:end]
         return self.sender
+
+
+@dataclass
+class EmailPage:
+    """
+    One keyset page of a folder listing.
+    `next_cursor` is None on the last page; `total` is only filled when requested.
+    Items are Email entities, or preview rows when the caller asked for rows.
+    """
+    items: List[Email]
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+
+
+@dataclass
+class SearchPage:
+    """
+    One page of search hits, best match first.
+    `next_offset` is None on the last page.
+    Items are Email entities, or preview rows when the caller asked for rows.
+    """
+    items: List[Email]
+    next_offset: Optional[int] = None
+
+
+@dataclass
+class SyncChanges:
+    """
+    What changed in a mailbox after a client's modseq.
+    Pass `modseq` back as `since`; `more` means the next call has further changes.
+    `folders` holds current counters, filled when anything changed.
+    """
+    modseq: int
+    added: List[Email] = field(default_factory=list)
+    changed: List[Email] = field(default_factory=list)
+    removed: List[int] = field(default_factory=list)
+    folders: List[Folder] = field(default_factory=list)
+    more: bool = False
@@ -7,3 +7,5 @@ class Folder:
     name: str
     user_id: int
     unread_count: int = 0
+    total_count: int = 0
+    total_bytes: int = 0
@@ -0,0 +1,29 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List, Optional
+
+
+@dataclass
+class OutboxMessage:
+    """
+    A message accepted by the send endpoint and sent in the background.
+
+    Status moves `queued` -> `sent`, via `relaying` while recipients outside
+    the namespace are handed to SMTP. `failed` comes with an `error`.
+    """
+    QUEUED = "queued"
+    RELAYING = "relaying"
+    SENT = "sent"
+    FAILED = "failed"
+
+    id: Optional[int]
+    user_id: int
+    to: List[str]
+    subject: str
+    body: str
+    cc: List[str] = field(default_factory=list)
+    status: str = QUEUED
+    idempotency_key: Optional[str] = None
+    error: Optional[str] = None
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    updated_at: datetime = field(default_factory=datetime.utcnow)
@@ -17,6 +17,21 @@ class InvalidEmailError(DomainError):
     pass
 
 
+class InvalidCursorError(ValidationError):
+    """Malformed or tampered pagination cursor."""
+    pass
+
+
+class SyncExpiredError(SandeshError):
+    """Sync point older than the change log retains (or from another mailbox); resync fully."""
+    pass
+
+
+class ServiceBusyError(SandeshError):
+    """A bounded worker pool is at capacity; retry shortly."""
+    pass
+
+
 class EntityNotFoundError(SandeshError):
     pass
 
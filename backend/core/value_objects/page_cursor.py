@@ -0,0 +1,31 @@
+import base64
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from ..exceptions import InvalidCursorError
+
+
+@dataclass(frozen=True)
+class PageCursor:
+    """
+    Opaque keyset position for listings ordered by (timestamp DESC, id DESC).
+    Clients only ever see the encoded form and pass it back verbatim.
+    """
+    timestamp: datetime
+    id: int
+
+    def encode(self) -> str:
+        raw = json.dumps([self.timestamp.isoformat(), self.id], separators=(",", ":"))
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    @classmethod
+    def decode(cls, token: str) -> "PageCursor":
+        try:
+            padded = token + "=" * (-len(token) % 4)
+            timestamp, email_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            return cls(timestamp=datetime.fromisoformat(timestamp), id=int(email_id))
+        except (ValueError, TypeError):
+            raise InvalidCursorError("Invalid pagination cursor")
+
+    def __str__(self) -> str:
+        return self.encode()
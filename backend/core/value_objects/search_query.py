@@ -0,0 +1,39 @@
+import re
+from dataclasses import dataclass
+from typing import Tuple
+from ..exceptions import ValidationError
+
+# Words (any script) with an optional trailing `*` for prefix search
+TERM_PATTERN = re.compile(r"\w+\*?")
+MAX_TERMS = 16
+
+
+@dataclass(frozen=True)
+class SearchQuery:
+    """
+    User search text reduced to plain FTS5 terms.
+
+    Every term is quoted when rendered, so FTS5 syntax typed by the user
+    (operators, column filters, quotes) can never reach the MATCH parser.
+    Terms are ANDed; a trailing `*` keeps prefix matching.
+    """
+    terms: Tuple[str, ...]
+
+    @classmethod
+    def parse(cls, text: str) -> "SearchQuery":
+        terms = tuple(TERM_PATTERN.findall(text or ""))[:MAX_TERMS]
+        if not terms:
+            raise ValidationError("Search query must contain at least one word")
+        return cls(terms=terms)
+
+    def to_fts(self) -> str:
+        parts = []
+        for term in self.terms:
+            if term.endswith("*"):
+                parts.append(f'"{term[:-1]}"*')
+            else:
+                parts.append(f'"{term}"')
+        return " ".join(parts)
+
+    def __str__(self) -> str:
+        return self.to_fts()
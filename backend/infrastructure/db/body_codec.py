@@ -0,0 +1,74 @@
+"""
+Storage codecs for message bodies.
+
+Bodies above a size threshold are compressed with a stdlib codec before they
+reach the body store; every stored row records which codec it was written
+with, so the codec or threshold can change without rewriting old rows.
+"""
+import lzma
+import zlib
+from dataclasses import dataclass
+from typing import Optional, Tuple
+from ...config import settings
+
+RAW = "raw"
+ZLIB = "zlib"
+LZMA = "lzma"
+CODECS = (RAW, ZLIB, LZMA)
+
+
+@dataclass(frozen=True)
+class BodyCodec:
+    """
+    - codec: codec used for new bodies at or above `threshold` bytes
+    - threshold: smaller bodies are stored raw (compression would not pay off)
+    """
+    codec: str = ZLIB
+    threshold: int = 1024
+
+    def __post_init__(self):
+        if self.codec not in CODECS:
+            raise ValueError(f"Unknown body codec: {self.codec}")
+
+    @classmethod
+    def from_settings(cls, settings) -> "BodyCodec":
+        if settings is None:
+            return cls()
+        return cls(codec=settings.BODY_CODEC, threshold=settings.BODY_COMPRESSION_THRESHOLD)
+
+    def encode(self, body: str) -> Tuple[str, Optional[str], Optional[bytes]]:
+        """
+        Returns (codec, text, data): raw bodies keep `text`, compressed ones `data`.
+        Falls back to raw when compression does not actually shrink the body.
+        """
+        raw = body.encode("utf-8")
+        if self.codec == RAW or len(raw) < self.threshold:
+            return RAW, body, None
+
+        compressed = compress(self.codec, raw)
+        if len(compressed) >= len(raw):
+            return RAW, body, None
+        return self.codec, None, compressed
+
+
+def compress(codec: str, raw: bytes) -> bytes:
+    if codec == ZLIB:
+        return zlib.compress(raw, 6)
+    if codec == LZMA:
+        return lzma.compress(raw, preset=6)
+    raise ValueError(f"Cannot compress with codec: {codec}")
+
+
+def decode(codec: Optional[str], text: Optional[str], data: Optional[bytes]) -> Optional[str]:
+    """Inverse of BodyCodec.encode for a stored row."""
+    if codec in (None, RAW):
+        return text
+    if codec == ZLIB:
+        return zlib.decompress(data).decode("utf-8")
+    if codec == LZMA:
+        return lzma.decompress(data).decode("utf-8")
+    raise ValueError(f"Unknown body codec: {codec}")
+
+
+# Global instance configured from Settings
+body_codec = BodyCodec.from_settings(settings)
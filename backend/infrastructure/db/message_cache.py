@@ -0,0 +1,153 @@
+"""
+Process-wide LRU cache of opened messages, bounded by a byte budget.
+
+A message's content (sender, recipients, subject, body, timestamp) never
+changes after delivery; only its folder and read flag do. The cache holds
+just the immutable part, keyed by (owner_id, email_id). A hit still reads the
+mutable state with a narrow primary-key SELECT, so moves and flag changes
+need no invalidation and are never served stale. Deletes evict the entry,
+and a hit whose row is gone (or whose id was reused by a newer row) is
+dropped instead of served.
+
+Sizes are estimates of the Python objects held, so `max_bytes` tracks real
+memory use rather than stored bytes.
+"""
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Tuple
+from ...core.entities.email import Email
+from ...config import settings
+
+# Per-entry bookkeeping: key tuple, dict slot, dataclass and field pointers
+ENTRY_OVERHEAD = 400
+
+
+@dataclass(frozen=True)
+class CachedMessage:
+    """The immutable part of an email; folder and read flag are not kept."""
+    sender: str
+    sender_display_name: Optional[str]
+    sender_email: Optional[str]
+    recipients: Tuple[str, ...]
+    subject: Optional[str]
+    body: Optional[str]
+    timestamp: datetime
+    size: int
+
+    @classmethod
+    def from_entity(cls, email: Email) -> "CachedMessage":
+        strings = (email.sender, email.sender_display_name, email.sender_email, email.subject, email.body)
+        size = ENTRY_OVERHEAD + sum(sys.getsizeof(s) for s in strings if s is not None)
+        size += sum(sys.getsizeof(r) for r in email.recipients)
+        return cls(
+            sender=email.sender,
+            sender_display_name=email.sender_display_name,
+            sender_email=email.sender_email,
+            recipients=tuple(email.recipients),
+            subject=email.subject,
+            body=email.body,
+            timestamp=email.timestamp,
+            size=size
+        )
+
+    def to_entity(self, email_id: int, owner_id: int, folder_id: Optional[int], is_read: bool) -> Email:
+        return Email(
+            id=email_id,
+            owner_id=owner_id,
+            folder_id=folder_id,
+            sender=self.sender,
+            subject=self.subject,
+            body=self.body,
+            recipients=list(self.recipients),
+            is_read=is_read,
+            timestamp=self.timestamp,
+            sender_display_name=self.sender_display_name,
+            sender_email=self.sender_email
+        )
+
+
+class MessageCache:
+    """Thread-safe LRU evicting least recently read messages past `max_bytes`."""
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[int, int], CachedMessage]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.rejected = 0
+
+    def get(self, owner_id: int, email_id: int) -> Optional[CachedMessage]:
+        if self.max_bytes <= 0:
+            return None
+        key = (owner_id, email_id)
+        with self._lock:
+            message = self._entries.get(key)
+            if message is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return message
+
+    def put(self, owner_id: int, email_id: int, message: CachedMessage):
+        if self.max_bytes <= 0:
+            return
+        if message.size > self.max_bytes // 4:
+            # One huge message would flush most of the cache; leave it uncached
+            with self._lock:
+                self.rejected += 1
+            return
+        key = (owner_id, email_id)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.size
+            self._entries[key] = message
+            self._bytes += message.size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+                self.evictions += 1
+
+    def invalidate(self, keys: Iterable[Tuple[int, int]]):
+        """Drop (owner_id, email_id) entries, e.g. deleted emails."""
+        with self._lock:
+            for key in keys:
+                message = self._entries.pop(key, None)
+                if message is not None:
+                    self._bytes -= message.size
+                    self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "max_bytes": self.max_bytes,
+                "bytes": self._bytes,
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "rejected": self.rejected,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Global instance shared by every session in this process
+message_cache = MessageCache(max_bytes=settings.MESSAGE_CACHE_BYTES if settings else 32 * 1024 * 1024)
@@ -0,0 +1,254 @@
+"""
+Versioned schema migrations.
+
+`Base.metadata.create_all` only creates missing tables; it never adds indexes
+or columns to tables that already exist. Every schema change that must reach
+existing databases is registered here with a strictly increasing version and
+applied once at startup, in order. Applied versions are recorded in the
+`schema_migrations` table.
+
+Migrations must be idempotent (`IF NOT EXISTS`, column checks) because a fresh
+database already gets the current schema from `create_all` before they run.
+Each migration runs in its own short transaction so the write lock is held
+only while that step builds; in WAL mode readers keep working meanwhile.
+"""
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, List
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import IntegrityError
+
+logger = logging.getLogger("sandesh.migrations")
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    description: str
+    upgrade: Callable[[Connection], None]
+
+
+MIGRATIONS: List[Migration] = []
+
+
+def migration(version: int, description: str):
+    """Register a migration function."""
+    def register(fn: Callable[[Connection], None]):
+        MIGRATIONS.append(Migration(version, description, fn))
+        return fn
+    return register
+
+
+# ==========================================
+# Migrations
+# ==========================================
+
+@migration(1, "Composite listing index on emails")
+def _emails_listing_index(conn: Connection):
+    conn.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_emails_owner_folder_timestamp "
+        "ON emails (owner_id, folder_id, timestamp DESC, id DESC)"
+    )
+
+
+@migration(2, "Partial unread index on emails")
+def _emails_unread_index(conn: Connection):
+    conn.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_emails_unread "
+        "ON emails (folder_id, owner_id) WHERE is_read = 0"
+    )
+
+
+@migration(3, "Folder lookup index by user and name")
+def _folders_user_name_index(conn: Connection):
+    conn.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_folders_user_id_name ON folders (user_id, name)"
+    )
+
+
+@migration(4, "Add emails.size for folder byte counters")
+def _emails_size_column(conn: Connection):
+    columns = {row[1] for row in conn.exec_driver_sql("PRAGMA table_info(emails)")}
+    if "size" not in columns:
+        conn.exec_driver_sql("ALTER TABLE emails ADD COLUMN size INTEGER NOT NULL DEFAULT 0")
+    conn.exec_driver_sql(
+        "UPDATE emails SET size = COALESCE(length(CAST(body AS BLOB)), 0) WHERE size = 0 AND body IS NOT NULL"
+    )
+
+
+@migration(5, "Populate folder_stats counters")
+def _populate_folder_stats(conn: Connection):
+    # Table itself comes from create_all; fill it from the existing emails
+    conn.exec_driver_sql("DELETE FROM folder_stats")
+    conn.exec_driver_sql(
+        "INSERT INTO folder_stats (folder_id, user_id, unread_count, total_count, total_bytes) "
+        "SELECT f.id, f.user_id, "
+        "COALESCE(SUM(CASE WHEN e.is_read = 0 THEN 1 ELSE 0 END), 0), "
+        "COUNT(e.id), COALESCE(SUM(e.size), 0) "
+        "FROM folders f LEFT JOIN emails e ON e.folder_id = f.id AND e.owner_id = f.user_id "
+        "GROUP BY f.id"
+    )
+
+
+@migration(6, "Add emails.body_hash for the shared body store")
+def _emails_body_hash_column(conn: Connection):
+    # Existing rows keep their inline body until `backend.tools.body_store backfill` moves them
+    columns = {row[1] for row in conn.exec_driver_sql("PRAGMA table_info(emails)")}
+    if "body_hash" not in columns:
+        conn.exec_driver_sql(
+            "ALTER TABLE emails ADD COLUMN body_hash VARCHAR(64) REFERENCES message_bodies (hash)"
+        )
+    conn.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_emails_body_hash ON emails (body_hash)")
+
+
+@migration(7, "Body codecs and stored preview snippets")
+def _body_codecs_and_snippets(conn: Connection):
+    columns = {row[1] for row in conn.exec_driver_sql("PRAGMA table_info(message_bodies)")}
+    if "codec" not in columns:
+        # SQLite cannot relax NOT NULL on `body` in place, so rebuild the table
+        conn.exec_driver_sql(
+            "CREATE TABLE message_bodies_new ("
+            "hash VARCHAR(64) NOT NULL PRIMARY KEY, "
+            "codec VARCHAR NOT NULL DEFAULT 'raw', "
+            "body TEXT, "
+            "data BLOB, "
+            "size INTEGER NOT NULL DEFAULT 0, "
+            "ref_count INTEGER NOT NULL DEFAULT 0, "
+            "created_at DATETIME)"
+        )
+        conn.exec_driver_sql(
+            "INSERT INTO message_bodies_new (hash, codec, body, size, ref_count, created_at) "
+            "SELECT hash, 'raw', body, size, ref_count, created_at FROM message_bodies"
+        )
+        conn.exec_driver_sql("DROP TABLE message_bodies")
+        conn.exec_driver_sql("ALTER TABLE message_bodies_new RENAME TO message_bodies")
+
+    columns = {row[1] for row in conn.exec_driver_sql("PRAGMA table_info(emails)")}
+    if "snippet" not in columns:
+        conn.exec_driver_sql("ALTER TABLE emails ADD COLUMN snippet VARCHAR(100)")
+
+    # Every stored body is still raw at this point, so snippets can be cut in SQL
+    conn.exec_driver_sql(
+        "UPDATE emails SET snippet = COALESCE(substr(body, 1, 100), "
+        "(SELECT substr(b.body, 1, 100) FROM message_bodies b WHERE b.hash = emails.body_hash)) "
+        "WHERE snippet IS NULL"
+    )
+
+
+@migration(8, "Full-text search index over emails")
+def _emails_fts_index(conn: Connection):
+    # Late imports: the DDL and codec live with the models, not the runner
+    from .models import EMAILS_FTS_DDL
+    from .body_codec import decode
+    from .repositories import SearchIndexRepository
+
+    conn.exec_driver_sql(EMAILS_FTS_DDL)
+    conn.exec_driver_sql("INSERT INTO emails_fts (emails_fts) VALUES ('delete-all')")
+
+    # Bodies may be compressed, so they are decoded here rather than in SQL
+    last_id = 0
+    while True:
+        rows = conn.exec_driver_sql(
+            "SELECT e.id, e.subject, e.body, b.codec, b.body, b.data, "
+            "e.sender_display_name, e.sender_email, e.owner_id "
+            "FROM emails e LEFT JOIN message_bodies b ON b.hash = e.body_hash "
+            "WHERE e.id > ? ORDER BY e.id LIMIT 500",
+            (last_id,)
+        ).all()
+        if not rows:
+            break
+        conn.exec_driver_sql(
+            "INSERT INTO emails_fts (rowid, subject, body, sender_display_name, sender_email, owner) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    email_id, subject,
+                    inline_body if inline_body is not None else decode(codec, text, data),
+                    display_name, address, SearchIndexRepository.owner_tag(owner_id)
+                )
+                for email_id, subject, inline_body, codec, text, data, display_name, address, owner_id in rows
+            ]
+        )
+        last_id = rows[-1][0]
+
+
+@migration(9, "Add system_settings.version for the settings cache")
+def _system_settings_version_column(conn: Connection):
+    columns = {row[1] for row in conn.exec_driver_sql("PRAGMA table_info(system_settings)")}
+    if "version" not in columns:
+        conn.exec_driver_sql("ALTER TABLE system_settings ADD COLUMN version INTEGER NOT NULL DEFAULT 1")
+
+
+@migration(10, "Key mail_changes by (user_id, email_id)")
+def _mail_changes_owner_key(conn: Connection):
+    from .models import MailChangeModel
+
+    key = {row[1] for row in conn.exec_driver_sql("PRAGMA table_info(mail_changes)") if row[5]}
+    if "user_id" in key:
+        return
+
+    # SQLite cannot change a primary key in place: rebuild the table. The old
+    # indexes move with the renamed table, so they are dropped first.
+    conn.exec_driver_sql("DROP INDEX IF EXISTS ix_mail_changes_user_modseq")
+    conn.exec_driver_sql("DROP INDEX IF EXISTS ix_mail_changes_removed")
+    conn.exec_driver_sql("ALTER TABLE mail_changes RENAME TO mail_changes_old")
+    MailChangeModel.__table__.create(conn)
+    conn.exec_driver_sql(
+        "INSERT INTO mail_changes (user_id, email_id, modseq, created_modseq, removed, changed_at) "
+        "SELECT user_id, email_id, modseq, created_modseq, removed, changed_at FROM mail_changes_old"
+    )
+    conn.exec_driver_sql("DROP TABLE mail_changes_old")
+
+
+@migration(11, "Add users.version for the principal cache")
+def _users_version_column(conn: Connection):
+    columns = {row[1] for row in conn.exec_driver_sql("PRAGMA table_info(users)")}
+    if "version" not in columns:
+        conn.exec_driver_sql("ALTER TABLE users ADD COLUMN version INTEGER NOT NULL DEFAULT 1")
+
+
+# ==========================================
+# Runner
+# ==========================================
+
+def _ensure_version_table(engine: Engine):
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ("
+            "version INTEGER PRIMARY KEY, "
+            "description VARCHAR NOT NULL, "
+            "applied_at DATETIME NOT NULL)"
+        )
+
+
+def run_migrations(engine: Engine) -> List[int]:
+    """
+    Apply pending migrations in version order.
+    Returns the versions applied by this call.
+    """
+    _ensure_version_table(engine)
+
+    with engine.connect() as conn:
+        applied = {row[0] for row in conn.exec_driver_sql("SELECT version FROM schema_migrations")}
+
+    newly_applied = []
+    for m in sorted(MIGRATIONS, key=lambda m: m.version):
+        if m.version in applied:
+            continue
+
+        logger.info(f"Applying migration {m.version}: {m.description}")
+        try:
+            with engine.begin() as conn:
+                m.upgrade(conn)
+                conn.exec_driver_sql(
+                    "INSERT INTO schema_migrations (version, description, applied_at) VALUES (?, ?, ?)",
+                    (m.version, m.description, datetime.utcnow())
+                )
+        except IntegrityError:
+            # Another worker process recorded it first; the step itself is idempotent
+            logger.info(f"Migration {m.version} already applied by another process")
+            continue
+        newly_applied.append(m.version)
+
+    return newly_applied
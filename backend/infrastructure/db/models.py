@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, LargeBinary, Index, text, DDL, event
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import json
@@ -15,6 +15,7 @@ class SystemSettingsModel(Base):
     id = Column(Integer, primary_key=True, default=1)
     instance_name = Column(String, nullable=False, default="Sandesh")
     mail_namespace = Column(String, nullable=False, default="local")
+    version = Column(Integer, nullable=False, default=1)  # Bumped on every update; checked by settings_cache
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -40,6 +41,7 @@ class UserModel(Base):
     # Role and status
     is_admin = Column(Boolean, default=False)
     is_active = Column(Boolean, default=True)
+    version = Column(Integer, nullable=False, default=1)  # Bumped on every update; checked by principal_cache
     
     # Timestamps
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -60,6 +62,155 @@ class FolderModel(Base):
     owner = relationship("UserModel", back_populates="folders")
     emails = relationship("EmailModel", back_populates="folder_rel")
 
+    __table_args__ = (
+        # Folder list and by-name lookups (Inbox/Sent on every delivery)
+        Index("ix_folders_user_id_name", user_id, name),
+    )
+
+
+class FolderStatsModel(Base):
+    """
+    Materialized per-folder counters.
+    Maintained by EmailRepository in the same transaction as every email
+    insert, flag change and move, so the folder list is a primary-key read
+    instead of an aggregate over all of a user's emails.
+    """
+    __tablename__ = "folder_stats"
+
+    folder_id = Column(Integer, ForeignKey("folders.id"), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    unread_count = Column(Integer, nullable=False, default=0)
+    total_count = Column(Integer, nullable=False, default=0)
+    total_bytes = Column(Integer, nullable=False, default=0)
+
+
+class MailboxStateModel(Base):
+    """
+    Per-user modification sequence (modseq) for delta sync.
+    Every batch of changes to a user's emails takes the next value (a
+    transaction may take several);
+    `expunged_modseq` is the highest modseq whose removal entries were pruned,
+    so older sync points can no longer be served.
+    """
+    __tablename__ = "mailbox_state"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    modseq = Column(Integer, nullable=False, default=0)
+    expunged_modseq = Column(Integer, nullable=False, default=0)
+
+
+class MailChangeModel(Base):
+    """
+    Compact change log for delta sync: one row per user and email, overwritten
+    by each change, so it never grows beyond the mailbox plus recent removals.
+    Keyed by owner as well because email ids can be reused after a delete: a
+    reused id must not take over (or leak) another user's removal entry.
+    Maintained by EmailRepository in the same transaction as the change.
+    """
+    __tablename__ = "mail_changes"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    email_id = Column(Integer, primary_key=True)  # Not a foreign key: outlives the email as a removal
+    modseq = Column(Integer, nullable=False)
+    created_modseq = Column(Integer, nullable=False, default=0)  # 0 = inserted before the log existed
+    removed = Column(Boolean, nullable=False, default=False)
+    changed_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        # Sync: everything for a user above a modseq
+        Index("ix_mail_changes_user_modseq", user_id, modseq),
+        # Pruning old removals
+        Index("ix_mail_changes_removed", changed_at, sqlite_where=text("removed = 1")),
+    )
+
+
+class SpoolReceiptModel(Base):
+    """
+    Spooled SMTP messages already delivered, written in the delivery
+    transaction. A message whose spool file survives a crash after that
+    commit is recognised here on recovery and not delivered twice.
+    """
+    __tablename__ = "spool_receipts"
+
+    spool_id = Column(String, primary_key=True)
+    delivered_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+
+class OutboxModel(Base):
+    """
+    Messages accepted by POST /mail/send and waiting for (or done with) the
+    background send. Rows are pruned a day after they finish.
+    """
+    __tablename__ = "outbox"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    idempotency_key = Column(String, nullable=True)
+    status = Column(String, nullable=False, default="queued")
+    to_addresses = Column(Text, nullable=False)  # JSON string
+    cc_addresses = Column(Text, nullable=False, default="[]")  # JSON string
+    subject = Column(Text, nullable=False, default="")
+    body = Column(Text, nullable=False, default="")
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+    __table_args__ = (
+        # A client retrying with the same key gets the original message back
+        Index("ux_outbox_user_idempotency_key", "user_id", "idempotency_key", unique=True),
+        Index("ix_outbox_status", "status"),
+    )
+
+
+class RefreshTokenModel(Base):
+    """
+    Live refresh tokens, keyed by the SHA-256 of the opaque token (the token
+    itself is never stored). Each use rotates it: the row is replaced by a
+    new token in the same `family_id` and moved to refresh_token_revocations.
+    """
+    __tablename__ = "refresh_tokens"
+
+    token_hash = Column(String(64), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    family_id = Column(String(32), nullable=False, index=True)  # One login's rotation chain
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+
+class RefreshTokenRevocationModel(Base):
+    """
+    Refresh tokens no longer accepted: rotated, signed out, reused or the
+    user deactivated. A rotated token presented again after the grace period
+    was copied, and its whole family is revoked. Rows are pruned once the
+    token would have expired anyway.
+    """
+    __tablename__ = "refresh_token_revocations"
+
+    token_hash = Column(String(64), primary_key=True)
+    user_id = Column(Integer, nullable=False)
+    family_id = Column(String(32), nullable=False)
+    reason = Column(String(16), nullable=False)
+    revoked_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+
+class MessageBodyModel(Base):
+    """
+    Content-addressed message body store.
+    Keyed by SHA-256 of the UTF-8 body, so a fan-out delivery to N recipients
+    (plus the sender's Sent copy) stores the text once. `ref_count` tracks how
+    many email rows point at it; the row is deleted when it drops to zero.
+    """
+    __tablename__ = "message_bodies"
+
+    hash = Column(String(64), primary_key=True)
+    codec = Column(String, nullable=False, default="raw")  # see body_codec.py
+    body = Column(Text, nullable=True)  # raw codec
+    data = Column(LargeBinary, nullable=True)  # compressed codecs
+    size = Column(Integer, nullable=False, default=0)  # uncompressed UTF-8 bytes
+    ref_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
 
 class EmailModel(Base):
     """
@@ -79,9 +230,41 @@ class EmailModel(Base):
     
     recipients = Column(Text, nullable=False)  # JSON string
     subject = Column(String, nullable=True)
-    body = Column(Text, nullable=True)
+    body = Column(Text, nullable=True)  # Legacy inline body; new rows use body_hash
+    body_hash = Column(String(64), ForeignKey("message_bodies.hash"), nullable=True, index=True)
+    snippet = Column(String(100), nullable=True)  # Uncompressed preview so list views never decode bodies
+    size = Column(Integer, nullable=False, default=0)  # UTF-8 bytes of body, feeds folder_stats
     is_read = Column(Boolean, default=False)
     timestamp = Column(DateTime, default=datetime.utcnow)
 
     owner = relationship("UserModel", back_populates="emails")
     folder_rel = relationship("FolderModel", back_populates="emails")
+
+    # Keep in sync with infrastructure/db/migrations.py, which builds these on
+    # databases created before the index existed (create_all skips old tables).
+    __table_args__ = (
+        # Folder listing: equality on owner/folder, keyset order on (timestamp, id)
+        Index(
+            "ix_emails_owner_folder_timestamp",
+            owner_id, folder_id, timestamp.desc(), id.desc()
+        ),
+        # Unread counters: only unread rows are indexed, so it stays small
+        Index(
+            "ix_emails_unread",
+            folder_id, owner_id,
+            sqlite_where=text("is_read = 0")
+        ),
+    )
+
+
+# Full-text index over email content, maintained by SearchIndexRepository.
+# Contentless (content=''): bodies already live compressed in message_bodies,
+# so the index stores only tokens. rowid is the email id and `owner` holds a
+# per-user tag ("u<id>") so a MATCH never ranks other mailboxes' hits.
+# Virtual tables are not mapped, so create_all emits this DDL explicitly.
+EMAILS_FTS_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS emails_fts USING fts5("
+    "subject, body, sender_display_name, sender_email, owner, "
+    "content='', tokenize='unicode61 remove_diacritics 2')"
+)
+event.listen(Base.metadata, "after_create", DDL(EMAILS_FTS_DDL))
@@ -1,21 +1,52 @@
+import hashlib
 import json
-from typing import List, Optional
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import select, func, and_, update
-from .models import UserModel, FolderModel, EmailModel, SystemSettingsModel
+from sqlalchemy.engine import Row
+from sqlalchemy import select, func, and_, or_, update, delete, case, insert, text, table, column, event, bindparam, literal
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from .models import (
+    UserModel, FolderModel, EmailModel, SystemSettingsModel, FolderStatsModel, MessageBodyModel,
+    SpoolReceiptModel, OutboxModel, MailboxStateModel, MailChangeModel,
+    RefreshTokenModel, RefreshTokenRevocationModel
+)
 from ...core.entities.user import User, SystemSettings
 from ...core.entities.folder import Folder
 from ...core.entities.email import Email
+from ...core.entities.outbox import OutboxMessage
+from ...core.value_objects.page_cursor import PageCursor
+from ...core.value_objects.search_query import SearchQuery
+from .body_codec import BodyCodec, body_codec, decode as decode_body
+from .settings_cache import settings_cache
+from .message_cache import message_cache, CachedMessage
+from ..security.principal_cache import principal_cache
+from ..events.bus import event_bus, record_message, record_folder_delta
 
 
 class SystemSettingsRepository:
-    """Repository for system-wide settings (singleton pattern)."""
+    """
+    Repository for system-wide settings (singleton pattern).
+    Reads go through the process-wide settings_cache; see settings_cache.py.
+    """
     
     def __init__(self, session: Session):
         self.session = session
     
     def get(self) -> SystemSettings:
         """Get system settings, creating default if not exists."""
+        cached = settings_cache.get_fresh()
+        if cached is not None:
+            return cached
+
+        if settings_cache.cached_version is not None:
+            version = self.session.execute(
+                select(SystemSettingsModel.version).where(SystemSettingsModel.id == 1)
+            ).scalar()
+            cached = settings_cache.revalidate(version)
+            if cached is not None:
+                return cached
+
         result = self.session.execute(select(SystemSettingsModel).where(SystemSettingsModel.id == 1))
         model = result.scalars().first()
         
@@ -28,17 +59,25 @@ class SystemSettingsRepository:
             )
             self.session.add(model)
             self.session.flush()
+            # Not cached until committed
+            return self._to_entity(model)
         
-        return self._to_entity(model)
+        entity = self._to_entity(model)
+        settings_cache.store(entity, model.version)
+        return entity
     
     def update(self, settings: SystemSettings) -> SystemSettings:
-        """Update system settings."""
+        """Update system settings and bump the version other processes check."""
         result = self.session.execute(select(SystemSettingsModel).where(SystemSettingsModel.id == 1))
         model = result.scalars().first()
+
+        # Drop this process's cached copy once the change is committed
+        event.listen(self.session, "after_commit", lambda session: settings_cache.invalidate(), once=True)
         
         if model:
             model.instance_name = settings.instance_name
             model.mail_namespace = settings.mail_namespace
+            model.version = model.version + 1
             self.session.flush()
             return self._to_entity(model)
         else:
@@ -73,6 +112,25 @@ class UserRepository:
             return self._to_entity(model)
         return None
     
+    def get_principal(self, username: str) -> Optional[Tuple[User, int]]:
+        """A user and its `version`, read together for the principal cache."""
+        model = self.session.execute(select(UserModel).where(UserModel.username == username)).scalars().first()
+        return (self._to_entity(model), model.version) if model else None
+
+    def get_principal_version(self, user_id: int) -> Optional[int]:
+        """`version` of an active user (one primary-key read); None if unknown or deactivated."""
+        return self.session.execute(
+            select(UserModel.version).where(UserModel.id == user_id, UserModel.is_active == True)
+        ).scalar()
+
+    def get_by_usernames(self, usernames: Iterable[str]) -> Dict[str, User]:
+        """Resolve many usernames in one IN query. Unknown names are simply absent."""
+        names = list(set(usernames))
+        if not names:
+            return {}
+        result = self.session.execute(select(UserModel).where(UserModel.username.in_(names)))
+        return {m.username: self._to_entity(m) for m in result.scalars()}
+
     def get_by_id(self, user_id: int) -> Optional[User]:
         result = self.session.execute(select(UserModel).where(UserModel.id == user_id))
         model = result.scalars().first()
@@ -85,12 +143,17 @@ class UserRepository:
         models = result.scalars().all()
         return [self._to_entity(m) for m in models]
 
+    def _invalidate_principal_on_commit(self, user_id: int):
+        """Cached logins must not outlive a committed change to the user."""
+        event.listen(self.session, "after_commit", lambda session: principal_cache.invalidate_user(user_id), once=True)
+
     def save(self, user: User) -> User:
         if user.id:
             # Update existing user
             result = self.session.execute(select(UserModel).where(UserModel.id == user.id))
             model = result.scalars().first()
             if model:
+                self._invalidate_principal_on_commit(model.id)
                 # Only update mutable fields
                 model.display_name = user.display_name
                 model.signature = user.signature
@@ -99,6 +162,7 @@ class UserRepository:
                 # Password hash update only if changed
                 if user.password_hash and user.password_hash != model.password_hash:
                     model.password_hash = user.password_hash
+                model.version = model.version + 1
                 self.session.flush()
                 return self._to_entity(model)
 
@@ -121,7 +185,9 @@ class UserRepository:
         result = self.session.execute(select(UserModel).where(UserModel.id == user_id))
         model = result.scalars().first()
         if model:
+            self._invalidate_principal_on_commit(model.id)
             model.is_active = False
+            model.version = model.version + 1
             self.session.flush()
             return True
         return False
@@ -142,35 +208,180 @@ class UserRepository:
         )
 
 
-class FolderRepository:
+class FolderStatsRepository:
+    """
+    Materialized per-folder counters (unread, total, bytes).
+
+    Every method runs on the caller's session, so counter updates commit or
+    roll back together with the email change that caused them.
+    """
+
     def __init__(self, session: Session):
         self.session = session
 
-    def get_by_user_id(self, user_id: int) -> List[Folder]:
+    def apply_delta(self, folder_id: Optional[int], user_id: int, unread: int = 0, total: int = 0, size: int = 0):
+        """Add deltas to a folder's counters, creating its row on first use (single UPSERT)."""
+        if folder_id is None or not (unread or total or size):
+            return
+        record_folder_delta(self.session, user_id, folder_id, unread, total)
+
+        stmt = sqlite_insert(FolderStatsModel).values(
+            folder_id=folder_id,
+            user_id=user_id,
+            unread_count=unread,
+            total_count=total,
+            total_bytes=size
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[FolderStatsModel.folder_id],
+            set_={
+                "unread_count": FolderStatsModel.unread_count + stmt.excluded.unread_count,
+                "total_count": FolderStatsModel.total_count + stmt.excluded.total_count,
+                "total_bytes": FolderStatsModel.total_bytes + stmt.excluded.total_bytes,
+            }
+        )
+        self.session.execute(stmt)
+
+    def apply_deltas(self, deltas: Iterable[Tuple[int, int, int, int, int]]):
         """
-        Get all folders for a user with unread email counts.
-        Uses a LEFT JOIN to count unread emails efficiently in one query.
+        Batch form of apply_delta: (folder_id, user_id, unread, total, size) tuples,
+        summed per folder and written as one executemany UPSERT.
         """
+        merged: Dict[int, List[int]] = {}
+        for folder_id, user_id, unread, total, size in deltas:
+            if folder_id is None:
+                continue
+            entry = merged.setdefault(folder_id, [user_id, 0, 0, 0])
+            entry[1] += unread
+            entry[2] += total
+            entry[3] += size
+        if not merged:
+            return
+        for folder_id, (user_id, unread, total, _) in merged.items():
+            record_folder_delta(self.session, user_id, folder_id, unread, total)
+
+        stmt = sqlite_insert(FolderStatsModel)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[FolderStatsModel.folder_id],
+            set_={
+                "unread_count": FolderStatsModel.unread_count + stmt.excluded.unread_count,
+                "total_count": FolderStatsModel.total_count + stmt.excluded.total_count,
+                "total_bytes": FolderStatsModel.total_bytes + stmt.excluded.total_bytes,
+            }
+        )
+        self.session.execute(stmt, [
+            {
+                "folder_id": folder_id,
+                "user_id": user_id,
+                "unread_count": unread,
+                "total_count": total,
+                "total_bytes": size,
+            }
+            for folder_id, (user_id, unread, total, size) in merged.items()
+        ])
+
+    def get_total(self, folder_id: int, user_id: int) -> int:
+        result = self.session.execute(
+            select(FolderStatsModel.total_count)
+            .where(FolderStatsModel.folder_id == folder_id, FolderStatsModel.user_id == user_id)
+        )
+        return result.scalar() or 0
+
+    def _actual_counts(self, user_id: Optional[int] = None):
+        """Counters recomputed from the emails table (the source of truth)."""
         stmt = (
-            select(FolderModel, func.count(EmailModel.id).label("unread_count"))
+            select(
+                FolderModel.id.label("folder_id"),
+                FolderModel.user_id.label("user_id"),
+                func.coalesce(func.sum(case((EmailModel.is_read == False, 1), else_=0)), 0).label("unread_count"),
+                func.count(EmailModel.id).label("total_count"),
+                func.coalesce(func.sum(EmailModel.size), 0).label("total_bytes")
+            )
             .outerjoin(
                 EmailModel,
-                and_(
-                    EmailModel.folder_id == FolderModel.id,
-                    EmailModel.is_read == False
-                )
+                and_(EmailModel.folder_id == FolderModel.id, EmailModel.owner_id == FolderModel.user_id)
             )
-            .where(FolderModel.user_id == user_id)
             .group_by(FolderModel.id)
         )
+        if user_id is not None:
+            stmt = stmt.where(FolderModel.user_id == user_id)
+        return stmt
+
+    def find_drift(self, user_id: Optional[int] = None) -> List[Dict]:
+        """
+        Compare stored counters against a full recount.
+        Returns one entry per folder whose counters disagree (missing rows count as zero).
+        """
+        actual = self._actual_counts(user_id).subquery()
+        stmt = (
+            select(
+                actual,
+                FolderStatsModel.unread_count.label("stored_unread"),
+                FolderStatsModel.total_count.label("stored_total"),
+                FolderStatsModel.total_bytes.label("stored_bytes")
+            )
+            .outerjoin(FolderStatsModel, FolderStatsModel.folder_id == actual.c.folder_id)
+        )
+
+        drift = []
+        for row in self.session.execute(stmt):
+            stored = (row.stored_unread or 0, row.stored_total or 0, row.stored_bytes or 0)
+            expected = (row.unread_count, row.total_count, row.total_bytes)
+            if stored != expected:
+                drift.append({
+                    "folder_id": row.folder_id,
+                    "user_id": row.user_id,
+                    "stored": dict(zip(("unread", "total", "bytes"), stored)),
+                    "actual": dict(zip(("unread", "total", "bytes"), expected)),
+                })
+        return drift
+
+    def rebuild(self, user_id: Optional[int] = None) -> int:
+        """Recompute counters from scratch. Returns the number of folders written."""
+        clear = delete(FolderStatsModel)
+        if user_id is not None:
+            clear = clear.where(FolderStatsModel.user_id == user_id)
+        self.session.execute(clear)
+
+        actual = self._actual_counts(user_id)
+        result = self.session.execute(
+            insert(FolderStatsModel).from_select(
+                ["folder_id", "user_id", "unread_count", "total_count", "total_bytes"],
+                actual
+            )
+        )
+        self.session.flush()
+        return result.rowcount
+
+
+class FolderRepository:
+    def __init__(self, session: Session):
+        self.session = session
+
+    def get_by_user_id(self, user_id: int) -> List[Folder]:
+        """
+        Get all folders for a user with unread and total counts.
+        Reads the materialized folder_stats row by primary key instead of
+        aggregating over the user's emails.
+        """
+        stmt = (
+            select(
+                FolderModel,
+                FolderStatsModel.unread_count,
+                FolderStatsModel.total_count,
+                FolderStatsModel.total_bytes
+            )
+            .outerjoin(FolderStatsModel, FolderStatsModel.folder_id == FolderModel.id)
+            .where(FolderModel.user_id == user_id)
+        )
 
         result = self.session.execute(stmt)
         folders = []
-        for row in result:
-            folder_model = row[0]
-            unread_count = row[1]
+        for folder_model, unread_count, total_count, total_bytes in result:
             folder_entity = self._to_entity(folder_model)
-            folder_entity.unread_count = unread_count
+            folder_entity.unread_count = unread_count or 0
+            folder_entity.total_count = total_count or 0
+            folder_entity.total_bytes = total_bytes or 0
             folders.append(folder_entity)
 
         return folders
@@ -182,6 +393,37 @@ class FolderRepository:
         model = result.scalars().first()
         return self._to_entity(model) if model else None
 
+    def get_or_create_for_users(self, name: str, user_ids: Iterable[int]) -> Dict[int, Folder]:
+        """
+        Resolve the folder called `name` for many users in one query, creating
+        any missing ones with a single multi-row INSERT. Returns {user_id: Folder}.
+        """
+        ids = list(set(user_ids))
+        if not ids:
+            return {}
+
+        result = self.session.execute(
+            select(FolderModel)
+            .where(FolderModel.name == name, FolderModel.user_id.in_(ids))
+            .order_by(FolderModel.id)
+        )
+        folders: Dict[int, Folder] = {}
+        for model in result.scalars():
+            # Keep the oldest folder if a user somehow has duplicates
+            folders.setdefault(model.user_id, self._to_entity(model))
+
+        missing = [user_id for user_id in ids if user_id not in folders]
+        if missing:
+            created = self.session.execute(
+                insert(FolderModel).returning(FolderModel.id, FolderModel.user_id),
+                [{"name": name, "user_id": user_id} for user_id in missing]
+            )
+            for folder_id, user_id in created:
+                folders[user_id] = Folder(id=folder_id, name=name, user_id=user_id)
+            ChangeLogRepository(self.session).next_modseq(missing)
+
+        return folders
+
     def get_by_id_and_user(self, folder_id: int, user_id: int) -> Optional[Folder]:
         result = self.session.execute(
             select(FolderModel).where(FolderModel.id == folder_id, FolderModel.user_id == user_id)
@@ -196,6 +438,8 @@ class FolderRepository:
         )
         self.session.add(model)
         self.session.flush()
+        # Folder lists are versioned by the mailbox modseq (ETags, sync)
+        ChangeLogRepository(self.session).next_modseq([folder.user_id])
         return self._to_entity(model)
 
     def add_all(self, folders: List[Folder]):
@@ -210,142 +454,814 @@ class FolderRepository:
         )
 
 
+class MessageBodyRepository:
+    """
+    Content-addressed, reference-counted body store.
+
+    Email rows hold only the body hash; identical bodies (fan-out deliveries
+    and the sender's Sent copy) share one row. Large bodies are compressed by
+    `codec` on the way in and decoded only when the full body is read.
+    """
+
+    def __init__(self, session: Session, codec: BodyCodec = body_codec):
+        self.session = session
+        self.codec = codec
+
+    @staticmethod
+    def hash_body(body: str) -> str:
+        return hashlib.sha256(body.encode("utf-8")).hexdigest()
+
+    def acquire(self, body: str, refs: int = 1) -> str:
+        """Store `body` if new and add `refs` references to it. Returns its hash."""
+        body_hash = self.hash_body(body)
+        codec, text, data = self.codec.encode(body)
+        stmt = sqlite_insert(MessageBodyModel).values(
+            hash=body_hash,
+            codec=codec,
+            body=text,
+            data=data,
+            size=len(body.encode("utf-8")),
+            ref_count=refs
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[MessageBodyModel.hash],
+            set_={"ref_count": MessageBodyModel.ref_count + stmt.excluded.ref_count}
+        )
+        self.session.execute(stmt)
+        return body_hash
+
+    def release(self, body_hash: Optional[str], refs: int = 1):
+        """Drop `refs` references; the body is deleted with its last reference."""
+        if not body_hash:
+            return
+        self.session.execute(
+            update(MessageBodyModel)
+            .where(MessageBodyModel.hash == body_hash)
+            .values(ref_count=MessageBodyModel.ref_count - refs)
+        )
+        self.session.execute(
+            delete(MessageBodyModel)
+            .where(MessageBodyModel.hash == body_hash, MessageBodyModel.ref_count <= 0)
+        )
+
+    def release_many(self, refs: Dict[str, int]):
+        """Batch form of release: {hash: references to drop}, in two statements."""
+        if not refs:
+            return
+        bodies = MessageBodyModel.__table__  # Core table: a plain executemany, not ORM bulk-by-PK
+        self.session.execute(
+            update(bodies)
+            .where(bodies.c.hash == bindparam("b_hash"))
+            .values(ref_count=bodies.c.ref_count - bindparam("b_refs")),
+            [{"b_hash": body_hash, "b_refs": count} for body_hash, count in refs.items()]
+        )
+        self.session.execute(
+            delete(MessageBodyModel)
+            .where(MessageBodyModel.hash.in_(list(refs)), MessageBodyModel.ref_count <= 0)
+        )
+
+    def get(self, body_hash: str) -> Optional[str]:
+        row = self.session.execute(
+            select(MessageBodyModel.codec, MessageBodyModel.body, MessageBodyModel.data)
+            .where(MessageBodyModel.hash == body_hash)
+        ).first()
+        return decode_body(row.codec, row.body, row.data) if row else None
+
+    def collect_garbage(self) -> int:
+        """
+        Safety net for reference-count drift: recount references from the
+        emails table and delete bodies nothing points at. Returns bodies removed.
+        """
+        refs = (
+            select(func.count(EmailModel.id))
+            .where(EmailModel.body_hash == MessageBodyModel.hash)
+            .scalar_subquery()
+        )
+        self.session.execute(update(MessageBodyModel).values(ref_count=refs))
+        result = self.session.execute(delete(MessageBodyModel).where(MessageBodyModel.ref_count <= 0))
+        self.session.flush()
+        return result.rowcount
+
+
+class SearchIndexRepository:
+    """
+    Maintains the contentless `emails_fts` full-text index (rowid = email id).
+
+    The index keeps no copy of what it tokenized, so removing an entry means
+    replaying the exact values it was added with. Callers pass emails as
+    stored (full body, same subject and sender fields).
+    """
+
+    # bm25 column weights: subject, body, sender name, sender address, owner tag
+    BM25_WEIGHTS = "10.0, 1.0, 4.0, 4.0, 0.0"
+    CONTENT_COLUMNS = "{subject body sender_display_name sender_email}"
+
+    _INSERT = text(
+        "INSERT INTO emails_fts (rowid, subject, body, sender_display_name, sender_email, owner) "
+        "VALUES (:id, :subject, :body, :sender_display_name, :sender_email, :owner)"
+    )
+    _DELETE = text(
+        "INSERT INTO emails_fts (emails_fts, rowid, subject, body, sender_display_name, sender_email, owner) "
+        "VALUES ('delete', :id, :subject, :body, :sender_display_name, :sender_email, :owner)"
+    )
+
+    # Unmapped handle on the virtual table, for joins
+    fts_table = table("emails_fts", column("rowid"))
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    @staticmethod
+    def owner_tag(owner_id: int) -> str:
+        return f"u{owner_id}"
+
+    @classmethod
+    def match_expression(cls, owner_id: int, query: SearchQuery) -> str:
+        """Terms must match content columns, and the owner tag scopes the hits."""
+        return f'owner : "{cls.owner_tag(owner_id)}" AND {cls.CONTENT_COLUMNS} : ({query.to_fts()})'
+
+    def _params(self, email: Email) -> Dict:
+        return {
+            "id": email.id,
+            "subject": email.subject,
+            "body": email.body,
+            "sender_display_name": email.sender_display_name,
+            "sender_email": email.sender_email,
+            "owner": self.owner_tag(email.owner_id),
+        }
+
+    def add_many(self, emails: List[Email]):
+        if emails:
+            self.session.execute(self._INSERT, [self._params(e) for e in emails])
+
+    def remove(self, email: Email):
+        self.session.execute(self._DELETE, self._params(email))
+
+    def remove_many(self, emails: List[Email]):
+        if emails:
+            self.session.execute(self._DELETE, [self._params(e) for e in emails])
+
+
+class ChangeLogRepository:
+    """
+    Per-user modseq counters and the compact `mail_changes` log behind delta sync.
+
+    Each call takes the next modseq of every user it touches and upserts one
+    row per (user, email), so a row always holds that email's latest change. Runs on
+    the caller's session, so the log commits or rolls back with the change.
+    """
+
+    ADDED = "added"
+    CHANGED = "changed"
+    REMOVED = "removed"
+
+    # Removal entries are kept this long; older sync points get a full resync
+    REMOVAL_RETENTION = timedelta(days=30)
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def get_modseq(self, user_id: int) -> int:
+        """Current modseq of a user's mailbox (one primary-key read)."""
+        return self.get_state(user_id)[0]
+
+    def get_email_modseq(self, email_id: int, user_id: int) -> Optional[int]:
+        """
+        Modseq of an email's last change, or None for a removed or someone
+        else's email, or one not changed since the log was introduced.
+        """
+        row = self.session.execute(
+            select(MailChangeModel.modseq, MailChangeModel.removed)
+            .where(MailChangeModel.email_id == email_id, MailChangeModel.user_id == user_id)
+        ).first()
+        return row.modseq if row and not row.removed else None
+
+    def get_state(self, user_id: int) -> Tuple[int, int]:
+        """(current modseq, expunged modseq) for a user; (0, 0) before any change."""
+        row = self.session.execute(
+            select(MailboxStateModel.modseq, MailboxStateModel.expunged_modseq)
+            .where(MailboxStateModel.user_id == user_id)
+        ).first()
+        return (row.modseq, row.expunged_modseq) if row else (0, 0)
+
+    def next_modseq(self, user_ids: Iterable[int]) -> Dict[int, int]:
+        """Take the next modseq of each user, in one UPSERT ... RETURNING."""
+        ids = sorted(set(user_ids))
+        if not ids:
+            return {}
+        stmt = sqlite_insert(MailboxStateModel)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[MailboxStateModel.user_id],
+            set_={"modseq": MailboxStateModel.modseq + 1}
+        ).returning(MailboxStateModel.user_id, MailboxStateModel.modseq)
+        rows = self.session.execute(stmt, [{"user_id": user_id, "modseq": 1, "expunged_modseq": 0} for user_id in ids])
+        return {row.user_id: row.modseq for row in rows}
+
+    def log(self, kind: str, entries: Iterable[Tuple[int, int]]):
+        """Record `kind` (ADDED, CHANGED or REMOVED) for (user_id, email_id) pairs."""
+        entries = list(entries)
+        if not entries:
+            return
+        modseqs = self.next_modseq(user_id for user_id, _ in entries)
+        now = datetime.utcnow()
+
+        stmt = sqlite_insert(MailChangeModel)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[MailChangeModel.user_id, MailChangeModel.email_id],
+            set_={
+                "modseq": stmt.excluded.modseq,
+                # Kept on change, so an email added and changed since a sync point still reads as
+                # added; reset when a removed id is reused for a new email
+                "created_modseq": case(
+                    (stmt.excluded.created_modseq > 0, stmt.excluded.created_modseq),
+                    else_=MailChangeModel.created_modseq
+                ),
+                "removed": stmt.excluded.removed,
+                "changed_at": stmt.excluded.changed_at,
+            }
+        )
+        self.session.execute(stmt, [
+            {
+                "email_id": email_id,
+                "user_id": user_id,
+                "modseq": modseqs[user_id],
+                "created_modseq": modseqs[user_id] if kind == self.ADDED else 0,
+                "removed": kind == self.REMOVED,
+                "changed_at": now,
+            }
+            for user_id, email_id in entries
+        ])
+        if kind == self.REMOVED:
+            self.prune_removed(now - self.REMOVAL_RETENTION)
+
+    def prune_removed(self, before: datetime) -> int:
+        """
+        Drop removal entries older than `before` (a partial-index range, usually
+        empty) and raise each affected user's expunged modseq past them.
+        """
+        rows = self.session.execute(
+            delete(MailChangeModel)
+            .where(MailChangeModel.removed == True, MailChangeModel.changed_at < before)
+            .returning(MailChangeModel.user_id, MailChangeModel.modseq)
+        ).all()
+        if not rows:
+            return 0
+
+        floors: Dict[int, int] = {}
+        for user_id, modseq in rows:
+            floors[user_id] = max(floors.get(user_id, 0), modseq)
+        states = MailboxStateModel.__table__  # Core table: a plain executemany, not ORM bulk-by-PK
+        self.session.execute(
+            update(states)
+            .where(states.c.user_id == bindparam("s_user_id"))
+            .values(expunged_modseq=func.max(states.c.expunged_modseq, bindparam("s_floor"))),
+            [{"s_user_id": user_id, "s_floor": floor} for user_id, floor in floors.items()]
+        )
+        return len(rows)
+
+
 class EmailRepository:
     def __init__(self, session: Session):
         self.session = session
+        self.stats = FolderStatsRepository(session)
+        self.bodies = MessageBodyRepository(session)
+        self.search_index = SearchIndexRepository(session)
+        self.changes = ChangeLogRepository(session)
+
+    def _select_with_body(self):
+        """Email rows joined to their stored (possibly compressed) body."""
+        return (
+            select(EmailModel, MessageBodyModel.codec, MessageBodyModel.body, MessageBodyModel.data)
+            .outerjoin(MessageBodyModel, MessageBodyModel.hash == EmailModel.body_hash)
+        )
+
+    def _row_to_entity(self, row) -> Email:
+        model, codec, text, data = row
+        return self._to_entity(model, decode_body(codec, text, data))
 
     def get_by_folder(self, folder_id: int) -> List[Email]:
         result = self.session.execute(
-            select(EmailModel)
+            self._select_with_body()
             .where(EmailModel.folder_id == folder_id)
             .order_by(EmailModel.timestamp.desc())
         )
-        models = result.scalars().all()
-        return [self._to_entity(m) for m in models]
+        return [self._row_to_entity(row) for row in result]
+
+    def get_previews_by_folder(
+        self,
+        folder_id: int,
+        owner_id: int,
+        limit: Optional[int] = None,
+        after: Optional[PageCursor] = None
+    ) -> List[Email]:
+        """Email entities for `get_preview_rows`."""
+        return [self._preview_to_entity(row) for row in self.get_preview_rows(folder_id, owner_id, limit, after)]
 
-    def get_previews_by_folder(self, folder_id: int, owner_id: int) -> List[Email]:
+    def get_preview_rows(
+        self,
+        folder_id: int,
+        owner_id: int,
+        limit: Optional[int] = None,
+        after: Optional[PageCursor] = None
+    ) -> List[Row]:
         """
         Optimized query to get email previews for a folder.
-        Truncates body to 100 characters to prevent over-fetching large text data.
-        Returns Email entities with partial body.
+        Reads the stored 100-character snippet, so list views never touch (or
+        decompress) the body store. Returns preview rows (see `_select_previews`).
 
         Bolt Optimization:
         - Removed `recipients` from selection to avoid fetching potentially large JSON text.
         - Returns empty list for recipients since list views don't display them.
         - Reduces I/O and CPU usage (json.loads) significantly.
         - Filters by `owner_id` to allow skipping folder ownership check in service.
+
+        Keyset pagination:
+        - Ordered by (timestamp DESC, id DESC) so ties on timestamp are stable.
+        - `after` seeks past the last row of the previous page instead of using
+          OFFSET, so every page costs the same regardless of folder size.
         """
         stmt = (
-            select(
-                EmailModel.id,
-                EmailModel.owner_id,
-                EmailModel.folder_id,
-                EmailModel.sender,
-                EmailModel.sender_display_name,
-                EmailModel.sender_email,
-                # EmailModel.recipients, # Optimization: Skip fetching recipients for list view
-                EmailModel.subject,
-                func.substr(EmailModel.body, 1, 100).label("body"),
-                EmailModel.is_read,
-                EmailModel.timestamp
-            )
+            self._select_previews()
             .where(and_(EmailModel.folder_id == folder_id, EmailModel.owner_id == owner_id))
-            .order_by(EmailModel.timestamp.desc())
+            .order_by(EmailModel.timestamp.desc(), EmailModel.id.desc())
         )
 
-        result = self.session.execute(stmt)
+        if after is not None:
+            stmt = stmt.where(
+                or_(
+                    EmailModel.timestamp < after.timestamp,
+                    and_(EmailModel.timestamp == after.timestamp, EmailModel.id < after.id)
+                )
+            )
+        if limit is not None:
+            stmt = stmt.limit(limit)
+
+        return self.session.execute(stmt).all()
 
-        return [
-            Email(
-                id=row.id,
-                owner_id=row.owner_id,
-                folder_id=row.folder_id,
-                sender=row.sender,
-                subject=row.subject,
-                body=row.body,
-                recipients=[],  # Optimization: Empty list satisfies contract, saves parsing
-                is_read=row.is_read,
-                timestamp=row.timestamp,
-                sender_display_name=row.sender_display_name,
-                sender_email=row.sender_email
+    def search(
+        self,
+        owner_id: int,
+        query: SearchQuery,
+        folder_id: Optional[int] = None,
+        limit: int = 50,
+        offset: int = 0
+    ) -> List[Email]:
+        """Email entities for `search_rows`."""
+        return [self._preview_to_entity(row) for row in self.search_rows(owner_id, query, folder_id, limit, offset)]
+
+    def search_rows(
+        self,
+        owner_id: int,
+        query: SearchQuery,
+        folder_id: Optional[int] = None,
+        limit: int = 50,
+        offset: int = 0
+    ) -> List[Row]:
+        """
+        Full-text search over the owner's emails, best bm25 match first.
+        The MATCH is scoped to the owner inside the index, so ranking only
+        ever sorts this user's hits. Returns previews like folder listings.
+        """
+        stmt = (
+            self._select_previews()
+            .select_from(
+                SearchIndexRepository.fts_table.join(
+                    EmailModel, EmailModel.id == SearchIndexRepository.fts_table.c.rowid
+                )
             )
-            for row in result
-        ]
+            .where(
+                text("emails_fts MATCH :match").bindparams(
+                    match=SearchIndexRepository.match_expression(owner_id, query)
+                ),
+                EmailModel.owner_id == owner_id
+            )
+            .order_by(text(f"bm25(emails_fts, {SearchIndexRepository.BM25_WEIGHTS})"), EmailModel.id.desc())
+            .limit(limit)
+            .offset(offset)
+        )
+        if folder_id is not None:
+            stmt = stmt.where(EmailModel.folder_id == folder_id)
+
+        return self.session.execute(stmt).all()
+
+    @staticmethod
+    def _select_previews():
+        # Column order is relied on by EmailListResponse.row_dicts
+        return select(
+            EmailModel.id,
+            EmailModel.owner_id,
+            EmailModel.folder_id,
+            EmailModel.sender,
+            EmailModel.sender_display_name,
+            EmailModel.sender_email,
+            # EmailModel.recipients, # Optimization: Skip fetching recipients for list view
+            EmailModel.subject,
+            func.coalesce(EmailModel.snippet, func.substr(EmailModel.body, 1, 100)).label("body"),
+            EmailModel.is_read,
+            EmailModel.timestamp
+        )
+
+    @staticmethod
+    def _preview_to_entity(row) -> Email:
+        return Email(
+            id=row.id,
+            owner_id=row.owner_id,
+            folder_id=row.folder_id,
+            sender=row.sender,
+            subject=row.subject,
+            body=row.body,
+            recipients=[],  # Optimization: Empty list satisfies contract, saves parsing
+            is_read=row.is_read,
+            timestamp=row.timestamp,
+            sender_display_name=row.sender_display_name,
+            sender_email=row.sender_email
+        )
+
+    def get_changes(
+        self, owner_id: int, since: int, until: int, limit: Optional[int] = None
+    ) -> List[Tuple[int, str, int, Optional[Email]]]:
+        """
+        Change log entries with since < modseq <= until, oldest first, as
+        (modseq, kind, email_id, preview) tuples; preview is None for removals.
+        Walks the (user_id, modseq) index, so the cost follows the number of
+        changes, not the mailbox size.
+        """
+        stmt = (
+            self._select_previews()
+            .add_columns(
+                MailChangeModel.email_id.label("change_email_id"),
+                MailChangeModel.modseq.label("change_modseq"),
+                MailChangeModel.created_modseq,
+                MailChangeModel.removed
+            )
+            .select_from(MailChangeModel)
+            .outerjoin(
+                EmailModel,
+                and_(EmailModel.id == MailChangeModel.email_id, EmailModel.owner_id == MailChangeModel.user_id)
+            )
+            .where(
+                MailChangeModel.user_id == owner_id,
+                MailChangeModel.modseq > since,
+                MailChangeModel.modseq <= until
+            )
+            .order_by(MailChangeModel.modseq, MailChangeModel.email_id)
+        )
+        if limit is not None:
+            stmt = stmt.limit(limit)
+
+        changes = []
+        for row in self.session.execute(stmt):
+            if row.removed or row.id is None:
+                changes.append((row.change_modseq, ChangeLogRepository.REMOVED, row.change_email_id, None))
+            elif row.created_modseq > since:
+                changes.append((row.change_modseq, ChangeLogRepository.ADDED, row.id, self._preview_to_entity(row)))
+            else:
+                changes.append((row.change_modseq, ChangeLogRepository.CHANGED, row.id, self._preview_to_entity(row)))
+        return changes
+
+    def count_by_folder(self, folder_id: int, owner_id: int) -> int:
+        """Count emails in a folder (used for the optional listing total)."""
+        return self.stats.get_total(folder_id, owner_id)
 
     def get_by_id_and_owner(self, email_id: int, owner_id: int) -> Optional[Email]:
+        """
+        ⚡ Bolt: Content comes from the message cache when possible; a hit
+        only reads folder, read flag and timestamp by primary key (no body
+        join, no decompression, no recipients JSON).
+        """
+        cached = message_cache.get(owner_id, email_id)
+        if cached is not None:
+            state = self.session.execute(
+                select(EmailModel.folder_id, EmailModel.is_read, EmailModel.timestamp)
+                .where(EmailModel.id == email_id, EmailModel.owner_id == owner_id)
+            ).first()
+            # A different timestamp means the id now belongs to a newer row
+            if state is not None and state.timestamp == cached.timestamp:
+                return cached.to_entity(email_id, owner_id, state.folder_id, state.is_read)
+            message_cache.invalidate([(owner_id, email_id)])
+            if state is None:
+                return None
+
         result = self.session.execute(
-            select(EmailModel).where(EmailModel.id == email_id, EmailModel.owner_id == owner_id)
+            self._select_with_body().where(EmailModel.id == email_id, EmailModel.owner_id == owner_id)
         )
-        model = result.scalars().first()
-        return self._to_entity(model) if model else None
+        row = result.first()
+        if not row:
+            return None
+        email = self._row_to_entity(row)
+        message_cache.put(owner_id, email_id, CachedMessage.from_entity(email))
+        return email
+
+    def delete(self, email_id: int, owner_id: int) -> bool:
+        """
+        Permanently delete an email.
+        Releases its body reference (collecting the body if this was the last
+        copy), removes it from the folder counters and from the search index
+        in the same transaction.
+        """
+        row = self.session.execute(
+            self._select_with_body().where(EmailModel.id == email_id, EmailModel.owner_id == owner_id)
+        ).first()
+        if not row:
+            return False
+        current = row[0]
+
+        # The contentless index needs the indexed values back to drop the entry
+        self.search_index.remove(self._row_to_entity(row))
+        self.session.execute(delete(EmailModel).where(EmailModel.id == email_id))
+        self.bodies.release(current.body_hash)
+        self.stats.apply_delta(
+            current.folder_id, owner_id,
+            unread=-int(not current.is_read), total=-1, size=-current.size
+        )
+        self.changes.log(ChangeLogRepository.REMOVED, [(owner_id, email_id)])
+        message_cache.invalidate([(owner_id, email_id)])
+        self.session.flush()
+        return True
 
     def mark_as_read(self, email_id: int):
         """
         Optimized method to mark an email as read using a single UPDATE statement.
         Avoids SELECT + UPDATE overhead.
+
+        Only matches unread rows, and RETURNING hands back the folder so the
+        unread counter is decremented exactly once.
         """
-        stmt = update(EmailModel).where(EmailModel.id == email_id).values(is_read=True)
-        self.session.execute(stmt)
+        stmt = (
+            update(EmailModel)
+            .where(EmailModel.id == email_id, EmailModel.is_read == False)
+            .values(is_read=True)
+            .returning(EmailModel.folder_id, EmailModel.owner_id)
+        )
+        row = self.session.execute(stmt).first()
+        if row:
+            self.stats.apply_delta(row.folder_id, row.owner_id, unread=-1)
+            self.changes.log(ChangeLogRepository.CHANGED, [(row.owner_id, email_id)])
         self.session.flush()
 
     def move_to_folder(self, email_id: int, folder_id: int):
         """
-        Optimized method to move an email to a folder using a single UPDATE statement.
-        Avoids SELECT + UPDATE overhead (saves 1 roundtrip).
+        Move an email to a folder and shift its counters between folders.
+        Reads the current folder/flag/size first since RETURNING only sees new values.
         """
+        current = self.session.execute(
+            select(EmailModel.folder_id, EmailModel.owner_id, EmailModel.is_read, EmailModel.size)
+            .where(EmailModel.id == email_id)
+        ).first()
+        if not current or current.folder_id == folder_id:
+            return
+
         stmt = update(EmailModel).where(EmailModel.id == email_id).values(folder_id=folder_id)
         self.session.execute(stmt)
+
+        unread = 0 if current.is_read else 1
+        self.stats.apply_delta(current.folder_id, current.owner_id, unread=-unread, total=-1, size=-current.size)
+        self.stats.apply_delta(folder_id, current.owner_id, unread=unread, total=1, size=current.size)
+        self.changes.log(ChangeLogRepository.CHANGED, [(current.owner_id, email_id)])
         self.session.flush()
 
+    # ------------------------------------------
+    # Set-based bulk operations
+    # ------------------------------------------
+    # Each runs a fixed number of statements however many ids it gets; ids the
+    # owner doesn't have are skipped. Counters move with the same grouping.
+
+    def move_many(self, email_ids: List[int], owner_id: int, folder_id: int) -> int:
+        """Move the owner's emails to `folder_id`. Returns emails moved."""
+        moving = and_(
+            EmailModel.id.in_(email_ids),
+            EmailModel.owner_id == owner_id,
+            EmailModel.folder_id != folder_id
+        )
+        groups = self.session.execute(
+            select(
+                EmailModel.folder_id,
+                func.sum(case((EmailModel.is_read == False, 1), else_=0)),
+                func.count(EmailModel.id),
+                func.coalesce(func.sum(EmailModel.size), 0)
+            )
+            .where(moving)
+            .group_by(EmailModel.folder_id)
+        ).all()
+        if not groups:
+            return 0
+
+        moved = self.session.execute(
+            update(EmailModel).where(moving).values(folder_id=folder_id).returning(EmailModel.id)
+        ).scalars().all()
+
+        deltas = []
+        for source_id, unread, total, size in groups:
+            deltas.append((source_id, owner_id, -unread, -total, -size))
+            deltas.append((folder_id, owner_id, unread, total, size))
+        self.stats.apply_deltas(deltas)
+        self.changes.log(ChangeLogRepository.CHANGED, [(owner_id, email_id) for email_id in moved])
+        self.session.flush()
+        return len(moved)
+
+    def set_read_many(self, email_ids: List[int], owner_id: int, is_read: bool) -> int:
+        """Mark the owner's emails read or unread. Returns emails changed."""
+        result = self.session.execute(
+            update(EmailModel)
+            .where(
+                EmailModel.id.in_(email_ids),
+                EmailModel.owner_id == owner_id,
+                EmailModel.is_read == (not is_read)
+            )
+            .values(is_read=is_read)
+            .returning(EmailModel.id, EmailModel.folder_id)
+        )
+        unread = -1 if is_read else 1
+        changed = []
+        deltas = []
+        for email_id, folder_id in result:
+            changed.append((owner_id, email_id))
+            deltas.append((folder_id, owner_id, unread, 0, 0))
+        self.stats.apply_deltas(deltas)
+        self.changes.log(ChangeLogRepository.CHANGED, changed)
+        self.session.flush()
+        return len(changed)
+
+    def mark_folder_read(self, folder_id: int, owner_id: int) -> int:
+        """Mark every unread email in a folder read (uses the partial unread index)."""
+        changed = self.session.execute(
+            update(EmailModel)
+            .where(EmailModel.folder_id == folder_id, EmailModel.owner_id == owner_id, EmailModel.is_read == False)
+            .values(is_read=True)
+            .returning(EmailModel.id)
+        ).scalars().all()
+        self.stats.apply_delta(folder_id, owner_id, unread=-len(changed))
+        self.changes.log(ChangeLogRepository.CHANGED, [(owner_id, email_id) for email_id in changed])
+        self.session.flush()
+        return len(changed)
+
+    def delete_many(self, email_ids: List[int], owner_id: int) -> int:
+        """
+        Permanently delete the owner's emails, with the same bookkeeping as
+        `delete`: body references, folder counters and search index entries.
+        """
+        rows = self.session.execute(
+            self._select_with_body().where(EmailModel.id.in_(email_ids), EmailModel.owner_id == owner_id)
+        ).all()
+        if not rows:
+            return 0
+
+        body_refs: Dict[str, int] = {}
+        deltas = []
+        for row in rows:
+            current = row[0]
+            if current.body_hash:
+                body_refs[current.body_hash] = body_refs.get(current.body_hash, 0) + 1
+            deltas.append((current.folder_id, owner_id, -int(not current.is_read), -1, -current.size))
+
+        # The contentless index needs the indexed values back to drop the entries
+        self.search_index.remove_many([self._row_to_entity(row) for row in rows])
+        self.session.execute(
+            delete(EmailModel).where(EmailModel.id.in_([row[0].id for row in rows]))
+        )
+        self.bodies.release_many(body_refs)
+        self.stats.apply_deltas(deltas)
+        self.changes.log(ChangeLogRepository.REMOVED, [(owner_id, row[0].id) for row in rows])
+        message_cache.invalidate((owner_id, row[0].id) for row in rows)
+        self.session.flush()
+        return len(rows)
+
+    def save_many(self, emails: List[Email]) -> int:
+        """
+        Insert many new emails (e.g. one copy per recipient) as a batch.
+
+        Each distinct body is stored once with all its references added in one
+        UPSERT, the rows go in through a single executemany INSERT, and folder
+        counters are updated with one batched UPSERT. New ids are written back
+        to the entities, which are then added to the search index. Returns rows
+        inserted.
+        """
+        if not emails:
+            return 0
+
+        refs: Dict[str, int] = {}
+        body_hashes: Dict[str, str] = {}
+        for email in emails:
+            if email.body:
+                refs[email.body] = refs.get(email.body, 0) + 1
+        for body, count in refs.items():
+            body_hashes[body] = self.bodies.acquire(body, refs=count)
+
+        # Fan-out copies share one recipients list; encode it once, not per row
+        recipients_json: Dict[int, str] = {}
+
+        rows = []
+        deltas = []
+        for email in emails:
+            size = len(email.body.encode("utf-8")) if email.body else 0
+            key = id(email.recipients)
+            if key not in recipients_json:
+                recipients_json[key] = json.dumps(email.recipients)
+            rows.append({
+                "owner_id": email.owner_id,
+                "folder_id": email.folder_id,
+                "sender": email.sender,
+                "sender_display_name": email.sender_display_name,
+                "sender_email": email.sender_email,
+                "recipients": recipients_json[key],
+                "subject": email.subject,
+                "body_hash": body_hashes.get(email.body) if email.body else None,
+                "snippet": email.body[:100] if email.body else None,
+                "size": size,
+                "is_read": email.is_read,
+                "timestamp": email.timestamp,
+            })
+            deltas.append((email.folder_id, email.owner_id, int(not email.is_read), 1, size))
+
+        # SQLite hands out rowids in insertion order, so the sorted RETURNING ids
+        # line up with `rows`. (sort_by_parameter_order would make SQLAlchemy
+        # fall back to one INSERT per row on SQLite.)
+        ids = sorted(self.session.execute(insert(EmailModel).returning(EmailModel.id), rows).scalars())
+        for email, email_id in zip(emails, ids):
+            email.id = email_id
+        self.search_index.add_many(emails)
+        self.stats.apply_deltas(deltas)
+        self.changes.log(ChangeLogRepository.ADDED, [(email.owner_id, email.id) for email in emails])
+        self._record_new(emails)
+        self.session.flush()
+        return len(rows)
+
     def save(self, email: Email) -> Email:
-        import time
-        from sqlalchemy.exc import OperationalError
-        
-        max_retries = 3
-        for attempt in range(max_retries):
-            try:
-                if email.id:
-                    result = self.session.execute(select(EmailModel).where(EmailModel.id == email.id))
-                    model = result.scalars().first()
-                    if model:
-                        model.folder_id = email.folder_id
-                        model.is_read = email.is_read
-                        self.session.flush()
-                        return self._to_entity(model)
-
-                # Create new email with identity fields
-                model = EmailModel(
-                    owner_id=email.owner_id,
-                    folder_id=email.folder_id,
-                    sender=email.sender,
-                    sender_display_name=getattr(email, 'sender_display_name', None),
-                    sender_email=getattr(email, 'sender_email', None),
-                    recipients=json.dumps(email.recipients),
-                    subject=email.subject,
-                    body=email.body,
-                    is_read=email.is_read,
-                    timestamp=email.timestamp
-                )
-                self.session.add(model)
+        if email.id:
+            result = self.session.execute(select(EmailModel).where(EmailModel.id == email.id))
+            model = result.scalars().first()
+            if model:
+                if (model.folder_id, model.is_read) != (email.folder_id, email.is_read):
+                    # Move the row's contribution from its old counters to its new ones
+                    self.stats.apply_delta(
+                        model.folder_id, model.owner_id,
+                        unread=-int(not model.is_read), total=-1, size=-model.size
+                    )
+                    model.folder_id = email.folder_id
+                    model.is_read = email.is_read
+                    self.stats.apply_delta(
+                        model.folder_id, model.owner_id,
+                        unread=int(not model.is_read), total=1, size=model.size
+                    )
+                    self.changes.log(ChangeLogRepository.CHANGED, [(model.owner_id, model.id)])
                 self.session.flush()
-                return self._to_entity(model)
-            except OperationalError as e:
-                if "database is locked" in str(e) and attempt < max_retries - 1:
-                    time.sleep(0.1 * (attempt + 1))  # Exponential backoff
-                    continue
-                else:
-                    raise e
-            except Exception as e:
-                raise e
-
-    def _to_entity(self, model: EmailModel) -> Email:
+                return self._to_entity(model, self.bodies.get(model.body_hash) if model.body_hash else None)
+
+        # Body goes to the shared store; the row only keeps its hash
+        body_hash = self.bodies.acquire(email.body) if email.body else None
+
+        # Create new email with identity fields
+        model = EmailModel(
+            owner_id=email.owner_id,
+            folder_id=email.folder_id,
+            sender=email.sender,
+            sender_display_name=getattr(email, 'sender_display_name', None),
+            sender_email=getattr(email, 'sender_email', None),
+            recipients=json.dumps(email.recipients),
+            subject=email.subject,
+            body_hash=body_hash,
+            snippet=email.body[:100] if email.body else None,
+            size=len(email.body.encode("utf-8")) if email.body else 0,
+            is_read=email.is_read,
+            timestamp=email.timestamp
+        )
+        self.session.add(model)
+        self.session.flush()
+        self.stats.apply_delta(
+            model.folder_id, model.owner_id,
+            unread=int(not model.is_read), total=1, size=model.size
+        )
+        saved = self._to_entity(model, email.body)
+        self.search_index.add_many([saved])
+        self.changes.log(ChangeLogRepository.ADDED, [(saved.owner_id, saved.id)])
+        self._record_new([saved])
+        return saved
+
+    def _record_new(self, emails: List[Email]):
+        """Announce new messages to the owners' open event streams (on commit)."""
+        for email in emails:
+            if not event_bus.has_subscribers(email.owner_id):
+                continue
+            record_message(self.session, email.owner_id, {
+                "id": email.id,
+                "folder_id": email.folder_id,
+                "sender": email.sender,
+                "sender_display_name": email.get_sender_name(),
+                "sender_email": email.sender_email,
+                "subject": email.subject or "",
+                "body": (email.body or "")[:100],
+                "timestamp": email.timestamp.isoformat(),
+                "is_read": email.is_read,
+            })
+
+    def _to_entity(self, model: EmailModel, stored_body: Optional[str] = None) -> Email:
         return Email(
             id=model.id,
             owner_id=model.owner_id,
             folder_id=model.folder_id,
             sender=model.sender,
             subject=model.subject,
-            body=model.body,
+            body=model.body if model.body is not None else stored_body,
             recipients=json.loads(model.recipients),
             is_read=model.is_read,
             timestamp=model.timestamp,
@@ -353,3 +1269,205 @@ class EmailRepository:
             sender_display_name=model.sender_display_name,
             sender_email=model.sender_email
         )
+
+
+class SpoolReceiptRepository:
+    """Delivery receipts for spooled SMTP messages (see infrastructure/smtp/spool.py)."""
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def record(self, spool_id: str) -> bool:
+        """Record a delivery. False means this message was delivered before."""
+        stmt = (
+            sqlite_insert(SpoolReceiptModel)
+            .values(spool_id=spool_id, delivered_at=datetime.utcnow())
+            .on_conflict_do_nothing()
+        )
+        return self.session.execute(stmt).rowcount == 1
+
+    def delivered(self, spool_ids: Iterable[str]) -> set:
+        ids = list(spool_ids)
+        if not ids:
+            return set()
+        result = self.session.execute(
+            select(SpoolReceiptModel.spool_id).where(SpoolReceiptModel.spool_id.in_(ids))
+        )
+        return set(result.scalars())
+
+    def prune(self, before: datetime) -> int:
+        """Drop receipts whose spool files are long gone."""
+        result = self.session.execute(delete(SpoolReceiptModel).where(SpoolReceiptModel.delivered_at < before))
+        return result.rowcount
+
+
+class OutboxRepository:
+    """Background sends queued by the send endpoint (see infrastructure/smtp/outbox.py)."""
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def add(self, message: OutboxMessage) -> OutboxMessage:
+        model = OutboxModel(
+            user_id=message.user_id,
+            idempotency_key=message.idempotency_key,
+            status=message.status,
+            to_addresses=json.dumps(message.to),
+            cc_addresses=json.dumps(message.cc),
+            subject=message.subject,
+            body=message.body,
+            created_at=message.created_at,
+            updated_at=message.updated_at
+        )
+        self.session.add(model)
+        self.session.flush()
+        message.id = model.id
+        return message
+
+    def get(self, message_id: int) -> Optional[OutboxMessage]:
+        model = self.session.get(OutboxModel, message_id)
+        return self._to_entity(model) if model else None
+
+    def get_by_id_and_user(self, message_id: int, user_id: int) -> Optional[OutboxMessage]:
+        result = self.session.execute(
+            select(OutboxModel).where(OutboxModel.id == message_id, OutboxModel.user_id == user_id)
+        )
+        model = result.scalars().first()
+        return self._to_entity(model) if model else None
+
+    def get_by_idempotency_key(self, user_id: int, key: str) -> Optional[OutboxMessage]:
+        result = self.session.execute(
+            select(OutboxModel).where(OutboxModel.user_id == user_id, OutboxModel.idempotency_key == key)
+        )
+        model = result.scalars().first()
+        return self._to_entity(model) if model else None
+
+    def ids_with_status(self, *statuses: str) -> List[int]:
+        result = self.session.execute(
+            select(OutboxModel.id).where(OutboxModel.status.in_(statuses)).order_by(OutboxModel.id)
+        )
+        return list(result.scalars())
+
+    def set_status(self, message_id: int, status: str, error: Optional[str] = None):
+        self.session.execute(
+            update(OutboxModel)
+            .where(OutboxModel.id == message_id)
+            .values(status=status, error=error, updated_at=datetime.utcnow())
+        )
+
+    def prune(self, before: datetime) -> int:
+        """Drop finished messages; their idempotency keys expire with them."""
+        result = self.session.execute(
+            delete(OutboxModel).where(
+                OutboxModel.status.in_((OutboxMessage.SENT, OutboxMessage.FAILED)),
+                OutboxModel.updated_at < before
+            )
+        )
+        return result.rowcount
+
+    def _to_entity(self, model: OutboxModel) -> OutboxMessage:
+        return OutboxMessage(
+            id=model.id,
+            user_id=model.user_id,
+            to=json.loads(model.to_addresses),
+            cc=json.loads(model.cc_addresses),
+            subject=model.subject,
+            body=model.body,
+            status=model.status,
+            idempotency_key=model.idempotency_key,
+            error=model.error,
+            created_at=model.created_at,
+            updated_at=model.updated_at
+        )
+
+
+class RefreshTokenRepository:
+    """
+    Refresh tokens by SHA-256 hash (see services/auth_service.py).
+    Revoking moves rows from refresh_tokens to refresh_token_revocations.
+    """
+    ROTATED = "rotated"
+    LOGOUT = "logout"
+    REUSED = "reused"
+    DEACTIVATED = "deactivated"
+    EXPIRED = "expired"
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def add(self, token_hash: str, user_id: int, family_id: str, expires_at: datetime):
+        self.session.execute(
+            insert(RefreshTokenModel).values(
+                token_hash=token_hash,
+                user_id=user_id,
+                family_id=family_id,
+                created_at=datetime.utcnow(),
+                expires_at=expires_at
+            )
+        )
+
+    def get(self, token_hash: str) -> Optional[Row]:
+        """(user_id, family_id, expires_at) of a live token."""
+        return self.session.execute(
+            select(RefreshTokenModel.user_id, RefreshTokenModel.family_id, RefreshTokenModel.expires_at)
+            .where(RefreshTokenModel.token_hash == token_hash)
+        ).first()
+
+    def get_revocation(self, token_hash: str) -> Optional[Row]:
+        """(user_id, family_id, reason, revoked_at) of a revoked token."""
+        return self.session.execute(
+            select(
+                RefreshTokenRevocationModel.user_id,
+                RefreshTokenRevocationModel.family_id,
+                RefreshTokenRevocationModel.reason,
+                RefreshTokenRevocationModel.revoked_at
+            )
+            .where(RefreshTokenRevocationModel.token_hash == token_hash)
+        ).first()
+
+    def revoke(self, token_hash: str, reason: str) -> int:
+        return self._revoke_where(RefreshTokenModel.token_hash == token_hash, reason)
+
+    def revoke_family(self, family_id: str, reason: str) -> int:
+        return self._revoke_where(RefreshTokenModel.family_id == family_id, reason)
+
+    def revoke_user(self, user_id: int, reason: str) -> int:
+        return self._revoke_where(RefreshTokenModel.user_id == user_id, reason)
+
+    def _revoke_where(self, condition, reason: str) -> int:
+        revoked = select(
+            RefreshTokenModel.token_hash,
+            RefreshTokenModel.user_id,
+            RefreshTokenModel.family_id,
+            literal(reason),
+            literal(datetime.utcnow()),
+            RefreshTokenModel.expires_at
+        ).where(condition)
+        self.session.execute(
+            insert(RefreshTokenRevocationModel).from_select(
+                ["token_hash", "user_id", "family_id", "reason", "revoked_at", "expires_at"], revoked
+            )
+        )
+        return self.session.execute(delete(RefreshTokenModel).where(condition)).rowcount
+
+    def prune(self, now: datetime) -> int:
+        """Drop expired tokens and revocations of tokens that have expired since."""
+        pruned = self.session.execute(delete(RefreshTokenModel).where(RefreshTokenModel.expires_at < now)).rowcount
+        pruned += self.session.execute(
+            delete(RefreshTokenRevocationModel).where(RefreshTokenRevocationModel.expires_at < now)
+        ).rowcount
+        return pruned
+
+
+class UnitOfWork:
+    """All repositories bound to one session, i.e. one transaction."""
+
+    def __init__(self, session: Session):
+        self.session = session
+        self.users = UserRepository(session)
+        self.folders = FolderRepository(session)
+        self.emails = EmailRepository(session)
+        self.settings = SystemSettingsRepository(session)
+        self.spool_receipts = SpoolReceiptRepository(session)
+        self.outbox = OutboxRepository(session)
+        self.refresh_tokens = RefreshTokenRepository(session)
@@ -1,24 +1,41 @@
 from sqlalchemy import create_engine
-from sqlalchemy.pool import NullPool
+from sqlalchemy.pool import QueuePool, StaticPool
 from sqlalchemy.orm import sessionmaker, declarative_base
+from .storage_profile import StorageProfile, install_storage_profile
 from ...config import settings
 
 # Database setup
 database_url = settings.DATABASE_URL
+storage_profile = StorageProfile.from_settings(settings)
+
+# In-memory databases only exist inside a single connection, so share one.
+# File databases get a bounded, thread-safe pool: connections (and their page
+# cache and mmap) are reused across requests instead of reopened every time.
+if database_url.endswith(":memory:") or database_url == "sqlite://":
+    pool_options = {"poolclass": StaticPool}
+else:
+    pool_options = {
+        "poolclass": QueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_POOL_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+    }
 
-# For SQLite, we need to handle concurrent access properly
-# Using NullPool prevents thread-safety issues with synchronous SQLAlchemy
 engine = create_engine(
     database_url,
     connect_args={
+        # Pooled connections are handed between threadpool workers
         "check_same_thread": False,
-        "timeout": 30,  # Increase timeout to handle concurrent access
+        "timeout": storage_profile.busy_timeout_ms / 1000,
     },
-    poolclass=NullPool,
     echo=False,
-    isolation_level="SERIALIZABLE"  # Default for SQLite
+    isolation_level="SERIALIZABLE",  # Default for SQLite
+    **pool_options
 )
 
+# WAL, synchronous, cache_size, mmap_size, temp_store, busy_timeout
+install_storage_profile(engine, storage_profile)
+
 SessionLocal = sessionmaker(
     bind=engine,
     expire_on_commit=False,
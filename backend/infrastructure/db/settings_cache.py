@@ -0,0 +1,71 @@
+"""
+Process-wide cache for the system settings singleton.
+
+Settings are read on nearly every request (email addresses are derived from
+the namespace) but change only when an admin edits them. The cached entity is
+trusted for `revalidate_seconds`; after that a single-column
+`SELECT version` confirms it is still current, and only a changed version
+reloads the row.
+
+Writes in this process drop the entry as soon as they commit. Other processes
+sharing the database (extra uvicorn workers) notice the bumped version on
+their next revalidation, so they lag by at most `revalidate_seconds`.
+"""
+import threading
+import time
+from dataclasses import replace
+from typing import NamedTuple, Optional
+from ...core.entities.user import SystemSettings
+from ...config import settings
+
+
+class _Entry(NamedTuple):
+    settings: SystemSettings
+    version: int
+    checked_at: float
+
+
+class SettingsCache:
+    def __init__(self, revalidate_seconds: float = 1.0):
+        self.revalidate_seconds = revalidate_seconds
+        self._entry: Optional[_Entry] = None
+        self._lock = threading.Lock()
+
+    def get_fresh(self) -> Optional[SystemSettings]:
+        """The cached settings if checked recently enough, else None."""
+        entry = self._entry
+        if entry is None or time.monotonic() - entry.checked_at > self.revalidate_seconds:
+            return None
+        return replace(entry.settings)
+
+    def revalidate(self, version: Optional[int]) -> Optional[SystemSettings]:
+        """
+        Confirm the cached entry against the stored version.
+        Returns the settings when still current; None means reload.
+        """
+        entry = self._entry
+        if entry is None or version is None or version != entry.version:
+            return None
+        with self._lock:
+            if self._entry is entry:
+                self._entry = entry._replace(checked_at=time.monotonic())
+        return replace(entry.settings)
+
+    def store(self, system_settings: SystemSettings, version: int):
+        with self._lock:
+            self._entry = _Entry(replace(system_settings), version, time.monotonic())
+
+    def invalidate(self):
+        with self._lock:
+            self._entry = None
+
+    @property
+    def cached_version(self) -> Optional[int]:
+        entry = self._entry
+        return entry.version if entry else None
+
+
+# Global instance shared by every session in this process
+settings_cache = SettingsCache(
+    revalidate_seconds=settings.SETTINGS_CACHE_SECONDS if settings else 1.0
+)
@@ -0,0 +1,77 @@
+"""
+SQLite storage profile.
+
+Per-connection PRAGMAs are not persisted in the database file, so they are
+applied from a `connect` event hook every time the pool opens a connection.
+"""
+from dataclasses import dataclass
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+JOURNAL_MODES = {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"}
+SYNCHRONOUS_MODES = {"OFF", "NORMAL", "FULL", "EXTRA"}
+TEMP_STORES = {"DEFAULT", "FILE", "MEMORY"}
+
+
+@dataclass(frozen=True)
+class StorageProfile:
+    """
+    Tuning knobs for the SQLite engine.
+
+    - journal_mode: WAL lets readers proceed while SMTP delivery writes
+    - synchronous: NORMAL is durable across app crashes in WAL mode
+    - cache_size_kb: page cache per connection (applied as a negative KiB value)
+    - mmap_size: bytes of the DB file to memory-map for reads (0 disables)
+    - temp_store: where temp tables and sort spills live
+    - busy_timeout_ms: how long a connection waits on a lock before failing
+    """
+    journal_mode: str = "WAL"
+    synchronous: str = "NORMAL"
+    cache_size_kb: int = 65536
+    mmap_size: int = 268435456
+    temp_store: str = "MEMORY"
+    busy_timeout_ms: int = 30000
+
+    def __post_init__(self):
+        # PRAGMA values cannot be bound as parameters, so validate before interpolating
+        if self.journal_mode.upper() not in JOURNAL_MODES:
+            raise ValueError(f"Invalid SQLite journal_mode: {self.journal_mode}")
+        if self.synchronous.upper() not in SYNCHRONOUS_MODES:
+            raise ValueError(f"Invalid SQLite synchronous mode: {self.synchronous}")
+        if self.temp_store.upper() not in TEMP_STORES:
+            raise ValueError(f"Invalid SQLite temp_store: {self.temp_store}")
+
+    @classmethod
+    def from_settings(cls, settings) -> "StorageProfile":
+        return cls(
+            journal_mode=settings.SQLITE_JOURNAL_MODE,
+            synchronous=settings.SQLITE_SYNCHRONOUS,
+            cache_size_kb=settings.SQLITE_CACHE_SIZE_KB,
+            mmap_size=settings.SQLITE_MMAP_SIZE,
+            temp_store=settings.SQLITE_TEMP_STORE,
+            busy_timeout_ms=settings.SQLITE_BUSY_TIMEOUT_MS
+        )
+
+    def pragmas(self) -> list:
+        return [
+            f"PRAGMA journal_mode={self.journal_mode.upper()}",
+            f"PRAGMA synchronous={self.synchronous.upper()}",
+            f"PRAGMA cache_size={-int(self.cache_size_kb)}",
+            f"PRAGMA mmap_size={int(self.mmap_size)}",
+            f"PRAGMA temp_store={self.temp_store.upper()}",
+            f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}",
+        ]
+
+
+def install_storage_profile(engine: Engine, profile: StorageProfile) -> None:
+    """Apply the profile's PRAGMAs to every new DBAPI connection of `engine`."""
+    statements = profile.pragmas()
+
+    @event.listens_for(engine, "connect")
+    def _apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
@@ -0,0 +1,194 @@
+"""
+Single-writer queue for SQLite mutations.
+
+SQLite allows one writer at a time. Instead of letting the API threadpool and
+the SMTP handler race for the write lock (and sleep/retry when they lose), all
+mutations are submitted as jobs to one writer thread. The writer owns a
+dedicated connection, drains whatever jobs are queued, runs them in a single
+transaction and commits once (group commit), then resolves each job's future.
+
+A job is a callable taking a Session. It must only touch the database: if any
+job in a batch raises, the batch is rolled back and its jobs are re-run one per
+transaction, so a failing job never takes its batch-mates down with it.
+"""
+import logging
+import queue
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Callable, List, Optional, TypeVar
+from sqlalchemy.orm import Session, sessionmaker
+from .session import SessionLocal
+from .repositories import UnitOfWork
+from ...config import settings
+
+logger = logging.getLogger("sandesh.writer")
+
+T = TypeVar("T")
+
+_STOP = object()
+
+
+@dataclass
+class _Job:
+    fn: Callable[[Session], object]
+    future: Future
+
+
+class WriteQueue:
+    """
+    Dedicated writer thread with group commit.
+
+    `run(fn)` blocks until the job's transaction has committed and returns the
+    job's result (or raises its exception). When the writer thread is not
+    running (scripts, tools), jobs run inline in their own transaction.
+    """
+
+    def __init__(self, session_factory: sessionmaker, max_batch: int = 64, max_pending: int = 1000):
+        self._session_factory = session_factory
+        self._max_batch = max_batch
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_pending)
+        self._thread: Optional[threading.Thread] = None
+        self._connection = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        engine = self._session_factory.kw["bind"]
+        self._connection = engine.connect()
+        self._thread = threading.Thread(target=self._loop, name="sandesh-db-writer", daemon=True)
+        self._thread.start()
+        logger.info("Database writer started")
+
+    def stop(self, timeout: float = 10.0):
+        """Finish queued jobs, then stop the thread and release the connection."""
+        if not self.running:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+        logger.info("Database writer stopped")
+
+    def submit(self, fn: Callable[[Session], T]) -> "Future[T]":
+        """Queue a job; blocks while the queue is full (backpressure)."""
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("Write jobs cannot submit nested write jobs")
+
+        future: Future = Future()
+        if not self.running:
+            self._execute_inline(_Job(fn, future))
+            return future
+
+        self._queue.put(_Job(fn, future))
+        return future
+
+    def run(self, fn: Callable[[Session], T]) -> T:
+        """Submit a job and wait for its committed result."""
+        return self.submit(fn).result()
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    # ------------------------------------------
+    # Writer thread
+    # ------------------------------------------
+
+    def _loop(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+
+            batch: List[_Job] = [item]
+            while len(batch) < self._max_batch:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            try:
+                self._execute(batch)
+            except Exception as e:  # Never let the writer thread die
+                logger.exception(f"Writer batch failed unexpectedly: {e}")
+                for job in batch:
+                    if not job.future.done():
+                        job.future.set_exception(e)
+
+    def _execute(self, batch: List[_Job]):
+        session = self._session_factory(bind=self._connection)
+        results = []
+        failed = None
+        try:
+            for job in batch:
+                try:
+                    results.append(job.fn(session))
+                except Exception as e:
+                    failed = e
+                    break
+
+            if failed is None:
+                session.commit()
+        except Exception as e:
+            # Commit itself failed: nothing in this batch was persisted
+            session.rollback()
+            for job in batch:
+                job.future.set_exception(e)
+            return
+        finally:
+            session.close()
+
+        if failed is None:
+            for job, result in zip(batch, results):
+                job.future.set_result(result)
+            return
+
+        if len(batch) == 1:
+            batch[0].future.set_exception(failed)
+            return
+
+        # Isolate the failing job: re-run each job in its own transaction
+        for job in batch:
+            self._execute([job])
+
+    def _execute_inline(self, job: _Job):
+        with self._session_factory() as session:
+            try:
+                result = job.fn(session)
+                session.commit()
+            except Exception as e:
+                session.rollback()
+                job.future.set_exception(e)
+                return
+        job.future.set_result(result)
+
+
+def run_write(writer: Optional[WriteQueue], session: Session, job: Callable[[UnitOfWork], T]) -> T:
+    """
+    Run a mutation job against a UnitOfWork.
+
+    Through the writer thread when one is configured; otherwise inline on the
+    caller's own session and transaction (benchmarks, tools, ad-hoc scripts).
+    """
+    if writer is None:
+        return job(UnitOfWork(session))
+    return writer.run(lambda writer_session: job(UnitOfWork(writer_session)))
+
+
+# Global instance, started and stopped by the application lifespan
+write_queue = WriteQueue(
+    SessionLocal,
+    max_batch=settings.WRITER_MAX_BATCH,
+    max_pending=settings.WRITER_MAX_PENDING
+)
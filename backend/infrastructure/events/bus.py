@@ -0,0 +1,183 @@
+"""
+In-process pub/sub for per-user change events, streamed by GET /api/events.
+
+Repositories record events on their session (`record_message`,
+`record_folder_delta`); they are published only when that session commits and
+dropped if it rolls back, so subscribers never hear about changes that did not
+happen. Folder deltas are merged per commit: a bulk action touching thousands
+of emails produces one event per folder.
+
+Each connection has a bounded buffer (`max_queued_bytes`). A client too slow
+to keep up doesn't grow server memory: its buffer is dropped and it gets a
+single `resync` event telling it to re-fetch folders and listings instead.
+
+Events only reach connections served by this process; the app runs as one
+process because it also hosts the SMTP server.
+"""
+import asyncio
+import json
+import threading
+from collections import deque
+from typing import Deque, Dict, List, Optional, Set, Tuple
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from ...config import settings
+
+_PENDING = "sandesh_pending_events"
+_HOOKED = "sandesh_events_hooked"
+
+RESYNC = "event: resync\ndata: {}\n\n"
+
+
+def format_event(name: str, data: Dict) -> str:
+    """One SSE frame; serialized once and shared by all the user's connections."""
+    return f"event: {name}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+class Subscription:
+    """One SSE connection's buffer. Filled from any thread, drained on its event loop."""
+
+    def __init__(self, user_id: int, loop: asyncio.AbstractEventLoop, max_queued_bytes: int):
+        self.user_id = user_id
+        self.max_queued_bytes = max_queued_bytes
+        self._loop = loop
+        self._lock = threading.Lock()
+        self._frames: Deque[str] = deque()
+        self._bytes = 0
+        self._overflowed = False
+        self._wakeup = asyncio.Event()
+
+    def push(self, frame: str):
+        with self._lock:
+            if self._overflowed:
+                return
+            if self._bytes + len(frame) > self.max_queued_bytes:
+                # Slow consumer: drop everything and ask it to resync
+                self._frames.clear()
+                self._bytes = 0
+                self._overflowed = True
+            else:
+                self._frames.append(frame)
+                self._bytes += len(frame)
+        try:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+        except RuntimeError:
+            pass  # Loop already closed; the connection is gone
+
+    async def next_frames(self, timeout: float) -> List[str]:
+        """Wait up to `timeout` for frames; an empty list means time for a heartbeat."""
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            return []
+        self._wakeup.clear()
+        with self._lock:
+            if self._overflowed:
+                self._overflowed = False
+                self._frames.clear()
+                self._bytes = 0
+                return [RESYNC]
+            frames = list(self._frames)
+            self._frames.clear()
+            self._bytes = 0
+        return frames
+
+
+class EventBus:
+    def __init__(self, max_connections_per_user: int = 10, max_queued_bytes: int = 262144):
+        self.max_connections_per_user = max_connections_per_user
+        self.max_queued_bytes = max_queued_bytes
+        self._lock = threading.Lock()
+        self._subscribers: Dict[int, Set[Subscription]] = {}
+
+    def subscribe(self, user_id: int) -> Optional[Subscription]:
+        """A new connection's subscription, or None when the user has too many open."""
+        subscription = Subscription(user_id, asyncio.get_running_loop(), self.max_queued_bytes)
+        with self._lock:
+            subscriptions = self._subscribers.setdefault(user_id, set())
+            if len(subscriptions) >= self.max_connections_per_user:
+                return None
+            subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            subscriptions = self._subscribers.get(subscription.user_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscribers[subscription.user_id]
+
+    def connections(self) -> int:
+        with self._lock:
+            return sum(len(s) for s in self._subscribers.values())
+
+    def publish(self, user_id: int, frame: str):
+        with self._lock:
+            subscriptions = list(self._subscribers.get(user_id, ()))
+        for subscription in subscriptions:
+            subscription.push(frame)
+
+    def has_subscribers(self, user_id: int) -> bool:
+        # Unlocked read: a stale answer only skips or builds one event
+        return user_id in self._subscribers
+
+
+# ==========================================
+# Recording on a session, publishing on commit
+# ==========================================
+
+class _PendingEvents:
+    def __init__(self):
+        self.messages: List[Tuple[int, Dict]] = []
+        self.folders: Dict[Tuple[int, int], List[int]] = {}
+
+
+def _pending(session: Session) -> _PendingEvents:
+    pending = session.info.get(_PENDING)
+    if pending is None:
+        pending = session.info[_PENDING] = _PendingEvents()
+        # Listeners stay for the session's life (they can't be removed while
+        # dispatching); each commit or rollback takes whatever is pending
+        if not session.info.get(_HOOKED):
+            session.info[_HOOKED] = True
+            event.listen(session, "after_commit", _publish_pending)
+            event.listen(session, "after_rollback", _discard_pending)
+    return pending
+
+
+def _publish_pending(session: Session):
+    pending = session.info.pop(_PENDING, None)
+    if pending is None:
+        return
+    for user_id, data in pending.messages:
+        event_bus.publish(user_id, format_event("message", data))
+    for (user_id, folder_id), (unread, total) in pending.folders.items():
+        if unread or total:
+            event_bus.publish(user_id, format_event("folder", {"folder_id": folder_id, "unread": unread, "total": total}))
+
+
+def _discard_pending(session: Session):
+    session.info.pop(_PENDING, None)
+
+
+def record_message(session: Session, user_id: int, data: Dict):
+    """A new message header for `user_id`, published when `session` commits."""
+    if event_bus.has_subscribers(user_id):
+        _pending(session).messages.append((user_id, data))
+
+
+def record_folder_delta(session: Session, user_id: int, folder_id: int, unread: int, total: int):
+    """A folder counter change for `user_id`, merged with others in the same commit."""
+    if not event_bus.has_subscribers(user_id):
+        return
+    entry = _pending(session).folders.setdefault((user_id, folder_id), [0, 0])
+    entry[0] += unread
+    entry[1] += total
+
+
+# Global instance
+event_bus = EventBus(
+    max_connections_per_user=settings.EVENTS_MAX_CONNECTIONS_PER_USER if settings else 10,
+    max_queued_bytes=settings.EVENTS_MAX_QUEUED_BYTES if settings else 262144
+)
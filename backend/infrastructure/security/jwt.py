@@ -1,5 +1,7 @@
+import hashlib
+import secrets
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from jose import JWTError, jwt
 from ...config import settings
 
@@ -19,3 +21,15 @@ def decode_access_token(token: str):
         return payload
     except JWTError:
         return None
+
+def create_refresh_token() -> Tuple[str, str]:
+    """
+    A new opaque refresh token and its SHA-256 hex digest.
+    Only the digest is stored: 256 random bits need no slow hash, so checking
+    a token is a primary-key lookup rather than a bcrypt verification.
+    """
+    token = secrets.token_urlsafe(32)
+    return token, hash_refresh_token(token)
+
+def hash_refresh_token(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
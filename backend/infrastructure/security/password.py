@@ -1,9 +1,194 @@
+"""
+Password hashing and verification in a dedicated process pool.
+
+bcrypt is deliberately slow (~0.3 s of CPU per call) and used to run inside
+FastAPI's shared threadpool, so a burst of logins took threadpool slots and
+CPU from every other endpoint. The work now goes to a small pool of worker
+processes (`PASSWORD_HASH_WORKERS`). These run at lower scheduling priority,
+so request handling wins the CPU when both compete. The login and user
+creation endpoints are async and await the result (`verify_async`,
+`hash_async`), so no threadpool thread is held while bcrypt runs; the
+blocking `verify`/`hash` remain for startup and tools.
+
+At most `PASSWORD_HASH_MAX_PENDING` calls may be queued or running. Past
+that, ServiceBusyError is raised (503 at the API) instead of letting the
+queue, and login latency, grow without bound. With 0 workers the hashing
+runs inline, as it used to.
+"""
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Optional
 from passlib.context import CryptContext
+from ...core.exceptions import ServiceBusyError
+from ...config import settings
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
-def verify_password(plain_password, hashed_password):
+# Added to the workers' nice value: login storms yield the CPU to the web process
+WORKER_NICENESS = 5
+
+
+def _init_worker():
+    try:
+        os.nice(WORKER_NICENESS)
+    except (AttributeError, OSError):  # Not supported on this platform
+        pass
+
+
+def _verify(plain_password, hashed_password) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
-def get_password_hash(password):
+
+def _hash(password) -> str:
     return pwd_context.hash(password)
+
+
+class PasswordHasher:
+    """Bounded ProcessPoolExecutor for bcrypt; started lazily or by `start()`."""
+
+    def __init__(self, workers: int = 2, max_pending: int = 32):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.pending = 0  # Queued or running
+        self.peak_pending = 0
+        self.completed = 0
+        self.rejected_busy = 0
+        self.restarts = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: forking a process that runs the writer and SMTP threads is unsafe.
+                # Workers re-import __main__, so scripts starting the app need the usual
+                # `if __name__ == "__main__":` guard (uvicorn and gunicorn have it).
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker
+                )
+            return self._executor
+
+    def start(self):
+        """Spawn the workers now so the first logins don't pay for it."""
+        if self.workers <= 0:
+            return
+        executor = self._get_executor()
+        for future in [executor.submit(os.getpid) for _ in range(self.workers)]:
+            future.result()
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _reserve(self):
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected_busy += 1
+                raise ServiceBusyError("Too many sign-ins in progress. Please try again shortly.")
+            self.pending += 1
+            self.peak_pending = max(self.peak_pending, self.pending)
+
+    def _release(self, completed: bool):
+        with self._lock:
+            self.pending -= 1
+            if completed:
+                self.completed += 1
+
+    def _run(self, fn, *args):
+        if self.workers <= 0:
+            return fn(*args)
+        self._reserve()
+        completed = False
+        try:
+            try:
+                result = self._get_executor().submit(fn, *args).result()
+            except BrokenProcessPool:
+                # A worker died (e.g. OOM-killed); replace the pool and retry once
+                self._replace_broken()
+                result = self._get_executor().submit(fn, *args).result()
+            completed = True
+            return result
+        finally:
+            self._release(completed)
+
+    async def _run_async(self, fn, *args):
+        """Like `_run`, but awaits the worker instead of blocking a thread."""
+        loop = asyncio.get_running_loop()
+        if self.workers <= 0:
+            return await loop.run_in_executor(None, fn, *args)
+        self._reserve()
+        completed = False
+        try:
+            try:
+                result = await asyncio.wrap_future(self._get_executor().submit(fn, *args))
+            except BrokenProcessPool:
+                self._replace_broken()
+                result = await asyncio.wrap_future(self._get_executor().submit(fn, *args))
+            completed = True
+            return result
+        finally:
+            self._release(completed)
+
+    def _replace_broken(self):
+        with self._lock:
+            executor = self._executor
+            if executor is None or not getattr(executor, "_broken", False):
+                return  # Already replaced by another caller
+            self._executor = None
+            self.restarts += 1
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def verify(self, plain_password, hashed_password) -> bool:
+        return self._run(_verify, plain_password, hashed_password)
+
+    def hash(self, password) -> str:
+        return self._run(_hash, password)
+
+    async def verify_async(self, plain_password, hashed_password) -> bool:
+        return await self._run_async(_verify, plain_password, hashed_password)
+
+    async def hash_async(self, password) -> str:
+        return await self._run_async(_hash, password)
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "pending": self.pending,
+                "peak_pending": self.peak_pending,
+                "completed": self.completed,
+                "rejected_busy": self.rejected_busy,
+                "restarts": self.restarts,
+            }
+
+
+# Global instance
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS if settings else 2,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING if settings else 32
+)
+
+
+def verify_password(plain_password, hashed_password):
+    return password_hasher.verify(plain_password, hashed_password)
+
+
+def get_password_hash(password):
+    return password_hasher.hash(password)
+
+
+async def verify_password_async(plain_password, hashed_password):
+    return await password_hasher.verify_async(plain_password, hashed_password)
+
+
+async def get_password_hash_async(password):
+    return await password_hasher.hash_async(password)
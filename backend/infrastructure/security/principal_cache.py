@@ -0,0 +1,123 @@
+"""
+Cache of authenticated principals, keyed by access token.
+
+A hit skips JWT verification and the users lookup: the token string was
+verified when the entry was stored, and an entry never outlives the token's
+own `exp` or `ttl_seconds`. Entries are dropped as soon as a change to the
+user commits in this process (profile update, deactivation).
+
+Other worker processes learn of such changes through `users.version`, which
+every user update bumps: an entry is trusted for `revalidate_seconds`, after
+which a primary-key `SELECT version` (active users only) confirms it, as
+settings_cache does for the system settings. A deactivated user is therefore
+refused everywhere within `revalidate_seconds`.
+
+Cached users are stored without the derived email address, which callers
+add from the (separately cached) system settings.
+"""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import replace
+from typing import Callable, Dict, NamedTuple, Optional, Set
+from ...core.entities.user import User
+from ...config import settings
+
+
+class _Entry(NamedTuple):
+    user: User
+    version: int
+    expires_at: float
+    checked_at: float
+
+
+class PrincipalCache:
+    """Thread-safe LRU with per-entry expiry, version revalidation and per-user invalidation."""
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 30.0, revalidate_seconds: float = 1.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.revalidate_seconds = revalidate_seconds
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._tokens_by_user: Dict[int, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, token: str, current_version: Callable[[int], Optional[int]]) -> Optional[User]:
+        """
+        The cached user for `token`, or None. `current_version(user_id)` is
+        called (outside the lock) once an entry is due for revalidation; it
+        returns the stored version, or None for an unknown or inactive user.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            if now >= entry.expires_at:
+                self._remove(token)
+                return None
+            self._entries.move_to_end(token)
+
+        if now - entry.checked_at > self.revalidate_seconds:
+            if current_version(entry.user.id) != entry.version:
+                with self._lock:
+                    if self._entries.get(token) is entry:
+                        self._remove(token)
+                return None
+            with self._lock:
+                if self._entries.get(token) is entry:
+                    self._entries[token] = entry._replace(checked_at=time.monotonic())
+        # Callers may mutate what they get; never hand out the cached object
+        return replace(entry.user)
+
+    def put(self, token: str, user: User, version: int, token_exp: Optional[float] = None):
+        """
+        `version` is the user's `users.version` read together with `user`;
+        `token_exp` is the token's `exp` claim (epoch seconds), if any.
+        """
+        if self.max_entries <= 0 or self.ttl_seconds <= 0:
+            return
+        ttl = self.ttl_seconds
+        if token_exp is not None:
+            ttl = min(ttl, token_exp - time.time())
+            if ttl <= 0:
+                return
+
+        with self._lock:
+            if token in self._entries:
+                self._remove(token)
+            now = time.monotonic()
+            self._entries[token] = _Entry(replace(user, email_address=None), version, now + ttl, now)
+            self._tokens_by_user.setdefault(user.id, set()).add(token)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+
+    def invalidate_user(self, user_id: int):
+        with self._lock:
+            for token in list(self._tokens_by_user.get(user_id, ())):
+                self._remove(token)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tokens_by_user.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, token: str):
+        user = self._entries.pop(token).user
+        tokens = self._tokens_by_user.get(user.id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[user.id]
+
+
+# Global instance used by api.deps.get_current_user
+principal_cache = PrincipalCache(
+    max_entries=settings.PRINCIPAL_CACHE_SIZE if settings else 1024,
+    ttl_seconds=settings.PRINCIPAL_CACHE_SECONDS if settings else 30.0,
+    revalidate_seconds=settings.PRINCIPAL_CACHE_REVALIDATE_SECONDS if settings else 1.0
+)
@@ -0,0 +1,145 @@
+"""
+Background workers for queued sends.
+
+`POST /mail/send` only stores the message in the `outbox` table and answers
+202; these threads do the actual send (Sent copy, local delivery, SMTP relay)
+through `MailService.send_mail`.
+
+The Sent copy, the local deliveries and the status change away from `queued`
+commit together, so on restart every message still `queued` can simply be
+sent again. A message caught in `relaying` may or may not have reached its
+external recipients; it is marked failed rather than relayed twice.
+"""
+import logging
+import queue
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import List
+from .smtp_client import smtp_client
+from ..db.session import SessionLocal
+from ..db.repositories import (
+    EmailRepository, FolderRepository, UserRepository, SystemSettingsRepository, OutboxRepository, UnitOfWork
+)
+from ..db.writer import run_write, write_queue
+from ...core.entities.outbox import OutboxMessage
+from ...services.mail_service import MailService
+from ...config import settings
+
+logger = logging.getLogger("sandesh.outbox")
+
+# Finished messages (and their idempotency keys) are kept this long
+RETENTION = timedelta(days=1)
+PRUNE_INTERVAL_SECONDS = 3600.0
+
+_STOP = object()
+
+
+class OutboxWorkers:
+    def __init__(self, workers: int = 2):
+        self.workers = workers
+        self._queue: "queue.Queue" = queue.Queue()
+        self._threads: List[threading.Thread] = []
+        self._next_prune = 0.0
+        self._prune_lock = threading.Lock()
+
+    def start(self) -> int:
+        """
+        Crash recovery, then start the threads. Returns the number of
+        messages queued again from a previous run.
+        """
+        def recover(uow: UnitOfWork) -> List[int]:
+            for message_id in uow.outbox.ids_with_status(OutboxMessage.RELAYING):
+                uow.outbox.set_status(
+                    message_id, OutboxMessage.FAILED,
+                    "Interrupted while relaying; external recipients may not have received it"
+                )
+            return uow.outbox.ids_with_status(OutboxMessage.QUEUED)
+
+        with SessionLocal() as session:
+            backlog = run_write(write_queue, session, recover)
+
+        for message_id in backlog:
+            self._queue.put(message_id)
+        for n in range(self.workers):
+            thread = threading.Thread(target=self._loop, name=f"sandesh-outbox-{n}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return len(backlog)
+
+    def submit(self, message_id: int):
+        self._queue.put(message_id)
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def stop(self, timeout: float = 10.0):
+        """Stop after the sends in progress; queued messages stay queued in the database."""
+        for _ in self._threads:
+            self._queue.put(_STOP)
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def _loop(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            try:
+                self._send(item)
+                self._maybe_prune()
+            except Exception as e:  # Never let a worker die; the row stays queued
+                logger.exception(f"Outbox message {item} failed unexpectedly: {e}")
+
+    def _send(self, message_id: int):
+        with SessionLocal() as session:
+            message = OutboxRepository(session).get(message_id)
+            if message is None or message.status != OutboxMessage.QUEUED:
+                return
+
+            sender = UserRepository(session).get_by_id(message.user_id)
+            if sender is None or not sender.is_active:
+                self._fail(session, message_id, "Sender account is no longer active")
+                return
+
+            mail_service = MailService(
+                EmailRepository(session),
+                FolderRepository(session),
+                UserRepository(session),
+                smtp_client,
+                SystemSettingsRepository(session),
+                writer=write_queue
+            )
+            try:
+                mail_service.send_mail(
+                    sender_user=sender,
+                    to=message.to,
+                    subject=message.subject,
+                    body=message.body,
+                    cc=message.cc,
+                    outbox_id=message_id
+                )
+            except Exception as e:
+                logger.warning(f"Sending outbox message {message_id} failed: {e}")
+                self._fail(session, message_id, str(e))
+
+    def _fail(self, session, message_id: int, error: str):
+        run_write(write_queue, session, lambda uow: uow.outbox.set_status(message_id, OutboxMessage.FAILED, error))
+
+    def _maybe_prune(self):
+        with self._prune_lock:
+            if time.monotonic() < self._next_prune:
+                return
+            self._next_prune = time.monotonic() + PRUNE_INTERVAL_SECONDS
+
+        with SessionLocal() as session:
+            removed = run_write(
+                write_queue, session, lambda uow: uow.outbox.prune(datetime.utcnow() - RETENTION)
+            )
+        if removed:
+            logger.info(f"Pruned {removed} finished outbox message(s)")
+
+
+# Global instance, started and stopped by the application lifespan
+outbox_workers = OutboxWorkers(workers=settings.OUTBOX_WORKERS if settings else 2)
@@ -1,11 +1,36 @@
+import logging
 import smtplib
+import threading
+import time
 from email.message import EmailMessage
-from typing import List
+from typing import List, Tuple
+from ...config import settings
+
+logger = logging.getLogger("sandesh.smtp.client")
+
+# Idle sessions older than this get a NOOP before reuse
+HEALTH_CHECK_AFTER_SECONDS = 5.0
+
 
 class SMTPClient:
-    def __init__(self, hostname: str = "localhost", port: int = 2525):
+    """
+    ⚡ Bolt: Keeps up to `pool_size` SMTP sessions open between messages, so
+    bursts don't pay TCP connect, greeting and EHLO per message. Sessions are
+    checked out one per send (thread-safe); senders beyond `pool_size` wait.
+
+    A session idle for a while is probed with NOOP before reuse; one left
+    mid-transaction by a rejected message is cleared with RSET. Broken
+    sessions are dropped, and a send on a reused session the server already
+    closed is retried once on a fresh connection.
+    """
+
+    def __init__(self, hostname: str = "localhost", port: int = 2525, pool_size: int = 4, timeout: float = 30.0):
         self.hostname = hostname
         self.port = port
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self._lock = threading.Lock()
+        self._idle: List[Tuple[smtplib.SMTP, float]] = []  # (session, last used), most recent last
 
     def send_message(self, sender: str, recipients: List[str], subject: str, body: str, cc: List[str] = None):
         """
@@ -17,17 +42,90 @@ class SMTPClient:
         msg["From"] = sender
         msg["To"] = ", ".join(recipients)
 
+        # CC recipients are part of the envelope too
+        envelope = list(recipients)
         if cc:
             msg["Cc"] = ", ".join(cc)
-            # Add CC to the list of recipients for the envelope
-            recipients.extend(cc)
+            envelope.extend(cc)
+
+        with self._slots:
+            for attempt in range(2):
+                smtp, reused = self._checkout(fresh=attempt > 0)
+                try:
+                    smtp.send_message(msg, to_addrs=envelope)
+                except smtplib.SMTPServerDisconnected:
+                    self._discard(smtp)
+                    if reused and attempt == 0:
+                        logger.debug("Pooled SMTP session was closed by the server, reconnecting")
+                        continue
+                    raise
+                except smtplib.SMTPException:
+                    # Rejected by the server; the session itself may still be fine
+                    self._reset(smtp)
+                    raise
+                except Exception:
+                    self._discard(smtp)
+                    raise
+                self._checkin(smtp)
+                return
+
+    def close(self):
+        """Quit all idle sessions (application shutdown)."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for smtp, _ in idle:
+            self._discard(smtp)
+
+    # ------------------------------------------
+    # Pool
+    # ------------------------------------------
+
+    def _checkout(self, fresh: bool = False) -> Tuple[smtplib.SMTP, bool]:
+        """An open session and whether it was reused from the pool."""
+        while not fresh:
+            with self._lock:
+                if not self._idle:
+                    break
+                smtp, last_used = self._idle.pop()
+            if time.monotonic() - last_used < HEALTH_CHECK_AFTER_SECONDS or self._healthy(smtp):
+                return smtp, True
+            self._discard(smtp)
+        return self._connect(), False
 
+    def _checkin(self, smtp: smtplib.SMTP):
+        with self._lock:
+            self._idle.append((smtp, time.monotonic()))
+
+    def _connect(self) -> smtplib.SMTP:
+        smtp = smtplib.SMTP(self.hostname, self.port, timeout=self.timeout)
+        try:
+            smtp.ehlo_or_helo_if_needed()
+        except Exception:
+            self._discard(smtp)
+            raise
+        return smtp
+
+    def _healthy(self, smtp: smtplib.SMTP) -> bool:
+        try:
+            return smtp.noop()[0] == 250
+        except Exception:
+            return False
+
+    def _reset(self, smtp: smtplib.SMTP):
         try:
-            with smtplib.SMTP(self.hostname, self.port) as smtp:
-                smtp.send_message(msg)
-        except Exception as e:
-            # Re-raise as a generic exception or log it?
-            # Service layer will handle exceptions, but we should probably wrap it
-            # if we wanted strict custom exceptions.
-            # For now, let's allow it to bubble up or wrap in a generic infrastructure error.
-            raise e
+            if smtp.rset()[0] == 250:
+                self._checkin(smtp)
+                return
+        except Exception:
+            pass
+        self._discard(smtp)
+
+    def _discard(self, smtp: smtplib.SMTP):
+        try:
+            smtp.quit()
+        except Exception:
+            smtp.close()
+
+
+# Shared client: the pool only helps if requests reuse it
+smtp_client = SMTPClient(pool_size=settings.SMTP_CLIENT_POOL_SIZE if settings else 4)
@@ -1,19 +1,288 @@
 import asyncio
 import logging
 import email
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 from email import policy
+from typing import Dict, List, Tuple
 from aiosmtpd.controller import Controller
-from .smtp_client import SMTPClient
+from .smtp_client import smtp_client
+from .spool import MailSpool, default_spool_dir
 from ..db.session import SessionLocal
-from ..db.repositories import EmailRepository, FolderRepository, UserRepository
+from ..db.repositories import (
+    EmailRepository, FolderRepository, UserRepository, SpoolReceiptRepository, UnitOfWork
+)
+from ..db.writer import run_write, write_queue
 from ...services.mail_service import MailService
 from ...config import settings
-import time
-from sqlalchemy.exc import OperationalError
 
 logger = logging.getLogger("sandesh.smtp")
 
+# Receipts only matter while a delivered message's spool file may still exist
+RECEIPT_RETENTION = timedelta(days=1)
+
+_STOP = object()
+
+
+class DeliveryMetrics:
+    """
+    Counters for the SMTP spool and its delivery workers.
+    Updated from the event loop and worker threads; read by the admin API.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.workers = 0
+        self.max_pending = 0
+        self.pending = 0  # Acknowledged (spooled), not delivered yet
+        self.peak_pending = 0
+        self.spooled = 0
+        self.delivered = 0
+        self.failed = 0
+        self.batches = 0
+        self.rejected_busy = 0
+
+    def configure(self, workers: int, max_pending: int):
+        with self._lock:
+            self.workers = workers
+            self.max_pending = max_pending
+
+    def restore(self, backlog: int):
+        """Count messages recovered from the spool at startup."""
+        with self._lock:
+            self.pending += backlog
+            self.peak_pending = max(self.peak_pending, self.pending)
+
+    def try_reserve(self) -> bool:
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected_busy += 1
+                return False
+            self.pending += 1
+            self.peak_pending = max(self.peak_pending, self.pending)
+            return True
+
+    def cancel(self):
+        """Undo a reservation for a message that never reached the spool."""
+        with self._lock:
+            self.pending -= 1
+
+    def record_spooled(self):
+        with self._lock:
+            self.spooled += 1
+
+    def record_batch(self):
+        with self._lock:
+            self.batches += 1
+
+    def release(self, delivered: bool):
+        with self._lock:
+            self.pending -= 1
+            if delivered:
+                self.delivered += 1
+            else:
+                self.failed += 1
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "pending": self.pending,
+                "peak_pending": self.peak_pending,
+                "spooled": self.spooled,
+                "delivered": self.delivered,
+                "failed": self.failed,
+                "batches": self.batches,
+                "rejected_busy": self.rejected_busy,
+            }
+
+
+# Global metrics, exposed at /api/system/smtp
+delivery_metrics = DeliveryMetrics()
+
+
+def parse_message(data: bytes) -> Tuple[str, str]:
+    """Extract (subject, text body) from raw message bytes."""
+    message = email.message_from_bytes(data, policy=policy.default)
+    subject = message.get("subject", "")
+
+    # Extract body
+    body = ""
+    if message.is_multipart():
+        for part in message.walk():
+            if part.get_content_type() == "text/plain":
+                body = part.get_content()
+                break
+    else:
+        body = message.get_content()
+    return subject, body
+
+
+def _mail_service(db_session) -> MailService:
+    # Reads use the given session; writes are jobs on the shared writer
+    # SMTP Client isn't needed for delivery, but MailService constructor requires it.
+    return MailService(
+        EmailRepository(db_session),
+        FolderRepository(db_session),
+        UserRepository(db_session),
+        smtp_client,
+        writer=write_queue
+    )
+
+
+class SpoolDeliveryWorkers:
+    """
+    Threads that drain the spool into the database.
+
+    Each worker takes up to `batch_size` queued messages, parses them and
+    stores them all in one write job together with their delivery receipts.
+    If the batch fails, its messages are retried one per transaction so a
+    single bad message cannot hold up the rest; messages that still fail
+    are moved to the spool's failed/ directory.
+    """
+
+    def __init__(self, spool: MailSpool, workers: int = 2, batch_size: int = 32):
+        self.spool = spool
+        self.workers = workers
+        self.batch_size = batch_size
+        self._queue: "queue.Queue" = queue.Queue()
+        self._threads: List[threading.Thread] = []
+
+    def start(self, backlog: List[str]):
+        for spool_id in backlog:
+            self._queue.put(spool_id)
+        for n in range(self.workers):
+            thread = threading.Thread(target=self._loop, name=f"sandesh-spool-delivery-{n}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, spool_id: str):
+        self._queue.put(spool_id)
+
+    def stop(self, timeout: float = 10.0):
+        """Stop after the current batches; undelivered mail stays spooled on disk."""
+        for _ in self._threads:
+            self._queue.put(_STOP)
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def _loop(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+
+            batch = [item]
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    self._queue.put(_STOP)  # Leave it for the next get
+                    break
+                batch.append(item)
+
+            try:
+                self._deliver_batch(batch)
+            except Exception as e:  # Never let a worker die; the files stay spooled
+                logger.exception(f"Spool batch failed unexpectedly: {e}")
+
+    def _deliver_batch(self, spool_ids: List[str]):
+        messages = []
+        for spool_id in spool_ids:
+            try:
+                message = self.spool.read(spool_id)
+                subject, body = parse_message(message.data)
+            except Exception as e:
+                logger.error(f"Cannot parse spooled message {spool_id}, moving to failed/: {e}")
+                self.spool.fail(spool_id)
+                delivery_metrics.release(delivered=False)
+                continue
+            messages.append((message, subject, body))
+
+        if not messages:
+            return
+
+        try:
+            self._store(messages)
+            delivered = messages
+        except Exception as e:
+            logger.warning(f"Delivery of {len(messages)} spooled message(s) failed, retrying one by one: {e}")
+            delivered = []
+            for entry in messages:
+                try:
+                    self._store([entry])
+                    delivered.append(entry)
+                except Exception as e:
+                    logger.error(f"Cannot deliver spooled message {entry[0].spool_id}, moving to failed/: {e}")
+                    self.spool.fail(entry[0].spool_id)
+                    delivery_metrics.release(delivered=False)
+
+        for message, _, _ in delivered:
+            self.spool.remove(message.spool_id)
+            delivery_metrics.release(delivered=True)
+
+    def _store(self, messages):
+        with SessionLocal() as db_session:
+            mail_service = _mail_service(db_session)
+            jobs = [
+                (message.spool_id, mail_service.prepare_delivery(message.mail_from, list(message.rcpt_tos), subject, body))
+                for message, subject, body in messages
+            ]
+
+            def batch_job(uow: UnitOfWork):
+                for spool_id, job in jobs:
+                    # A receipt that already exists means a crash hit after
+                    # this message committed but before its file was removed
+                    if uow.spool_receipts.record(spool_id) and job is not None:
+                        job(uow)
+                uow.spool_receipts.prune(datetime.utcnow() - RECEIPT_RETENTION)
+
+            run_write(write_queue, db_session, batch_job)
+        delivery_metrics.record_batch()
+
+
 class SandeshSMTPHandler:
+    """
+    ⚡ Bolt: DATA is acknowledged as soon as the message is fsynced to the spool
+    (on a small thread pool, off the event loop); delivery workers move it
+    into the database in batches afterwards. Bursts queue on disk instead of
+    being rejected. Only when `max_pending` messages are already waiting does
+    the server answer a temporary 451, which senders retry.
+    """
+
+    def __init__(
+        self, spool: MailSpool, workers: int = 2, batch_size: int = 32, max_pending: int = 10000,
+        spool_writers: int = 4
+    ):
+        self.spool = spool
+        self.delivery = SpoolDeliveryWorkers(spool, workers=workers, batch_size=batch_size)
+        # Threads doing spool appends (each ends in an fsync)
+        self.executor = ThreadPoolExecutor(max_workers=spool_writers, thread_name_prefix="sandesh-smtp-spool")
+        delivery_metrics.configure(workers, max_pending)
+
+    def start(self) -> int:
+        """
+        Crash recovery, then start delivering. Messages acknowledged before a
+        shutdown or crash are queued again; ones whose delivery had already
+        committed are only removed. Returns the number queued for delivery.
+        """
+        backlog = self.spool.recover()
+        with SessionLocal() as db_session:
+            already_delivered = SpoolReceiptRepository(db_session).delivered(backlog)
+        for spool_id in already_delivered:
+            self.spool.remove(spool_id)
+        backlog = [spool_id for spool_id in backlog if spool_id not in already_delivered]
+
+        delivery_metrics.restore(len(backlog))
+        self.delivery.start(backlog)
+        return len(backlog)
+
     async def handle_DATA(self, server, session, envelope):
         peer = session.peer
         mail_from = envelope.mail_from
@@ -22,66 +291,39 @@ class SandeshSMTPHandler:
 
         logger.info(f"Receiving mail from {mail_from} to {rcpt_tos}")
 
-        # Parse the email
-        message = email.message_from_bytes(data, policy=policy.default)
-        subject = message.get("subject", "")
+        if not delivery_metrics.try_reserve():
+            logger.warning(f"Spool backlog full, deferring mail from {mail_from}")
+            return '451 4.3.2 Delivery queue full, try again later'
 
-        # Extract body
-        body = ""
-        if message.is_multipart():
-            for part in message.walk():
-                if part.get_content_type() == "text/plain":
-                    body = part.get_content()
-                    break
-        else:
-            body = message.get_content()
+        try:
+            loop = asyncio.get_running_loop()
+            spool_id = await loop.run_in_executor(self.executor, self.spool.append, mail_from, rcpt_tos, data)
+        except Exception as e:
+            delivery_metrics.cancel()
+            logger.error(f"Could not spool mail from {mail_from}: {e}")
+            return '451 4.3.0 Could not queue message, try again later'
 
-        # Retry mechanism for handling database locking issues
-        max_retries = 3
-        for attempt in range(max_retries):
-            try:
-                # Create fresh session and services for this message
-                # Since the service is now sync, we use the sync session context manager.
-                # This will block the asyncio loop for the duration of DB operations.
-                # Given "SMTP handlers can also safely use sync sessions" and "Human-paced email traffic",
-                # this is acceptable.
-                with SessionLocal() as db_session:
-                    user_repo = UserRepository(db_session)
-                    folder_repo = FolderRepository(db_session)
-                    email_repo = EmailRepository(db_session)
-                    # SMTP Client isn't needed for delivery, but MailService constructor requires it.
-                    smtp_client = SMTPClient()
-
-                    mail_service = MailService(email_repo, folder_repo, user_repo, smtp_client)
-
-                    # Call the sync service method
-                    mail_service.deliver_incoming_mail(
-                        sender=mail_from,
-                        recipients=rcpt_tos,
-                        subject=subject,
-                        body=body
-                    )
-
-                    db_session.commit()
-
-                return '250 OK'
-            except OperationalError as e:
-                if "database is locked" in str(e) and attempt < max_retries - 1:
-                    logger.warning(f"Database locked, retrying ({attempt + 1}/{max_retries}): {e}")
-                    time.sleep(0.1 * (attempt + 1))  # Exponential backoff
-                    continue
-                else:
-                    logger.error(f"Failed to deliver mail after {max_retries} attempts: {e}")
-                    db_session.rollback()
-                    return '554 Transaction failed'
-            except Exception as e:
-                logger.error(f"Unexpected error during mail delivery: {e}")
-                return '554 Transaction failed'
+        delivery_metrics.record_spooled()
+        self.delivery.submit(spool_id)
+        return '250 OK'
+
+    def shutdown(self):
+        """Finish in-progress spool writes and delivery batches."""
+        self.executor.shutdown(wait=True)
+        self.delivery.stop()
 
-        return '554 Transaction failed after retries'
 
 def create_smtp_controller(hostname="0.0.0.0", port=2525):
-    handler = SandeshSMTPHandler()
+    spool_dir = (settings.SMTP_SPOOL_DIR if settings else "") or default_spool_dir(
+        settings.DATABASE_URL if settings else ""
+    )
+    handler = SandeshSMTPHandler(
+        MailSpool(spool_dir),
+        workers=settings.SMTP_DELIVERY_WORKERS if settings else 2,
+        batch_size=settings.SMTP_SPOOL_BATCH if settings else 32,
+        max_pending=settings.SMTP_MAX_PENDING if settings else 10000,
+        spool_writers=settings.SMTP_SPOOL_WRITERS if settings else 4
+    )
     # 🛡️ Sentinel: Set strict data size limit (200KB) to prevent DoS via large emails.
     # This aligns with the API limit of 100KB body + headers overhead.
     controller = Controller(handler, hostname=hostname, port=port, data_size_limit=204800)
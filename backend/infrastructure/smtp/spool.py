@@ -0,0 +1,136 @@
+"""
+Durable on-disk spool for incoming SMTP mail.
+
+`handle_DATA` only answers 250 once the message is safely on disk, so the
+sender never waits on the database. Layout (Maildir style):
+
+    tmp/     being written; never acknowledged, discarded on recovery once stale
+    new/     acknowledged, waiting for delivery (removed once delivered)
+    failed/  could not be delivered; move back to new/ and restart to retry
+
+A spool file is one JSON envelope line followed by the raw message bytes.
+Files are fsynced and renamed into new/ (then the directory is fsynced), so
+an acknowledged message survives a crash or power loss.
+"""
+import itertools
+import json
+import logging
+import os
+import socket
+import time
+from dataclasses import dataclass
+from typing import List, Tuple
+
+logger = logging.getLogger("sandesh.spool")
+
+TMP = "tmp"
+NEW = "new"
+FAILED = "failed"
+
+# Files in tmp/ younger than this may belong to another process sharing the
+# spool directory (an append takes milliseconds); only older ones are leftovers
+TMP_GRACE_SECONDS = 3600
+
+
+@dataclass(frozen=True)
+class SpooledMessage:
+    spool_id: str
+    mail_from: str
+    rcpt_tos: Tuple[str, ...]
+    data: bytes
+
+
+def default_spool_dir(database_url: str) -> str:
+    """`spool/` next to the SQLite file, or under the working directory."""
+    if database_url.startswith("sqlite:///") and ":memory:" not in database_url:
+        db_path = database_url[len("sqlite:///"):]
+        return os.path.join(os.path.dirname(db_path) or ".", "spool")
+    return os.path.abspath("spool")
+
+
+class MailSpool:
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._counter = itertools.count()
+        self._hostname = socket.gethostname().replace("/", "_").replace(".", "_") or "localhost"
+        for sub in (TMP, NEW, FAILED):
+            os.makedirs(os.path.join(directory, sub), exist_ok=True)
+
+    def _path(self, sub: str, spool_id: str) -> str:
+        return os.path.join(self.directory, sub, spool_id)
+
+    def append(self, mail_from: str, rcpt_tos: List[str], data: bytes) -> str:
+        """Durably store a message and return its spool id. Blocking (fsync)."""
+        # Time-ordered and unique across processes and hosts sharing the directory (Maildir style)
+        spool_id = f"{time.time_ns():020d}.{os.getpid()}_{next(self._counter)}.{self._hostname}"
+        envelope = json.dumps({"mail_from": mail_from, "rcpt_tos": list(rcpt_tos)})
+
+        tmp_path = self._path(TMP, spool_id)
+        with open(tmp_path, "wb") as f:
+            f.write(envelope.encode("utf-8") + b"\n")
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.rename(tmp_path, self._path(NEW, spool_id))
+        self._fsync_dir(NEW)
+        return spool_id
+
+    def read(self, spool_id: str) -> SpooledMessage:
+        with open(self._path(NEW, spool_id), "rb") as f:
+            envelope = json.loads(f.readline())
+            data = f.read()
+        return SpooledMessage(
+            spool_id=spool_id,
+            mail_from=envelope["mail_from"],
+            rcpt_tos=tuple(envelope["rcpt_tos"]),
+            data=data
+        )
+
+    def remove(self, spool_id: str):
+        """Forget a delivered message."""
+        try:
+            os.unlink(self._path(NEW, spool_id))
+        except FileNotFoundError:
+            pass
+
+    def fail(self, spool_id: str):
+        """Park an undeliverable message for an operator to inspect."""
+        try:
+            os.rename(self._path(NEW, spool_id), self._path(FAILED, spool_id))
+        except FileNotFoundError:
+            pass
+
+    def pending(self) -> List[str]:
+        """Spool ids waiting for delivery, oldest first."""
+        return sorted(os.listdir(os.path.join(self.directory, NEW)))
+
+    def recover(self, grace_seconds: float = TMP_GRACE_SECONDS) -> List[str]:
+        """
+        Startup cleanup: drop half-written files (never acknowledged) older
+        than `grace_seconds`, and return the acknowledged messages still
+        waiting for delivery. Younger tmp files are left alone: another
+        process sharing the directory may still be writing them.
+        """
+        tmp_dir = os.path.join(self.directory, TMP)
+        cutoff = time.time() - grace_seconds
+        for name in os.listdir(tmp_dir):
+            path = os.path.join(tmp_dir, name)
+            try:
+                if os.stat(path).st_mtime < cutoff:
+                    os.unlink(path)
+            except FileNotFoundError:
+                pass  # Renamed into new/ or removed meanwhile
+        return self.pending()
+
+    def _fsync_dir(self, sub: str):
+        # Makes the rename itself durable; not supported on every platform
+        try:
+            fd = os.open(os.path.join(self.directory, sub), os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
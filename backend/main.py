@@ -1,19 +1,23 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import PlainTextResponse
 import contextlib
 import logging
 import os
 
 from .infrastructure.db.session import engine, Base, SessionLocal
+from .infrastructure.db.migrations import run_migrations
 from .infrastructure.db.repositories import UserRepository, FolderRepository, SystemSettingsRepository
+from .infrastructure.db.writer import write_queue
 from .infrastructure.db.models import UserModel, SystemSettingsModel
-from .infrastructure.security.password import get_password_hash
+from .infrastructure.security.password import get_password_hash, password_hasher
 from .infrastructure.security.headers import SecurityHeadersMiddleware
 from .infrastructure.smtp.smtp_server import create_smtp_controller
-from .api import auth, users, folders, mail, system
+from .infrastructure.smtp.smtp_client import smtp_client
+from .infrastructure.smtp.outbox import outbox_workers
+from .api import auth, users, folders, mail, system, events
+from .api.static_assets import StaticAssets
 from .config import settings
 from .core.entities.user import User
 
@@ -31,6 +35,14 @@ async def lifespan(app: FastAPI):
     # Initialize DB Tables
     Base.metadata.create_all(engine)
 
+    # Bring existing databases up to date (indexes, columns added since creation)
+    applied = run_migrations(engine)
+    if applied:
+        logger.info(f"Applied schema migrations: {applied}")
+
+    # bcrypt runs in worker processes; spawn them before the first login
+    password_hasher.start()
+
     # Initialize System Settings and Admin User
     with SessionLocal() as session:
         try:
@@ -80,16 +92,32 @@ async def lifespan(app: FastAPI):
             logger.error(f"Error during setup: {e}")
             raise
 
-    # Start SMTP Server
+    # All runtime mutations go through the single writer thread
+    write_queue.start()
+
+    # Start SMTP Server (recovering mail spooled before a shutdown or crash)
     smtp_controller = create_smtp_controller()
+    recovered = smtp_controller.handler.start()
+    if recovered:
+        logger.info(f"Re-queued {recovered} spooled message(s) for delivery")
     smtp_controller.start()
     logger.info("SMTP Server started on port 2525")
 
+    # Background sends (after SMTP, which relayed mail goes through)
+    requeued = outbox_workers.start()
+    if requeued:
+        logger.info(f"Re-queued {requeued} outbox message(s) for sending")
+
     yield
 
     # Shutdown
+    outbox_workers.stop()
+    smtp_client.close()
     smtp_controller.stop()
+    smtp_controller.handler.shutdown()
     logger.info("SMTP Server stopped")
+    write_queue.stop()
+    password_hasher.shutdown()
 
 
 app = FastAPI(title="Sandesh", lifespan=lifespan, docs_url="/api/docs", redoc_url="/api/redoc")
@@ -121,6 +149,7 @@ app.include_router(users.router, prefix="/api/users", tags=["Users"])
 app.include_router(folders.router, prefix="/api/folders", tags=["Folders"])
 app.include_router(mail.router, prefix="/api", tags=["Mail"])
 app.include_router(system.router, prefix="/api/system", tags=["System"])
+app.include_router(events.router, prefix="/api", tags=["Events"])
 
 
 # Health check endpoint (includes namespace info)
@@ -158,21 +187,42 @@ for path in possible_paths:
         break
 
 if static_dir:
-    # Mount static files for assets
-    app.mount("/assets", StaticFiles(directory=os.path.join(static_dir, "assets")), name="assets")
-    logger.info(f"Serving frontend from: {static_dir}")
-    
+    # ⚡ Bolt: The build is read and compressed once; requests are answered from memory
+    # with the precompressed variant the client accepts, so GZipMiddleware no longer
+    # recompresses the same bundles and index.html is no longer re-read from disk.
+    static_assets = StaticAssets(static_dir)
+    loaded = static_assets.load()
+    logger.info(
+        f"Serving frontend from: {static_dir} ({loaded} files, "
+        f"{static_assets.sizes['identity'] // 1024} KB; gzip {static_assets.sizes['gzip'] // 1024} KB, "
+        f"br {static_assets.sizes['br'] // 1024} KB)"
+    )
+
+    def serve_static(rel: str, request: Request):
+        return static_assets.response(
+            rel, request.headers.get("accept-encoding"), request.headers.get("if-none-match")
+        )
+
+    # Hashed bundles, cached by browsers as immutable
+    @app.api_route("/assets/{path:path}", methods=["GET", "HEAD"], include_in_schema=False)
+    async def serve_asset(path: str, request: Request):
+        response = serve_static(f"assets/{path}", request)
+        if response is None:
+            return PlainTextResponse("Not Found", status_code=404)
+        return response
+
     # Serve specific static files
     @app.get("/vite.svg")
-    async def serve_vite_svg():
-        return FileResponse(os.path.join(static_dir, "vite.svg"))
+    async def serve_vite_svg(request: Request):
+        return serve_static("vite.svg", request) or PlainTextResponse("Not Found", status_code=404)
     
     @app.get("/favicon.ico")
-    async def serve_favicon():
-        favicon_path = os.path.join(static_dir, "favicon.ico")
-        if os.path.exists(favicon_path):
-            return FileResponse(favicon_path)
-        return FileResponse(os.path.join(static_dir, "vite.svg"))
+    async def serve_favicon(request: Request):
+        return (
+            serve_static("favicon.ico", request)
+            or serve_static("vite.svg", request)
+            or PlainTextResponse("Not Found", status_code=404)
+        )
     
     # SPA catch-all route - must be defined last
     @app.get("/{full_path:path}")
@@ -181,9 +231,9 @@ if static_dir:
         if full_path.startswith("api/"):
             return {"error": "Not found"}, 404
         
-        index_path = os.path.join(static_dir, "index.html")
-        if os.path.exists(index_path):
-            return FileResponse(index_path)
+        response = serve_static("index.html", request)
+        if response is not None:
+            return response
         
         return {"error": "Frontend not found"}, 404
 else:
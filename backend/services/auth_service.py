@@ -1,35 +1,49 @@
-from typing import Optional
+import secrets
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+from starlette.concurrency import run_in_threadpool
 from ..core.entities.user import User
 from ..core.exceptions import AuthenticationError
-from ..infrastructure.db.repositories import UserRepository
-from ..infrastructure.security.password import verify_password, get_password_hash
-from ..infrastructure.security.jwt import create_access_token
+from ..infrastructure.db.repositories import UserRepository, RefreshTokenRepository, UnitOfWork
+from ..infrastructure.db.writer import WriteQueue, run_write
+from ..infrastructure.security.password import verify_password_async
+from ..infrastructure.security.jwt import create_access_token, create_refresh_token, hash_refresh_token
+from ..config import settings
 
 # 🛡️ Sentinel: Pre-calculated dummy hash for constant-time verification
 # This matches the work factor of real passwords (default bcrypt rounds)
 DUMMY_HASH = '$2b$12$EixZaYVK1fsbw1ZfbX3OXePaWxwKc.60VF/wzF/X1WzF/X1WzF/X1'
 
+# A token rotated this recently may be presented again by a concurrent
+# refresh (another tab); that is refused, but not treated as theft
+REFRESH_REUSE_GRACE = timedelta(seconds=30)
+
+
 class AuthService:
-    def __init__(self, user_repo: UserRepository):
+    def __init__(self, user_repo: UserRepository, writer: Optional[WriteQueue] = None):
         self.user_repo = user_repo
+        self.writer = writer
 
-    def authenticate_user(self, username: str, password: str) -> Optional[User]:
+    async def authenticate_user(self, username: str, password: str) -> Optional[User]:
         """
         Authenticate a user with username and password.
         Returns User if valid, None otherwise.
 
         Protected against timing attacks:
         Execution time is consistent regardless of whether the user exists.
+
+        ⚡ Bolt: Async so bcrypt is awaited in the password pool; only the
+        user lookup briefly takes a threadpool thread.
         """
-        user = self.user_repo.get_by_username(username)
+        user = await run_in_threadpool(self.user_repo.get_by_username, username)
 
         if not user:
             # 🛡️ Sentinel: Mitigate timing attacks (user enumeration)
             # Perform a dummy verification to consume the same amount of time
-            verify_password(password, DUMMY_HASH)
+            await verify_password_async(password, DUMMY_HASH)
             return None
 
-        if not verify_password(password, user.password_hash):
+        if not await verify_password_async(password, user.password_hash):
             return None
 
         return user
@@ -37,3 +51,85 @@ class AuthService:
     def create_token(self, user: User) -> str:
         """Create JWT access token for the user."""
         return create_access_token(data={"sub": user.username})
+
+    def create_refresh_token(self, user: User) -> str:
+        """Start a new refresh token family for a password login."""
+        token, token_hash = create_refresh_token()
+        family_id = secrets.token_hex(16)
+
+        def job(uow: UnitOfWork):
+            now = datetime.utcnow()
+            # Logins are rare next to refreshes; a good time to drop expired rows
+            uow.refresh_tokens.prune(now)
+            uow.refresh_tokens.add(token_hash, user.id, family_id, now + self._refresh_lifetime())
+
+        run_write(self.writer, self.user_repo.session, job)
+        return token
+
+    def refresh(self, refresh_token: str) -> Tuple[User, str]:
+        """
+        Exchange a refresh token for its user and a rotated replacement.
+
+        The presented token is revoked either way. A token that was already
+        rotated away (outside the grace period) has been copied: every token
+        of its family is revoked, signing out whoever holds the live one.
+
+        Raises:
+            AuthenticationError: If the token is unknown, expired, revoked, or the user is inactive
+        """
+        token_hash = hash_refresh_token(refresh_token)
+        repo = RefreshTokenRepository(self.user_repo.session)
+        # Unknown tokens are refused without a trip through the writer
+        if repo.get(token_hash) is None and repo.get_revocation(token_hash) is None:
+            raise AuthenticationError("Invalid refresh token")
+
+        new_token, new_hash = create_refresh_token()
+
+        def job(uow: UnitOfWork) -> Optional[User]:
+            now = datetime.utcnow()
+            live = uow.refresh_tokens.get(token_hash)
+            if live is None:
+                revoked = uow.refresh_tokens.get_revocation(token_hash)
+                if (
+                    revoked is not None
+                    and revoked.reason == RefreshTokenRepository.ROTATED
+                    and now - revoked.revoked_at > REFRESH_REUSE_GRACE
+                ):
+                    uow.refresh_tokens.revoke_family(revoked.family_id, RefreshTokenRepository.REUSED)
+                return None
+
+            if live.expires_at <= now:
+                uow.refresh_tokens.revoke(token_hash, RefreshTokenRepository.EXPIRED)
+                return None
+
+            user = uow.users.get_by_id(live.user_id)
+            if user is None or not user.is_active:
+                uow.refresh_tokens.revoke_family(live.family_id, RefreshTokenRepository.DEACTIVATED)
+                return None
+
+            uow.refresh_tokens.revoke(token_hash, RefreshTokenRepository.ROTATED)
+            uow.refresh_tokens.add(new_hash, user.id, live.family_id, now + self._refresh_lifetime())
+            return user
+
+        # Returns rather than raises on refusal, so family revocations commit
+        user = run_write(self.writer, self.user_repo.session, job)
+        if user is None:
+            raise AuthenticationError("Invalid refresh token")
+        return user, new_token
+
+    def revoke_refresh_token(self, refresh_token: str):
+        """Sign out: revoke the token and the rest of its family."""
+        token_hash = hash_refresh_token(refresh_token)
+        repo = RefreshTokenRepository(self.user_repo.session)
+        live = repo.get(token_hash)
+        if live is None:
+            return
+
+        run_write(
+            self.writer,
+            self.user_repo.session,
+            lambda uow: uow.refresh_tokens.revoke_family(live.family_id, RefreshTokenRepository.LOGOUT)
+        )
+
+    def _refresh_lifetime(self) -> timedelta:
+        return timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS if settings else 30)
@@ -2,25 +2,34 @@ from typing import List, Optional
 from ..core.entities.folder import Folder
 from ..core.entities.user import User
 from ..core.exceptions import SandeshError
-from ..infrastructure.db.repositories import FolderRepository
+from ..infrastructure.db.repositories import FolderRepository, ChangeLogRepository, UnitOfWork
+from ..infrastructure.db.writer import WriteQueue, run_write
 
 
 class FolderService:
-    def __init__(self, folder_repo: FolderRepository):
+    def __init__(self, folder_repo: FolderRepository, writer: Optional[WriteQueue] = None):
         self.folder_repo = folder_repo
+        self.writer = writer
 
     def get_user_folders(self, user_id: int) -> List[Folder]:
         """Get all folders for a user."""
         return self.folder_repo.get_by_user_id(user_id)
 
+    def get_version(self, user_id: int) -> int:
+        """Version of the user's folder list: the mailbox modseq."""
+        return ChangeLogRepository(self.folder_repo.session).get_modseq(user_id)
+
     def create_folder(self, name: str, user: User) -> Folder:
         """
         Create a new folder for a user.
         Raises SandeshError if folder already exists.
         """
-        existing = self.folder_repo.get_by_name_and_user(name, user.id)
-        if existing:
-            raise SandeshError("Folder already exists")
+        def job(uow: UnitOfWork) -> Folder:
+            existing = uow.folders.get_by_name_and_user(name, user.id)
+            if existing:
+                raise SandeshError("Folder already exists")
+
+            new_folder = Folder(id=None, name=name, user_id=user.id)
+            return uow.folders.save(new_folder)
 
-        new_folder = Folder(id=None, name=name, user_id=user.id)
-        return self.folder_repo.save(new_folder)
+        return run_write(self.writer, self.folder_repo.session, job)
@@ -1,9 +1,13 @@
-from typing import List, Optional
-from ..core.entities.email import Email
+from typing import Callable, Dict, List, Optional, Tuple
+from ..core.entities.email import Email, EmailPage, SearchPage, SyncChanges
+from ..core.entities.outbox import OutboxMessage
 from ..core.entities.user import User
 from ..core.entities.folder import Folder
-from ..core.exceptions import EntityNotFoundError
-from ..infrastructure.db.repositories import EmailRepository, FolderRepository, UserRepository, SystemSettingsRepository
+from ..core.exceptions import EntityNotFoundError, SyncExpiredError, ValidationError
+from ..core.value_objects.page_cursor import PageCursor
+from ..core.value_objects.search_query import SearchQuery
+from ..infrastructure.db.repositories import EmailRepository, FolderRepository, UserRepository, SystemSettingsRepository, OutboxRepository, ChangeLogRepository, UnitOfWork
+from ..infrastructure.db.writer import WriteQueue, run_write
 from ..infrastructure.smtp.smtp_client import SMTPClient
 
 
@@ -24,13 +28,16 @@ class MailService:
         folder_repo: FolderRepository,
         user_repo: UserRepository,
         smtp_client: SMTPClient,
-        settings_repo: Optional[SystemSettingsRepository] = None
+        settings_repo: Optional[SystemSettingsRepository] = None,
+        writer: Optional[WriteQueue] = None
     ):
         self.email_repo = email_repo
         self.folder_repo = folder_repo
         self.user_repo = user_repo
         self.smtp_client = smtp_client
         self.settings_repo = settings_repo
+        # Mutations go through the single writer when given, else run on email_repo's session
+        self.writer = writer
 
     def _get_namespace(self) -> str:
         """Get current namespace from settings."""
@@ -51,61 +58,176 @@ class MailService:
         # Non-existent folders will simply return an empty list.
         return self.email_repo.get_previews_by_folder(folder_id, user_id)
 
+    def get_folder_emails_page(
+        self,
+        folder_id: int,
+        user_id: int,
+        limit: int,
+        cursor: Optional[str] = None,
+        include_total: bool = False,
+        as_rows: bool = False
+    ) -> EmailPage:
+        """
+        Get one keyset page of a folder listing.
+
+        Fetches `limit + 1` rows so the next cursor is only issued when more
+        rows actually exist. Raises InvalidCursorError for a malformed cursor.
+        `as_rows` returns the repository's preview rows instead of entities.
+        """
+        after = PageCursor.decode(cursor) if cursor else None
+        if as_rows:
+            rows = self.email_repo.get_preview_rows(folder_id, user_id, limit=limit + 1, after=after)
+        else:
+            rows = self.email_repo.get_previews_by_folder(folder_id, user_id, limit=limit + 1, after=after)
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = PageCursor(timestamp=last.timestamp, id=last.id).encode()
+
+        total = self.email_repo.count_by_folder(folder_id, user_id) if include_total else None
+        return EmailPage(items=rows, next_cursor=next_cursor, total=total)
+
+    def search_emails(
+        self,
+        user_id: int,
+        query: str,
+        folder_id: Optional[int] = None,
+        limit: int = 50,
+        offset: int = 0,
+        as_rows: bool = False
+    ) -> SearchPage:
+        """
+        Full-text search over a user's emails, optionally within one folder.
+        Raises ValidationError when the query has no searchable words.
+        `as_rows` returns the repository's preview rows instead of entities.
+        """
+        search_query = SearchQuery.parse(query)
+        search = self.email_repo.search_rows if as_rows else self.email_repo.search
+        rows = search(user_id, search_query, folder_id=folder_id, limit=limit + 1, offset=offset)
+
+        next_offset = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_offset = offset + limit
+
+        return SearchPage(items=rows, next_offset=next_offset)
+
+    def sync(self, user_id: int, since: Optional[int], limit: int) -> SyncChanges:
+        """
+        Changes to the user's mailbox after modseq `since`, at most about
+        `limit` of them. Changes sharing a modseq are never split, but one
+        transaction may take several modseqs (sending to yourself adds to Sent
+        and Inbox separately) and so span pages; each page is a consistent
+        state to apply in order. Without
+        `since`, returns the current modseq and folders to start syncing from.
+        Raises SyncExpiredError when `since` can no longer be served.
+        """
+        changes_repo = self.email_repo.changes
+        head, expunged = changes_repo.get_state(user_id)
+        if since is None:
+            return SyncChanges(modseq=head, folders=self.folder_repo.get_by_user_id(user_id))
+        if since < expunged or since > head:
+            raise SyncExpiredError("Sync point expired; reload folders and listings")
+
+        # Read up to the head taken above, so a commit racing this call is
+        # left for the next sync rather than skipped
+        rows = self.email_repo.get_changes(user_id, since, head, limit=limit + 1)
+        more = False
+        if len(rows) > limit:
+            more = True
+            boundary = rows[limit][0]
+            rows = [row for row in rows[:limit] if row[0] < boundary]
+            if not rows:
+                # A single modseq bigger than a page goes out whole
+                rows = self.email_repo.get_changes(user_id, since, boundary)
+        modseq = rows[-1][0] if more else head
+
+        result = SyncChanges(modseq=modseq, more=more)
+        for _, kind, email_id, preview in rows:
+            if kind == ChangeLogRepository.ADDED:
+                result.added.append(preview)
+            elif kind == ChangeLogRepository.CHANGED:
+                result.changed.append(preview)
+            else:
+                result.removed.append(email_id)
+        if modseq > since:
+            # Also covers folder creation, which advances the modseq without log rows
+            result.folders = self.folder_repo.get_by_user_id(user_id)
+        return result
+
+    def get_mailbox_version(self, user_id: int) -> int:
+        """Version of the user's folder listings: the mailbox modseq."""
+        return self.email_repo.changes.get_modseq(user_id)
+
+    def get_email_version(self, email_id: int, user_id: int) -> Optional[int]:
+        """Version of one email (modseq of its last change), None when unknown."""
+        return self.email_repo.changes.get_email_modseq(email_id, user_id)
+
     def get_email(self, email_id: int, user_id: int) -> Email:
         """Get a specific email and mark it as read."""
-        import time
-        from sqlalchemy.exc import OperationalError
-        
-        max_retries = 3
-        for attempt in range(max_retries):
-            try:
-                email = self.email_repo.get_by_id_and_owner(email_id, user_id)
-                if not email:
-                    raise EntityNotFoundError("Email not found")
-
-                if not email.is_read:
-                    # ⚡ Bolt: Use optimized UPDATE query instead of fetch-modify-save cycle
-                    self.email_repo.mark_as_read(email.id)
-                    email.is_read = True
-
-                return email
-            except OperationalError as e:
-                if "database is locked" in str(e) and attempt < max_retries - 1:
-                    time.sleep(0.1 * (attempt + 1))  # Exponential backoff
-                    continue
-                else:
-                    raise e
-            except Exception as e:
-                raise e
+        email = self.email_repo.get_by_id_and_owner(email_id, user_id)
+        if not email:
+            raise EntityNotFoundError("Email not found")
+
+        if not email.is_read:
+            # ⚡ Bolt: Use optimized UPDATE query instead of fetch-modify-save cycle
+            run_write(self.writer, self.email_repo.session, lambda uow: uow.emails.mark_as_read(email.id))
+            email.is_read = True
+
+        return email
 
     def move_email(self, email_id: int, target_folder_id: int, user_id: int):
         """Move an email to a different folder."""
-        import time
-        from sqlalchemy.exc import OperationalError
-        
-        max_retries = 3
-        for attempt in range(max_retries):
-            try:
-                email = self.email_repo.get_by_id_and_owner(email_id, user_id)
-                if not email:
-                    raise EntityNotFoundError("Email not found")
-
-                target_folder = self.folder_repo.get_by_id_and_user(target_folder_id, user_id)
-                if not target_folder:
+        def job(uow: UnitOfWork):
+            email = uow.emails.get_by_id_and_owner(email_id, user_id)
+            if not email:
+                raise EntityNotFoundError("Email not found")
+
+            target_folder = uow.folders.get_by_id_and_user(target_folder_id, user_id)
+            if not target_folder:
+                raise EntityNotFoundError("Target folder not found")
+
+            # ⚡ Bolt: Use optimized UPDATE query instead of fetch-modify-save cycle
+            uow.emails.move_to_folder(email.id, target_folder.id)
+
+        run_write(self.writer, self.email_repo.session, job)
+
+    # Bulk actions accepted by batch_update
+    BATCH_ACTIONS = ("move", "read", "unread", "delete")
+
+    def batch_update(self, user_id: int, action: str, email_ids: List[int], folder_id: Optional[int] = None) -> int:
+        """
+        Apply one action to many of the user's emails in a single transaction.
+        Emails the user doesn't own are skipped. Returns emails changed.
+        """
+        if action not in self.BATCH_ACTIONS:
+            raise ValidationError(f"Unknown action: {action}")
+        if action == "move" and folder_id is None:
+            raise ValidationError("folder_id is required to move emails")
+
+        ids = list(dict.fromkeys(email_ids))
+
+        def job(uow: UnitOfWork) -> int:
+            if action == "move":
+                if not uow.folders.get_by_id_and_user(folder_id, user_id):
                     raise EntityNotFoundError("Target folder not found")
+                return uow.emails.move_many(ids, user_id, folder_id)
+            if action == "delete":
+                return uow.emails.delete_many(ids, user_id)
+            return uow.emails.set_read_many(ids, user_id, is_read=(action == "read"))
 
-                # ⚡ Bolt: Use optimized UPDATE query instead of fetch-modify-save cycle
-                self.email_repo.move_to_folder(email.id, target_folder.id)
-                
-                return  # Success
-            except OperationalError as e:
-                if "database is locked" in str(e) and attempt < max_retries - 1:
-                    time.sleep(0.1 * (attempt + 1))  # Exponential backoff
-                    continue
-                else:
-                    raise e
-            except Exception as e:
-                raise e
+        return run_write(self.writer, self.email_repo.session, job)
+
+    def mark_folder_read(self, folder_id: int, user_id: int) -> int:
+        """Mark every email in one of the user's folders as read."""
+        def job(uow: UnitOfWork) -> int:
+            if not uow.folders.get_by_id_and_user(folder_id, user_id):
+                raise EntityNotFoundError("Folder not found")
+            return uow.emails.mark_folder_read(folder_id, user_id)
+
+        return run_write(self.writer, self.email_repo.session, job)
 
     def send_mail(
         self, 
@@ -114,7 +236,8 @@ class MailService:
         subject: str, 
         body: str, 
         cc: List[str] = None,
-        include_signature: bool = True
+        include_signature: bool = True,
+        outbox_id: Optional[int] = None
     ):
         """
         Send an email to recipients and save to Sent folder.
@@ -123,10 +246,15 @@ class MailService:
         - sender: "Display Name <email@namespace>"
         - sender_display_name: User's display name at send time
         - sender_email: Full email address at send time
+
+        ⚡ Bolt: Recipients in our own namespace are delivered in-process,
+        in the same write job (one transaction) as the Sent copy, instead of
+        a TCP + MIME round trip through our own SMTP server. Only addresses
+        outside the namespace are relayed, after that transaction commits.
+
+        For a queued send, `outbox_id`'s status is updated in that same
+        transaction, so a message is never stored twice after a crash.
         """
-        import time
-        from sqlalchemy.exc import OperationalError
-        
         cc = cc or []
         all_recipients = to + cc
         
@@ -143,56 +271,126 @@ class MailService:
         if include_signature and sender_user.signature:
             email_body = f"{body}\n\n--\n{sender_user.signature}"
 
-        # Retry mechanism for handling database locking issues
-        max_retries = 3
-        for attempt in range(max_retries):
-            try:
-                # 1. Save to Sent Folder
-                sent_folder = self.folder_repo.get_by_name_and_user("Sent", sender_user.id)
-                if not sent_folder:
-                    sent_folder = self.folder_repo.save(Folder(id=None, name="Sent", user_id=sender_user.id))
+        # Split local recipients (delivered directly) from ones to relay
+        local_usernames, local_users = self._resolve_local_recipients(all_recipients, namespace)
+        local_suffix = f"@{namespace}".lower()
+        relay_to = [r for r in to if not r.lower().endswith(local_suffix)]
+        relay_cc = [r for r in cc if not r.lower().endswith(local_suffix)]
 
-                sent_email = Email(
-                    id=None,
-                    owner_id=sender_user.id,
-                    folder_id=sent_folder.id,
-                    sender=formatted_sender,
-                    sender_display_name=sender_display_name,
-                    sender_email=sender_email,
-                    subject=subject,
-                    body=email_body,
-                    recipients=all_recipients,
-                    is_read=True
-                )
-                self.email_repo.save(sent_email)
+        deliver_local = self._delivery_job(
+            formatted_sender, sender_display_name, sender_email,
+            local_usernames, all_recipients, subject, email_body, users=local_users
+        )
 
-                # 2. Relay to SMTP
-                self.smtp_client.send_message(
-                    sender=formatted_sender,
-                    recipients=to,
-                    subject=subject,
-                    body=email_body,
-                    cc=cc
+        # 1. Save to Sent Folder, together with the local deliveries
+        def send_job(uow: UnitOfWork):
+            sent_folder = uow.folders.get_by_name_and_user("Sent", sender_user.id)
+            if not sent_folder:
+                sent_folder = uow.folders.save(Folder(id=None, name="Sent", user_id=sender_user.id))
+
+            uow.emails.save(Email(
+                id=None,
+                owner_id=sender_user.id,
+                folder_id=sent_folder.id,
+                sender=formatted_sender,
+                sender_display_name=sender_display_name,
+                sender_email=sender_email,
+                subject=subject,
+                body=email_body,
+                recipients=all_recipients,
+                is_read=True
+            ))
+
+            if deliver_local is not None:
+                deliver_local(uow)
+
+            if outbox_id is not None:
+                status = OutboxMessage.RELAYING if relay_to or relay_cc else OutboxMessage.SENT
+                uow.outbox.set_status(outbox_id, status)
+
+        run_write(self.writer, self.email_repo.session, send_job)
+
+        # 2. Relay external recipients to SMTP
+        if relay_to or relay_cc:
+            self.smtp_client.send_message(
+                sender=formatted_sender,
+                recipients=relay_to,
+                subject=subject,
+                body=email_body,
+                cc=relay_cc
+            )
+            if outbox_id is not None:
+                run_write(
+                    self.writer, self.email_repo.session,
+                    lambda uow: uow.outbox.set_status(outbox_id, OutboxMessage.SENT)
                 )
-                
-                return  # Success, exit the retry loop
-            except OperationalError as e:
-                if "database is locked" in str(e) and attempt < max_retries - 1:
-                    time.sleep(0.1 * (attempt + 1))  # Exponential backoff
-                    continue
-                else:
-                    raise e
-            except Exception as e:
-                raise e
+
+    def queue_mail(
+        self,
+        sender_user: User,
+        to: List[str],
+        subject: str,
+        body: str,
+        cc: List[str] = None,
+        idempotency_key: Optional[str] = None
+    ) -> Tuple[OutboxMessage, bool]:
+        """
+        Queue a message for background sending.
+
+        Returns the outbox entry and whether it was created now. A repeated
+        `idempotency_key` returns the original entry instead of a new one.
+        Raises ValidationError for unknown recipients in our namespace, so
+        they are refused up front rather than failing in the background.
+        """
+        self._resolve_local_recipients(to + (cc or []), self._get_namespace())
+
+        def job(uow: UnitOfWork) -> Tuple[OutboxMessage, bool]:
+            if idempotency_key:
+                existing = uow.outbox.get_by_idempotency_key(sender_user.id, idempotency_key)
+                if existing:
+                    return existing, False
+
+            message = uow.outbox.add(OutboxMessage(
+                id=None,
+                user_id=sender_user.id,
+                to=to,
+                cc=cc or [],
+                subject=subject,
+                body=body,
+                idempotency_key=idempotency_key
+            ))
+            return message, True
+
+        return run_write(self.writer, self.email_repo.session, job)
+
+    def get_outbox_message(self, message_id: int, user_id: int) -> OutboxMessage:
+        message = OutboxRepository(self.email_repo.session).get_by_id_and_user(message_id, user_id)
+        if not message:
+            raise EntityNotFoundError("Message not found")
+        return message
 
     def deliver_incoming_mail(self, sender: str, recipients: List[str], subject: str, body: str):
         """
         Called by SMTP Server to deliver mail to local users.
         Parses sender identity if formatted.
+
+        Delivery is batched regardless of recipient count: one IN query for
+        users, then a single write job with one query for their inboxes
+        (missing ones created in bulk) and one executemany INSERT for all copies.
+        """
+        job = self.prepare_delivery(sender, recipients, subject, body)
+        if job is not None:
+            run_write(self.writer, self.email_repo.session, job)
+
+    def prepare_delivery(
+        self, sender: str, recipients: List[str], subject: str, body: str
+    ) -> Optional[Callable[[UnitOfWork], None]]:
+        """
+        Resolve local recipients now and return the write job that stores
+        their copies, or None when no recipient is a local user. Callers
+        that deliver many messages run several of these jobs in one
+        transaction (see the SMTP spool workers).
         """
-        import time
-        from sqlalchemy.exc import OperationalError
-        
         # Parse sender identity
         sender_display_name = None
         sender_email = sender
@@ -202,48 +400,80 @@ class MailService:
             parts = sender.split('<')
             sender_display_name = parts[0].strip().strip('"')
             sender_email = parts[1].rstrip('>')
-        
+
+        # Local usernames in envelope order, each delivered once
+        usernames = []
         for rcpt in recipients:
             if '@' not in rcpt:
                 continue
+            username = rcpt.split('@', 1)[0].lower()  # Usernames are stored lowercase
+            if username not in usernames:
+                usernames.append(username)
 
-            username, domain = rcpt.split('@', 1)
+        return self._delivery_job(
+            sender, sender_display_name, sender_email, usernames, recipients, subject, body
+        )
 
-            # Find User
-            user = self.user_repo.get_by_username(username)
-            if not user:
-                continue
+    def _resolve_local_recipients(
+        self, recipients: List[str], namespace: str
+    ) -> Tuple[List[str], Dict[str, User]]:
+        """
+        Usernames addressed in our namespace (lowercased, in order, each once)
+        and their users, in one IN query.
+        Raises ValidationError naming any that are not users here.
+        """
+        local_suffix = f"@{namespace}".lower()
+        usernames = []
+        for rcpt in recipients:
+            if rcpt.lower().endswith(local_suffix):
+                username = rcpt[:-len(local_suffix)].lower()  # Usernames are stored lowercase
+                if username not in usernames:
+                    usernames.append(username)
 
-            # Find Inbox
-            inbox = self.folder_repo.get_by_name_and_user("Inbox", user.id)
-            if not inbox:
-                inbox = self.folder_repo.save(Folder(id=None, name="Inbox", user_id=user.id))
+        users = self.user_repo.get_by_usernames(usernames)
+        unknown = [f"{username}@{namespace}" for username in usernames if username not in users]
+        if unknown:
+            raise ValidationError(f"Unknown recipient(s): {', '.join(unknown)}")
+        return usernames, users
 
-            # Create Email with identity fields
-            new_email = Email(
-                id=None,
-                owner_id=user.id,
-                folder_id=inbox.id,
-                sender=sender,
-                sender_display_name=sender_display_name,
-                sender_email=sender_email,
-                subject=subject,
-                body=body,
-                recipients=recipients,
-                is_read=False
-            )
-            
-            # Retry mechanism for database operations
-            max_retries = 3
-            for attempt in range(max_retries):
-                try:
-                    self.email_repo.save(new_email)
-                    break  # Success, exit retry loop
-                except OperationalError as e:
-                    if "database is locked" in str(e) and attempt < max_retries - 1:
-                        time.sleep(0.1 * (attempt + 1))  # Exponential backoff
-                        continue
-                    else:
-                        raise e
-                except Exception as e:
-                    raise e
+    def _delivery_job(
+        self,
+        sender: str,
+        sender_display_name: Optional[str],
+        sender_email: str,
+        usernames: List[str],
+        recipients: List[str],
+        subject: str,
+        body: str,
+        users: Optional[Dict[str, User]] = None
+    ) -> Optional[Callable[[UnitOfWork], None]]:
+        """Inbox copies for the given usernames; None when none exist."""
+        # Lookup stays outside the write job so the writer only does inserts
+        if users is None:
+            users = self.user_repo.get_by_usernames(usernames)
+        if not users:
+            return None
+
+        def job(uow: UnitOfWork):
+            inboxes = uow.folders.get_or_create_for_users("Inbox", [u.id for u in users.values()])
+
+            # Create Emails with identity fields (one copy per recipient)
+            new_emails = [
+                Email(
+                    id=None,
+                    owner_id=users[username].id,
+                    folder_id=inboxes[users[username].id].id,
+                    sender=sender,
+                    sender_display_name=sender_display_name,
+                    sender_email=sender_email,
+                    subject=subject,
+                    body=body,
+                    recipients=recipients,
+                    is_read=False
+                )
+                for username in usernames
+                if username in users
+            ]
+            uow.emails.save_many(new_emails)
+
+        return job
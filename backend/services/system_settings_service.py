@@ -3,6 +3,7 @@ import re
 from ..core.entities.user import SystemSettings
 from ..core.exceptions import SandeshError, ValidationError
 from ..infrastructure.db.repositories import SystemSettingsRepository
+from ..infrastructure.db.writer import WriteQueue, run_write
 
 
 class SystemSettingsService:
@@ -18,8 +19,9 @@ class SystemSettingsService:
     
     NAMESPACE_PATTERN = re.compile(r'^[a-z][a-z0-9\-]{1,19}$')
     
-    def __init__(self, settings_repo: SystemSettingsRepository):
+    def __init__(self, settings_repo: SystemSettingsRepository, writer: Optional[WriteQueue] = None):
         self.settings_repo = settings_repo
+        self.writer = writer
     
     def get_settings(self) -> SystemSettings:
         """Get current system settings."""
@@ -72,7 +74,7 @@ class SystemSettingsService:
             
             current.mail_namespace = namespace_lower
         
-        return self.settings_repo.update(current)
+        return run_write(self.writer, self.settings_repo.session, lambda uow: uow.settings.update(current))
     
     def get_email_address(self, username: str) -> str:
         """Generate email address for a username using current namespace."""
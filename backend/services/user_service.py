@@ -1,10 +1,12 @@
 from typing import List, Optional
 import re
+from starlette.concurrency import run_in_threadpool
 from ..core.entities.user import User, SystemSettings
 from ..core.entities.folder import Folder
 from ..core.exceptions import SandeshError, ValidationError, EntityNotFoundError
-from ..infrastructure.db.repositories import UserRepository, FolderRepository, SystemSettingsRepository
-from ..infrastructure.security.password import get_password_hash
+from ..infrastructure.db.repositories import UserRepository, FolderRepository, SystemSettingsRepository, UnitOfWork
+from ..infrastructure.db.writer import WriteQueue, run_write
+from ..infrastructure.security.password import get_password_hash_async
 
 
 class UserService:
@@ -23,11 +25,13 @@ class UserService:
         self, 
         user_repo: UserRepository, 
         folder_repo: FolderRepository,
-        settings_repo: Optional[SystemSettingsRepository] = None
+        settings_repo: Optional[SystemSettingsRepository] = None,
+        writer: Optional[WriteQueue] = None
     ):
         self.user_repo = user_repo
         self.folder_repo = folder_repo
         self.settings_repo = settings_repo
+        self.writer = writer
 
     def get_all_users(self) -> List[User]:
         """Get all registered users with computed email addresses."""
@@ -44,7 +48,7 @@ class UserService:
         user = self.user_repo.get_by_username(username)
         return self._enrich_user(user) if user else None
 
-    def create_user(
+    async def create_user(
         self, 
         username: str, 
         password: str,
@@ -63,6 +67,9 @@ class UserService:
         Raises:
             ValidationError: If username format is invalid
             SandeshError: If username already exists
+
+        ⚡ Bolt: Async so the bcrypt hash is awaited in the password pool;
+        the lookup and write job run in the threadpool.
         """
         # Validate username format
         username_lower = username.lower().strip()
@@ -72,33 +79,44 @@ class UserService:
                 "start with a letter, and contain only lowercase letters, numbers, and underscores."
             )
         
-        # Check for existing user
-        existing = self.user_repo.get_by_username(username_lower)
-        if existing:
+        # Refuse duplicates before paying for a bcrypt hash
+        if await run_in_threadpool(self.user_repo.get_by_username, username_lower):
             raise SandeshError("Username already registered")
 
-        # Create User
-        new_user = User(
-            id=None,
-            username=username_lower,
-            password_hash=get_password_hash(password),
-            is_admin=is_admin,
-            is_active=True,
-            display_name=display_name or username_lower.replace('_', ' ').title(),
-            signature=None,
-            avatar_color=self._generate_avatar_color(username_lower)
-        )
-        saved_user = self.user_repo.save(new_user)
+        # Hash outside the write job: bcrypt is slow and the writer is shared
+        password_hash = await get_password_hash_async(password)
 
-        # Create Default Folders
-        folders = [
-            Folder(id=None, name="Inbox", user_id=saved_user.id),
-            Folder(id=None, name="Sent", user_id=saved_user.id),
-            Folder(id=None, name="Trash", user_id=saved_user.id)
-        ]
-        self.folder_repo.add_all(folders)
+        def job(uow: UnitOfWork) -> User:
+            # Checked again: a concurrent request may have taken the name meanwhile
+            existing = uow.users.get_by_username(username_lower)
+            if existing:
+                raise SandeshError("Username already registered")
+
+            # Create User
+            new_user = User(
+                id=None,
+                username=username_lower,
+                password_hash=password_hash,
+                is_admin=is_admin,
+                is_active=True,
+                display_name=display_name or username_lower.replace('_', ' ').title(),
+                signature=None,
+                avatar_color=self._generate_avatar_color(username_lower)
+            )
+            saved_user = uow.users.save(new_user)
 
-        return self._enrich_user(saved_user)
+            # Create Default Folders
+            folders = [
+                Folder(id=None, name="Inbox", user_id=saved_user.id),
+                Folder(id=None, name="Sent", user_id=saved_user.id),
+                Folder(id=None, name="Trash", user_id=saved_user.id)
+            ]
+            uow.folders.add_all(folders)
+            return saved_user
+
+        saved_user = await run_in_threadpool(run_write, self.writer, self.user_repo.session, job)
+
+        return await run_in_threadpool(self._enrich_user, saved_user)
     
     def update_profile(
         self,
@@ -135,7 +153,7 @@ class UserService:
                 raise ValidationError("Invalid color format. Use #RRGGBB")
             user.avatar_color = avatar_color
         
-        saved = self.user_repo.save(user)
+        saved = run_write(self.writer, self.user_repo.session, lambda uow: uow.users.save(user))
         return self._enrich_user(saved)
     
     def deactivate_user(self, user_id: int) -> bool:
@@ -150,7 +168,12 @@ class UserService:
         if user.is_admin:
             raise SandeshError("Cannot deactivate admin users")
         
-        return self.user_repo.deactivate(user_id)
+        def job(uow: UnitOfWork) -> bool:
+            # Access tokens lapse within the hour; refresh tokens would not
+            uow.refresh_tokens.revoke_user(user_id, uow.refresh_tokens.DEACTIVATED)
+            return uow.users.deactivate(user_id)
+
+        return run_write(self.writer, self.user_repo.session, job)
     
     def _enrich_user(self, user: User) -> User:
         """Add computed email address to user."""
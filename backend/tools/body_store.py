@@ -0,0 +1,131 @@
+"""
+Message body store maintenance.
+
+Usage (from the project root, same environment as the server):
+    python -m backend.tools.body_store backfill [--batch-size N]
+    python -m backend.tools.body_store compress [--batch-size N]
+    python -m backend.tools.body_store gc
+
+`backfill` moves bodies still stored inline on email rows (created before the
+shared store existed) into `message_bodies`, deduplicating and compressing as
+it goes, and fills in their preview snippets.
+`compress` re-encodes stored raw bodies with the configured codec
+(SANDESH_BODY_CODEC / SANDESH_BODY_COMPRESSION_THRESHOLD).
+`gc` recounts body references and deletes bodies no email points at.
+
+Batch commands commit per batch, so they can run while the server is up and
+can be resumed.
+
+Run `VACUUM` afterwards to return the freed pages to the filesystem.
+"""
+import argparse
+import sys
+from sqlalchemy import select, update
+from ..infrastructure.db.session import SessionLocal
+from ..infrastructure.db.models import EmailModel, MessageBodyModel
+from ..infrastructure.db.repositories import MessageBodyRepository
+from ..infrastructure.db.body_codec import RAW, body_codec
+
+
+def backfill(batch_size: int = 500) -> int:
+    moved = 0
+    while True:
+        with SessionLocal() as session:
+            try:
+                rows = session.execute(
+                    select(EmailModel.id, EmailModel.body)
+                    .where(EmailModel.body.is_not(None), EmailModel.body_hash.is_(None))
+                    .limit(batch_size)
+                ).all()
+                if not rows:
+                    break
+
+                bodies = MessageBodyRepository(session)
+                for email_id, body in rows:
+                    body_hash = bodies.acquire(body)
+                    session.execute(
+                        update(EmailModel)
+                        .where(EmailModel.id == email_id)
+                        .values(body_hash=body_hash, body=None, snippet=body[:100])
+                    )
+                session.commit()
+            except Exception:
+                session.rollback()
+                raise
+        moved += len(rows)
+        print(f"Moved {moved} bodies into the shared store...")
+
+    print(f"Backfill complete: {moved} email(s) updated")
+    return 0
+
+
+def compress(batch_size: int = 500) -> int:
+    if body_codec.codec == RAW:
+        print("SANDESH_BODY_CODEC is 'raw'; nothing to compress")
+        return 0
+
+    converted = 0
+    last_hash = ""
+    while True:
+        with SessionLocal() as session:
+            try:
+                rows = session.execute(
+                    select(MessageBodyModel.hash, MessageBodyModel.body)
+                    .where(
+                        MessageBodyModel.codec == RAW,
+                        MessageBodyModel.size >= body_codec.threshold,
+                        MessageBodyModel.hash > last_hash
+                    )
+                    .order_by(MessageBodyModel.hash)
+                    .limit(batch_size)
+                ).all()
+                if not rows:
+                    break
+
+                for body_hash, body in rows:
+                    codec, text, data = body_codec.encode(body)
+                    if codec != RAW:
+                        session.execute(
+                            update(MessageBodyModel)
+                            .where(MessageBodyModel.hash == body_hash)
+                            .values(codec=codec, body=text, data=data)
+                        )
+                        converted += 1
+                session.commit()
+            except Exception:
+                session.rollback()
+                raise
+        last_hash = rows[-1].hash
+        print(f"Compressed {converted} bodies...")
+
+    print(f"Compression complete: {converted} body row(s) re-encoded with {body_codec.codec}")
+    return 0
+
+
+def gc() -> int:
+    with SessionLocal() as session:
+        try:
+            removed = MessageBodyRepository(session).collect_garbage()
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+    print(f"Removed {removed} unreferenced bodies")
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Maintain the shared message body store")
+    parser.add_argument("command", choices=["backfill", "compress", "gc"])
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args(argv)
+
+    if args.command == "backfill":
+        return backfill(args.batch_size)
+    if args.command == "compress":
+        return compress(args.batch_size)
+    return gc()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
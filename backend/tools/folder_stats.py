@@ -0,0 +1,55 @@
+"""
+Folder counter maintenance.
+
+Usage (from the project root, same environment as the server):
+    python -m backend.tools.folder_stats check [--user-id N]
+    python -m backend.tools.folder_stats rebuild [--user-id N]
+
+`check` recounts from the emails table and reports folders whose materialized
+counters have drifted; it exits with status 1 when drift is found.
+`rebuild` recomputes the counters in a single transaction.
+"""
+import argparse
+import sys
+from ..infrastructure.db.session import SessionLocal
+from ..infrastructure.db.repositories import FolderStatsRepository
+
+
+def check(user_id=None) -> int:
+    with SessionLocal() as session:
+        drift = FolderStatsRepository(session).find_drift(user_id)
+
+    for entry in drift:
+        print(
+            f"folder {entry['folder_id']} (user {entry['user_id']}): "
+            f"stored {entry['stored']} != actual {entry['actual']}"
+        )
+    print(f"{len(drift)} folder(s) with drifted counters")
+    return 1 if drift else 0
+
+
+def rebuild(user_id=None) -> int:
+    with SessionLocal() as session:
+        try:
+            count = FolderStatsRepository(session).rebuild(user_id)
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+    print(f"Rebuilt counters for {count} folder(s)")
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Check or rebuild materialized folder counters")
+    parser.add_argument("command", choices=["check", "rebuild"])
+    parser.add_argument("--user-id", type=int, default=None, help="Limit to one user's folders")
+    args = parser.parse_args(argv)
+
+    if args.command == "check":
+        return check(args.user_id)
+    return rebuild(args.user_id)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
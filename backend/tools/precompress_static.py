@@ -0,0 +1,29 @@
+"""
+Precompress the built frontend.
+
+Usage (from the project root):
+    python -m backend.tools.precompress_static [DIRECTORY]
+
+Writes `.gz` (and `.br`, when the brotli module is installed) next to every
+compressible file in DIRECTORY (default: backend/static) that lacks an
+up-to-date one. The server serves these as-is, so running this at build time
+keeps maximum-effort compression out of startup. Safe to re-run.
+"""
+import argparse
+import sys
+from ..api.static_assets import brotli, precompress
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Write gzip/brotli variants of the built frontend")
+    parser.add_argument("directory", nargs="?", default="backend/static")
+    args = parser.parse_args(argv)
+
+    written = precompress(args.directory)
+    encodings = "gzip and brotli" if brotli is not None else "gzip (install brotli for .br)"
+    print(f"Wrote {written} precompressed file(s) in {args.directory} using {encodings}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
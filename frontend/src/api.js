@@ -21,12 +21,63 @@ api.interceptors.request.use(
   (error) => Promise.reject(error),
 );
 
+// Refresh tokens rotate on every use, so only one refresh may be in flight:
+// concurrent 401s wait for the same one
+let refreshing = null;
+
+const refreshAccessToken = () => {
+  if (!refreshing) {
+    const refreshToken = localStorage.getItem("refreshToken");
+    refreshing = (
+      refreshToken
+        ? axios.post(`${API_URL}/auth/refresh`, { refresh_token: refreshToken })
+        : Promise.reject(new Error("No refresh token"))
+    )
+      .then(({ data }) => {
+        localStorage.setItem("token", data.access_token);
+        localStorage.setItem("refreshToken", data.refresh_token);
+        return data.access_token;
+      })
+      .catch((error) => {
+        // Another tab may have rotated the token first; use its result
+        const current = localStorage.getItem("refreshToken");
+        if (refreshToken && current && current !== refreshToken) {
+          return localStorage.getItem("token");
+        }
+        throw error;
+      })
+      .finally(() => {
+        refreshing = null;
+      });
+  }
+  return refreshing;
+};
+
 // Response interceptor - handle auth errors
 api.interceptors.response.use(
   (response) => response,
-  (error) => {
+  async (error) => {
+    const request = error.config;
+    if (
+      error.response &&
+      error.response.status === 401 &&
+      request &&
+      !request._retried &&
+      !request.url.startsWith("/auth/")
+    ) {
+      // Expired access token: get a new one without asking for the password
+      request._retried = true;
+      try {
+        const token = await refreshAccessToken();
+        request.headers.Authorization = `Bearer ${token}`;
+        return api(request);
+      } catch {
+        // Refresh token expired or revoked: sign in again
+      }
+    }
     if (error.response && error.response.status === 401) {
       localStorage.removeItem("token");
+      localStorage.removeItem("refreshToken");
       localStorage.removeItem("user");
       window.location.href = "/login";
     }
@@ -40,6 +91,9 @@ api.interceptors.response.use(
 export const login = (username, password) =>
   api.post("/auth/login", { username, password });
 
+export const logout = (refreshToken) =>
+  api.post("/auth/logout", { refresh_token: refreshToken });
+
 // ==========================================
 // User Endpoints (Admin only)
 // ==========================================
@@ -79,14 +133,28 @@ export const createFolder = (name) => api.post("/folders", { name });
 // ==========================================
 // Mail Endpoints
 // ==========================================
-export const getMail = (folderId) => api.get(`/mail/${folderId}`);
+// Keyset-paginated: pass { cursor } from the previous page's next_cursor
+export const getMail = (folderId, params = {}) =>
+  api.get(`/mail/${folderId}`, { params });
 
 export const getMessage = (id) => api.get(`/message/${id}`);
 
 export const moveMessage = (emailId, folderId) =>
   api.put(`/message/${emailId}/move`, { folder_id: folderId });
 
-export const sendMail = (data) => api.post("/mail/send", data);
+// One request for many messages: action is "move", "read", "unread" or "delete"
+export const batchMessages = (action, ids, folderId = null) =>
+  api.post("/messages/batch", { action, ids, folder_id: folderId });
+
+// Queues the message (202 + outbox entry). Reuse the same idempotencyKey when
+// retrying a send, so a retry after a lost response is not sent twice
+export const sendMail = (data, idempotencyKey) =>
+  api.post("/mail/send", data, {
+    headers: idempotencyKey ? { "Idempotency-Key": idempotencyKey } : {},
+  });
+
+// status: "queued", "relaying", "sent" or "failed" (see error)
+export const getOutboxStatus = (id) => api.get(`/mail/outbox/${id}`);
 
 // ==========================================
 // Health Check
@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from "react";
 import { useNavigate, useLocation } from "react-router-dom";
-import { sendMail, checkHealth } from "../api";
+import { sendMail, getOutboxStatus, checkHealth } from "../api";
 import { useToast } from "../components/ToastContext";
 import { useConfirmation } from "../components/ConfirmationDialog";
 import { Button, ComingSoonButton } from "../components/ui";
@@ -20,6 +20,36 @@ import {
   Loader2,
 } from "lucide-react";
 
+const OUTBOX_POLL_MS = 1000;
+const OUTBOX_POLL_LIMIT = 120; // Stop watching after ~2 minutes
+
+const newIdempotencyKey = () =>
+  window.crypto?.randomUUID?.() ||
+  `${Date.now()}-${Math.random().toString(36).slice(2)}`;
+
+// Follows a queued send until the outbox reports it sent or failed. Keeps
+// running after the compose window closes; the toasts are app-wide.
+const watchOutbox = async (id, toast) => {
+  for (let i = 0; i < OUTBOX_POLL_LIMIT; i++) {
+    await new Promise((resolve) => setTimeout(resolve, OUTBOX_POLL_MS));
+    try {
+      const { data } = await getOutboxStatus(id);
+      if (data.status === "sent") {
+        toast.success("Message sent!");
+        return;
+      }
+      if (data.status === "failed") {
+        toast.error(`Message not sent: ${data.error || "delivery failed"}`);
+        return;
+      }
+    } catch (e) {
+      if (e.response?.status === 404) return;
+      // Network hiccup: keep polling
+    }
+  }
+  toast.warning("Message is still queued; it will be sent when possible.");
+};
+
 export default function Compose() {
   const navigate = useNavigate();
   const location = useLocation();
@@ -35,6 +65,8 @@ export default function Compose() {
   const [namespace, setNamespace] = useState("local");
   const [showCc, setShowCc] = useState(false);
   const [isMinimized, setIsMinimized] = useState(false);
+  // One key per draft: retrying a send whose response was lost is not sent twice
+  const [idempotencyKey, setIdempotencyKey] = useState(newIdempotencyKey);
 
   // Platform detection for keyboard shortcuts
   const isMac = typeof navigator !== 'undefined' && /Mac|iPod|iPhone|iPad/i.test(navigator.userAgent);
@@ -109,14 +141,27 @@ export default function Compose() {
       .filter(Boolean);
 
     try {
-      await sendMail({
-        to: toList,
-        cc: ccList,
-        subject: subject.trim() || "(No Subject)",
-        body,
-      });
+      const { data } = await sendMail(
+        {
+          to: toList,
+          cc: ccList,
+          subject: subject.trim() || "(No Subject)",
+          body,
+        },
+        idempotencyKey,
+      );
 
-      toast.success("Message sent!");
+      if (data.status === "sent") {
+        toast.success("Message sent!");
+      } else if (data.status === "failed") {
+        toast.error(`Message not sent: ${data.error || "delivery failed"}`);
+        // The key now maps to this failed attempt; a retry needs a fresh one
+        setIdempotencyKey(newIdempotencyKey());
+        return;
+      } else {
+        toast.success("Message queued");
+        watchOutbox(data.id, toast);
+      }
       navigate("/");
     } catch (e) {
       console.error("Failed to send email:", e);
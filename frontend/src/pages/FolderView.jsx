@@ -5,7 +5,7 @@ import {
   useOutletContext,
   useNavigate,
 } from "react-router-dom";
-import { getMail, moveMessage } from "../api";
+import { getMail, batchMessages } from "../api";
 import { format, isToday, isYesterday, isThisYear } from "date-fns";
 import { useToast } from "../components/ToastContext";
 import { useConfirmation } from "../components/ConfirmationDialog";
@@ -226,6 +226,9 @@ export default function FolderView() {
   const [error, setError] = useState(null);
   const [refreshing, setRefreshing] = useState(false);
   const [selectedEmails, setSelectedEmails] = useState(new Set());
+  const [nextCursor, setNextCursor] = useState(null);
+  const [totalCount, setTotalCount] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   const loadMail = useCallback(
     async (showLoading = true) => {
@@ -234,8 +237,10 @@ export default function FolderView() {
       setSelectedEmails(new Set());
 
       try {
-        const mailRes = await getMail(id);
-        setEmails(mailRes.data);
+        const mailRes = await getMail(id, { include_total: true });
+        setEmails(mailRes.data.items);
+        setNextCursor(mailRes.data.next_cursor);
+        setTotalCount(mailRes.data.total);
       } catch (e) {
         console.error("Failed to load mail:", e);
         setError("Failed to load emails. Please try again.");
@@ -251,6 +256,21 @@ export default function FolderView() {
     loadMail();
   }, [loadMail]);
 
+  const loadMore = async () => {
+    if (!nextCursor || loadingMore) return;
+    setLoadingMore(true);
+    try {
+      const mailRes = await getMail(id, { cursor: nextCursor });
+      setEmails((prev) => [...prev, ...mailRes.data.items]);
+      setNextCursor(mailRes.data.next_cursor);
+    } catch (e) {
+      console.error("Failed to load more mail:", e);
+      toast.error("Failed to load more emails");
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleRefresh = async () => {
     setRefreshing(true);
     await loadMail(false);
@@ -295,9 +315,7 @@ export default function FolderView() {
       }
 
       try {
-        for (const emailId of selectedEmails) {
-          await moveMessage(emailId, trashFolder.id);
-        }
+        await batchMessages("move", [...selectedEmails], trashFolder.id);
         toast.success(
           `${selectedEmails.size} email${selectedEmails.size > 1 ? "s" : ""} moved to Trash`,
         );
@@ -462,7 +480,7 @@ export default function FolderView() {
           <span className="text-sm text-[#8B8B8B]">
             {emails.length > 0 ? (
               <>
-                1-{emails.length} of {emails.length}
+                1-{emails.length} of {totalCount ?? emails.length}
               </>
             ) : null}
           </span>
@@ -498,6 +516,21 @@ export default function FolderView() {
                 onSelect={toggleEmailSelection}
               />
             ))}
+            {nextCursor && (
+              <div className="flex justify-center py-4">
+                <button
+                  onClick={loadMore}
+                  disabled={loadingMore}
+                  className="
+                    px-4 py-2 text-sm text-[#6B6B6B] rounded-lg
+                    hover:bg-[#E5E8EB] hover:text-[#3D3D3D]
+                    transition-colors disabled:opacity-50
+                  "
+                >
+                  {loadingMore ? "Loading..." : "Load more"}
+                </button>
+              </div>
+            )}
           </div>
         )}
       </div>
@@ -1,6 +1,6 @@
 import React, { useEffect, useState, useCallback } from "react";
 import { Outlet, Link, useNavigate, useLocation } from "react-router-dom";
-import { getFolders, createFolder, checkHealth } from "../api";
+import { getFolders, createFolder, checkHealth, logout } from "../api";
 import { useToast } from "../components/ToastContext";
 import { useConfirmation } from "../components/ConfirmationDialog";
 import { Button, Badge, Skeleton } from "../components/ui";
@@ -133,7 +133,13 @@ export default function Layout() {
   const handleLogout = async () => {
     const confirmed = await confirm("SIGN_OUT");
     if (confirmed) {
+      const refreshToken = localStorage.getItem("refreshToken");
+      if (refreshToken) {
+        // Revoke server-side too; signing out locally must not wait on it
+        logout(refreshToken).catch(() => {});
+      }
       localStorage.removeItem("token");
+      localStorage.removeItem("refreshToken");
       localStorage.removeItem("user");
       navigate("/login");
     }
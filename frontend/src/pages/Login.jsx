@@ -53,6 +53,7 @@ export default function Login() {
     try {
       const { data } = await login(username, password);
       localStorage.setItem("token", data.access_token);
+      localStorage.setItem("refreshToken", data.refresh_token);
       localStorage.setItem("user", JSON.stringify(data.user));
       navigate("/app");
     } catch (err) {
@@ -31,9 +31,9 @@ def verify_bulk_action_bar():
 
         # Mock /api/mail/1 (Inbox) with some emails
         # Removing 'Z' from timestamp to avoid invalid date error in frontend which appends 'Z'
-        page.route("**/api/mail/1", lambda route: route.fulfill(
+        page.route("**/api/mail/1?*", lambda route: route.fulfill(
             status=200,
-            body=json.dumps([
+            body=json.dumps({"items": [
                 {
                     "id": 101,
                     "sender": "sender@test.local",
@@ -44,7 +44,7 @@ def verify_bulk_action_bar():
                     "folder_id": 1,
                     "recipients": ["me@test.local"]
                 }
-            ])
+            ], "next_cursor": None, "total": 1})
         ))
 
         page.goto("http://localhost:5173/login")
@@ -0,0 +1,106 @@
+import sys
+import os
+import random
+import tempfile
+import time
+
+# Add backend to path
+sys.path.append(os.getcwd())
+
+# Settings are loaded at import time; provide harmless defaults for a standalone run
+os.environ.setdefault("SANDESH_NAMESPACE", "local")
+os.environ.setdefault("SANDESH_ADMIN_USER", "admin")
+os.environ.setdefault("SANDESH_ADMIN_PASSWORD", "benchmark-only")
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.infrastructure.db.models import Base, UserModel, FolderModel
+from backend.infrastructure.db.repositories import EmailRepository, MessageBodyRepository
+from backend.infrastructure.db.body_codec import BodyCodec
+from backend.core.entities.email import Email
+
+EMAILS = 2000
+READS = 500
+
+WORDS = (
+    "meeting schedule report quarterly budget review team project deadline update "
+    "please find attached the latest numbers for discussion thanks regards office "
+    "network server maintenance window tonight access badge lunch friday agenda "
+    "minutes action items follow up owner status blocked done next steps"
+).split()
+
+
+def make_body(rng: random.Random) -> str:
+    # Plain-text mail between ~500 bytes and ~20KB, like real office traffic
+    words = rng.randint(80, 3000)
+    lines = []
+    for _ in range(0, words, 12):
+        lines.append(" ".join(rng.choice(WORDS) for _ in range(12)))
+    return "\n".join(lines)
+
+
+def run(codec_name: str):
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    SessionLocal = sessionmaker(bind=engine)
+
+    rng = random.Random(42)
+    codec = BodyCodec(codec=codec_name, threshold=1024)
+
+    with SessionLocal() as session:
+        session.add(UserModel(username="bench", password_hash="hash"))
+        session.add(FolderModel(name="Inbox", user_id=1))
+        session.flush()
+
+        repo = EmailRepository(session)
+        repo.bodies = MessageBodyRepository(session, codec)
+
+        start = time.perf_counter()
+        for i in range(EMAILS):
+            repo.save(Email(
+                id=None, owner_id=1, folder_id=1, sender="sender@local",
+                subject=f"Message {i}", body=make_body(rng), recipients=["bench@local"]
+            ))
+        session.commit()
+        write_time = time.perf_counter() - start
+
+    engine.dispose()
+    db_size = os.path.getsize(path)
+
+    engine = create_engine(f"sqlite:///{path}")
+    SessionLocal = sessionmaker(bind=engine)
+    with SessionLocal() as session:
+        repo = EmailRepository(session)
+
+        ids = [rng.randint(1, EMAILS) for _ in range(READS)]
+        start = time.perf_counter()
+        for email_id in ids:
+            repo.get_by_id_and_owner(email_id, 1)
+        full_read = (time.perf_counter() - start) / READS * 1000
+
+        start = time.perf_counter()
+        for _ in range(50):
+            repo.get_previews_by_folder(1, 1, limit=50)
+        preview_read = (time.perf_counter() - start) / 50 * 1000
+
+    engine.dispose()
+    os.remove(path)
+
+    print(
+        f"{codec_name:>5} | db {db_size / 1024 / 1024:7.2f} MB | write {write_time:6.2f} s | "
+        f"full read {full_read:6.3f} ms | preview page {preview_read:6.3f} ms"
+    )
+
+
+def benchmark():
+    print(f"Storing {EMAILS} emails per codec, {READS} random full reads, 50-row preview pages")
+    for codec_name in ("raw", "zlib", "lzma"):
+        run(codec_name)
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,84 @@
+import sys
+import os
+import time
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+# Add backend to path
+sys.path.append(os.getcwd())
+
+# Settings are loaded at import time; provide harmless defaults for a standalone run
+os.environ.setdefault("SANDESH_NAMESPACE", "local")
+os.environ.setdefault("SANDESH_ADMIN_USER", "admin")
+os.environ.setdefault("SANDESH_ADMIN_PASSWORD", "benchmark-only")
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+
+from backend.infrastructure.db.models import Base, UserModel, FolderModel
+from backend.infrastructure.db.repositories import EmailRepository, FolderRepository, UserRepository
+from backend.services.mail_service import MailService
+from backend.core.entities.email import Email
+
+SELECTION_SIZES = [50, 500, 2000]
+
+
+def setup(count: int):
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+
+    # Count statements sent to SQLite (an executemany counts once)
+    engine.statements = 0
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        engine.statements += 1
+
+    session = sessionmaker(bind=engine)()
+    session.add(UserModel(username="bench", password_hash="hash"))
+    session.flush()
+    session.add_all([FolderModel(name="Inbox", user_id=1), FolderModel(name="Trash", user_id=1)])
+    session.flush()
+    EmailRepository(session).save_many([
+        Email(id=None, owner_id=1, folder_id=1, sender="sender@local", subject=f"Report {i}",
+              body=f"Numbers for week {i}", recipients=["bench@local"])
+        for i in range(count)
+    ])
+    session.commit()
+    return engine, session
+
+
+def run(count: int, batched: bool):
+    engine, session = setup(count)
+    service = MailService(EmailRepository(session), FolderRepository(session), UserRepository(session), None)
+    ids = list(range(1, count + 1))
+
+    engine.statements = 0
+    start = time.perf_counter()
+    if batched:
+        service.batch_update(1, "move", ids, folder_id=2)
+    else:
+        # What the bulk bar did before: one move request per email
+        for email_id in ids:
+            service.move_email(email_id, 2, 1)
+    session.commit()
+    elapsed = time.perf_counter() - start
+    statements = engine.statements
+
+    session.close()
+    engine.dispose()
+    return elapsed, statements
+
+
+def benchmark():
+    print("Move a selection of emails to Trash")
+    print(f"{'selected':>8} | {'per-email':>22} | {'batch':>17} | speedup")
+    for count in SELECTION_SIZES:
+        single_time, single_statements = run(count, batched=False)
+        batch_time, batch_statements = run(count, batched=True)
+        print(
+            f"{count:>8} | {single_time:8.4f} s {single_statements:>6} stmts | "
+            f"{batch_time:8.4f} s {batch_statements:>2} stmts | {single_time / batch_time:6.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,83 @@
+import sys
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Add backend to path
+sys.path.append(os.getcwd())
+
+# Settings are loaded at import time; point them at a scratch database.
+# Password hashing workers re-import this module and inherit the environment.
+if __name__ == "__main__":
+    fd, DB_PATH = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    SPOOL_DIR = tempfile.mkdtemp(prefix="sandesh-spool-")
+    os.environ["SANDESH_NAMESPACE"] = "local"
+    os.environ["SANDESH_ADMIN_USER"] = "admin"
+    os.environ["SANDESH_ADMIN_PASSWORD"] = "benchmark-only"
+    os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+    os.environ["SANDESH_SMTP_SPOOL_DIR"] = SPOOL_DIR
+
+from fastapi.testclient import TestClient
+from backend.main import app
+from backend.infrastructure.db.session import engine, SessionLocal
+from backend.infrastructure.db.repositories import EmailRepository, FolderRepository
+from backend.core.entities.email import Email
+
+EMAILS = 2000
+ROUNDS = 300
+
+
+def seed():
+    with SessionLocal() as session:
+        inbox = FolderRepository(session).get_by_name_and_user("Inbox", 1)
+        start = datetime(2025, 1, 1)
+        EmailRepository(session).save_many([
+            Email(
+                id=None, owner_id=1, folder_id=inbox.id, sender="Alice <alice@local>",
+                sender_display_name="Alice", sender_email="alice@local",
+                subject=f"Weekly report {i}", body=f"Numbers for week {i}. " * 20,
+                recipients=["admin@local"], timestamp=start + timedelta(minutes=i)
+            )
+            for i in range(EMAILS)
+        ])
+        session.commit()
+        return inbox.id
+
+
+def timed(client, url, headers) -> float:
+    client.get(url, headers=headers)  # warm up
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        client.get(url, headers=headers)
+    return (time.perf_counter() - start) / ROUNDS
+
+
+def benchmark():
+    with TestClient(app) as client:
+        inbox_id = seed()
+        token = client.post(
+            "/api/auth/login", json={"username": "admin", "password": "benchmark-only"}
+        ).json()["access_token"]
+        auth = {"Authorization": f"Bearer {token}", "Accept-Encoding": "gzip"}
+        message_id = client.get(f"/api/mail/{inbox_id}", headers=auth).json()["items"][0]["id"]
+
+        print(f"Unchanged mailbox of {EMAILS} emails, mean of {ROUNDS} requests (full stack, gzip accepted)")
+        print(f"{'endpoint':>28} | {'200':>9} | {'304':>9} | speedup")
+        for url in ["/api/folders", f"/api/mail/{inbox_id}?limit=200", f"/api/message/{message_id}"]:
+            first = client.get(url, headers=auth)
+            conditional = {**auth, "If-None-Match": first.headers["ETag"]}
+            assert client.get(url, headers=conditional).status_code == 304
+            full = timed(client, url, auth)
+            cached = timed(client, url, conditional)
+            print(f"{url:>28} | {full * 1000:6.2f} ms | {cached * 1000:6.2f} ms | {full / cached:5.1f}x")
+
+    engine.dispose()
+    os.remove(DB_PATH)
+    shutil.rmtree(SPOOL_DIR)
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -1,9 +1,8 @@
-
 import sys
 import os
 import time
 import asyncio
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 
 # Add backend to path
@@ -13,6 +12,10 @@ from backend.infrastructure.db.models import Base, UserModel, FolderModel, Email
 from backend.infrastructure.db.repositories import UserRepository, FolderRepository, EmailRepository
 from backend.services.mail_service import MailService
 from backend.infrastructure.smtp.smtp_client import SMTPClient
+from backend.core.entities.email import Email
+from backend.core.entities.folder import Folder
+
+RECIPIENT_COUNTS = [10, 100, 1000]
 
 # Mock SMTP Client
 class MockSMTPClient:
@@ -22,10 +25,33 @@ class MockSMTPClient:
 def setup_db():
     engine = create_engine("sqlite:///:memory:")
     Base.metadata.create_all(engine)
-    return sessionmaker(bind=engine)
 
-def benchmark():
-    SessionLocal = setup_db()
+    # Count statements sent to SQLite (an executemany counts once)
+    engine.statements = 0
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        engine.statements += 1
+
+    return engine, sessionmaker(bind=engine)
+
+def deliver_per_recipient(user_repo, folder_repo, email_repo, sender, recipients, subject, body):
+    """The previous delivery loop: lookups and an INSERT per recipient."""
+    for rcpt in recipients:
+        username, domain = rcpt.split('@', 1)
+        user = user_repo.get_by_username(username)
+        if not user:
+            continue
+        inbox = folder_repo.get_by_name_and_user("Inbox", user.id)
+        if not inbox:
+            inbox = folder_repo.save(Folder(id=None, name="Inbox", user_id=user.id))
+        email_repo.save(Email(
+            id=None, owner_id=user.id, folder_id=inbox.id, sender=sender,
+            subject=subject, body=body, recipients=recipients, is_read=False
+        ))
+
+def run(count, batched):
+    engine, SessionLocal = setup_db()
     session = SessionLocal()
 
     # Setup Repos
@@ -35,38 +61,49 @@ def benchmark():
     smtp_client = MockSMTPClient()
     service = MailService(email_repo, folder_repo, user_repo, smtp_client)
 
-    # Create 100 users
-    print("Creating 100 users...")
-    for i in range(100):
-        user = UserModel(username=f"user{i}", password_hash="hash", display_name=f"User {i}")
-        session.add(user)
-    session.commit()
-
-    # Create Inboxes for them (to simulate normal state)
-    print("Creating Inboxes...")
-    for i in range(100):
-        folder = FolderModel(name="Inbox", user_id=i+1)
-        session.add(folder)
+    # Create users with Inboxes (to simulate normal state)
+    for i in range(count):
+        session.add(UserModel(username=f"user{i}", password_hash="hash", display_name=f"User {i}"))
+    session.flush()
+    for i in range(count):
+        session.add(FolderModel(name="Inbox", user_id=i + 1))
     session.commit()
 
-    # Recipients list (100 users)
-    recipients = [f"user{i}@local" for i in range(100)]
+    recipients = [f"user{i}@local" for i in range(count)]
     sender = "sender@local"
     subject = "Benchmark"
-    body = "Test body"
+    body = "Test body " * 100
 
-    print("Starting delivery to 100 recipients...")
-    start_time = time.time()
+    engine.statements = 0
+    start_time = time.perf_counter()
 
     # Run the delivery
-    service.deliver_incoming_mail(sender, recipients, subject, body)
+    if batched:
+        service.deliver_incoming_mail(sender, recipients, subject, body)
+    else:
+        deliver_per_recipient(user_repo, folder_repo, email_repo, sender, recipients, subject, body)
+    session.commit()
 
-    end_time = time.time()
-    print(f"Delivery took: {end_time - start_time:.4f} seconds")
+    elapsed = time.perf_counter() - start_time
+    statements = engine.statements
 
     # Verify
-    count = session.query(EmailModel).count()
-    print(f"Emails created: {count}")
+    delivered = session.query(EmailModel).count()
+    session.close()
+    engine.dispose()
+    assert delivered == count, f"expected {count} emails, found {delivered}"
+    return elapsed, statements
+
+def benchmark():
+    print(f"{'recipients':>10} | {'per-recipient':>22} | {'batched':>20} | speedup")
+    for count in RECIPIENT_COUNTS:
+        legacy_time, legacy_statements = run(count, batched=False)
+        batched_time, batched_statements = run(count, batched=True)
+        print(
+            f"{count:>10} | {legacy_time:8.4f} s {legacy_statements:>6} stmts | "
+            f"{batched_time:8.4f} s {batched_statements:>4} stmts | "
+            f"{legacy_time / batched_time:6.1f}x"
+        )
 
 if __name__ == "__main__":
     benchmark()
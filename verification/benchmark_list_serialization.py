@@ -0,0 +1,134 @@
+import sys
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Add backend to path
+sys.path.append(os.getcwd())
+
+# Settings are loaded at import time; point them at a scratch database
+fd, DB_PATH = tempfile.mkstemp(suffix=".db")
+os.close(fd)
+os.environ["SANDESH_NAMESPACE"] = "local"
+os.environ.setdefault("SANDESH_ADMIN_USER", "admin")
+os.environ.setdefault("SANDESH_ADMIN_PASSWORD", "benchmark-only")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+
+from pydantic import TypeAdapter
+from backend.infrastructure.db.session import engine, Base, SessionLocal
+from backend.infrastructure.db.models import UserModel, FolderModel
+from backend.infrastructure.db.migrations import run_migrations
+from backend.infrastructure.db.repositories import EmailRepository, FolderRepository, UserRepository
+from backend.services.mail_service import MailService
+from backend.core.entities.email import Email
+from backend.api import serialization
+from backend.api.mail import EmailListResponse, EmailPageResponse, SearchResponse
+
+EMAILS = 2000
+PAGE_SIZES = [50, 200]
+ROUNDS = 200
+
+# Subjects exercise escaping: quotes, backslashes, control and non-ASCII characters
+SUBJECTS = ['Quarterly "budget" review', "Path C:\\reports\\q3", "Tab\there", "Réunion à 10h ✓", "Line\u2028sep"]
+
+
+def setup():
+    Base.metadata.create_all(engine)
+    run_migrations(engine)
+    with SessionLocal() as session:
+        session.add(UserModel(username="user0", password_hash="hash"))
+        session.flush()
+        session.add(FolderModel(name="Inbox", user_id=1))
+        session.commit()
+
+        start = datetime(2025, 1, 1)
+        EmailRepository(session).save_many([
+            Email(
+                id=None, owner_id=1, folder_id=1,
+                sender="Alice <alice@local>" if i % 3 else "bob@local",
+                sender_display_name="Alice" if i % 3 else None,
+                sender_email="alice@local" if i % 3 else "bob@local",
+                subject=f"{SUBJECTS[i % len(SUBJECTS)]} {i}",
+                body=f"Budget numbers for week {i}. " * 10,
+                recipients=["user0@local"],
+                is_read=bool(i % 2),
+                timestamp=start + timedelta(minutes=i)
+            )
+            for i in range(EMAILS)
+        ])
+        session.commit()
+
+
+def timed(fn) -> float:
+    fn()  # warm up
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        fn()
+    return (time.perf_counter() - start) / ROUNDS
+
+
+def benchmark():
+    setup()
+    page_adapter = TypeAdapter(EmailPageResponse)
+    search_adapter = TypeAdapter(SearchResponse)
+
+    with SessionLocal() as session:
+        service = MailService(EmailRepository(session), FolderRepository(session), UserRepository(session), None)
+
+        def listing_models(limit):
+            # What FastAPI did with response_model: models per row, validated again, then encoded
+            page = service.get_folder_emails_page(1, 1, limit=limit, include_total=True)
+            response = EmailPageResponse(
+                items=[EmailListResponse.from_entity(e) for e in page.items],
+                next_cursor=page.next_cursor,
+                total=page.total
+            )
+            return page_adapter.dump_json(page_adapter.validate_python(response))
+
+        def listing_rows(limit):
+            page = service.get_folder_emails_page(1, 1, limit=limit, include_total=True, as_rows=True)
+            return serialization.dumps({
+                "items": EmailListResponse.row_dicts(page.items),
+                "next_cursor": page.next_cursor,
+                "total": page.total,
+            })
+
+        def search_models(limit):
+            page = service.search_emails(1, "budget", limit=limit)
+            response = SearchResponse(
+                items=[EmailListResponse.from_entity(e) for e in page.items],
+                next_offset=page.next_offset
+            )
+            return search_adapter.dump_json(search_adapter.validate_python(response))
+
+        def search_rows(limit):
+            page = service.search_emails(1, "budget", limit=limit, as_rows=True)
+            return serialization.dumps({
+                "items": EmailListResponse.row_dicts(page.items),
+                "next_offset": page.next_offset,
+            })
+
+        encoders = [("orjson", serialization.orjson), ("json", None)] if serialization.orjson else [("json", None)]
+        print(f"{EMAILS} emails in one folder, mean of {ROUNDS} requests (query + serialization)")
+        print(f"{'endpoint':>8} | {'page':>4} | {'encoder':>7} | {'models':>9} | {'rows':>9} | speedup")
+        for name, models, rows in [("listing", listing_models, listing_rows), ("search", search_models, search_rows)]:
+            for limit in PAGE_SIZES:
+                for encoder, module in encoders:
+                    serialization.orjson = module
+                    assert models(limit) == rows(limit), f"{name} output differs ({encoder})"
+                    before = timed(lambda: models(limit))
+                    after = timed(lambda: rows(limit))
+                    print(
+                        f"{name:>8} | {limit:>4} | {encoder:>7} | {before * 1000:6.2f} ms | {after * 1000:6.2f} ms | "
+                        f"{before / after:5.1f}x"
+                    )
+                serialization.orjson = encoders[0][1]
+        print("Output is byte-identical in every case.")
+
+    engine.dispose()
+    os.remove(DB_PATH)
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,89 @@
+import sys
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Add backend to path
+sys.path.append(os.getcwd())
+
+# Settings are loaded at import time; point them at a scratch database
+fd, DB_PATH = tempfile.mkstemp(suffix=".db")
+os.close(fd)
+os.environ["SANDESH_NAMESPACE"] = "local"
+os.environ.setdefault("SANDESH_ADMIN_USER", "admin")
+os.environ.setdefault("SANDESH_ADMIN_PASSWORD", "benchmark-only")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+
+from backend.infrastructure.db.session import engine, Base, SessionLocal
+from backend.infrastructure.db.models import UserModel, FolderModel
+from backend.infrastructure.db.migrations import run_migrations
+from backend.infrastructure.db.repositories import EmailRepository
+from backend.infrastructure.db.message_cache import message_cache
+from backend.core.entities.email import Email
+
+EMAILS = 2000
+WORKING_SET = 50  # Messages a user flips between
+READS = 5000
+RECIPIENTS = [f"user{i}@local" for i in range(20)]
+
+
+def setup():
+    Base.metadata.create_all(engine)
+    run_migrations(engine)
+    with SessionLocal() as session:
+        session.add(UserModel(username="user0", password_hash="hash"))
+        session.flush()
+        session.add(FolderModel(name="Inbox", user_id=1))
+        session.commit()
+
+        start = datetime(2025, 1, 1)
+        EmailRepository(session).save_many([
+            Email(
+                id=None, owner_id=1, folder_id=1, sender="Alice <alice@local>",
+                sender_display_name="Alice", sender_email="alice@local",
+                subject=f"Design review {i}",
+                # Above the compression threshold, as most real bodies are
+                body=f"Notes from review {i}. " + "The proposal looks good overall; see comments inline. " * 60,
+                recipients=RECIPIENTS,
+                timestamp=start + timedelta(minutes=i)
+            )
+            for i in range(EMAILS)
+        ])
+        session.commit()
+
+
+def run(budget: int) -> float:
+    message_cache.max_bytes = budget
+    message_cache.clear()
+    rng = random.Random(7)
+    ids = [rng.randint(1, EMAILS) for _ in range(WORKING_SET)]
+
+    with SessionLocal() as session:
+        repo = EmailRepository(session)
+        start = time.perf_counter()
+        for _ in range(READS):
+            email = repo.get_by_id_and_owner(rng.choice(ids), 1)
+            assert email is not None and len(email.recipients) == len(RECIPIENTS)
+        return (time.perf_counter() - start) / READS
+
+
+def benchmark():
+    setup()
+    print(f"{READS} opens over a working set of {WORKING_SET} of {EMAILS} messages (~3 KB bodies, zlib-stored)")
+    print(f"{'cache budget':>14} | {'per open':>10} | {'hit ratio':>9} | {'evictions':>9} | {'cached':>9}")
+    for budget in [0, 64 * 1024, 32 * 1024 * 1024]:
+        per_open = run(budget)
+        stats = message_cache.snapshot()
+        print(
+            f"{budget:>14} | {per_open * 1e6:7.1f} us | {stats['hit_ratio'] if budget else 0.0:9.2f} | "
+            f"{stats['evictions']:>9} | {stats['bytes']:>9}"
+        )
+        message_cache.hits = message_cache.misses = message_cache.evictions = 0
+    engine.dispose()
+    os.remove(DB_PATH)
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,109 @@
+import sys
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+# Add backend to path
+sys.path.append(os.getcwd())
+
+# Settings are loaded at import time; point them at a scratch database.
+# Password hashing workers re-import this module and inherit the environment.
+if __name__ == "__main__":
+    fd, DB_PATH = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    SPOOL_DIR = tempfile.mkdtemp(prefix="sandesh-spool-")
+    os.environ["SANDESH_NAMESPACE"] = "local"
+    os.environ["SANDESH_ADMIN_USER"] = "admin"
+    os.environ["SANDESH_ADMIN_PASSWORD"] = "benchmark-only"
+    os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+    os.environ["SANDESH_SMTP_SPOOL_DIR"] = SPOOL_DIR
+
+from fastapi.testclient import TestClient
+from backend.main import app
+from backend.infrastructure.db.session import engine
+from backend.infrastructure.security.password import password_hasher
+
+CLIENTS = 16  # Concurrent users signing in
+LOGINS_PER_CLIENT = 4
+
+
+def percentile(values, p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))] if values else 0.0
+
+
+def login_storm(clients: int, per_client: int):
+    """Concurrent logins, each from its own address (the limiter allows 5/min per IP)."""
+    latencies, statuses = [], []
+    lock = threading.Lock()
+
+    def user(n: int):
+        for i in range(per_client):
+            client = TestClient(app, client=(f"10.0.{n}.{i}", 50000))
+            start = time.perf_counter()
+            response = client.post("/api/auth/login", json={"username": "admin", "password": "benchmark-only"})
+            with lock:
+                latencies.append(time.perf_counter() - start)
+                statuses.append(response.status_code)
+
+    threads = [threading.Thread(target=user, args=(n,)) for n in range(clients)]
+    for t in threads:
+        t.start()
+    return threads, latencies, statuses
+
+
+def other_requests(client: TestClient, auth, until) -> list:
+    """An unrelated endpoint, requested back to back while `until()` holds."""
+    latencies = []
+    while until():
+        start = time.perf_counter()
+        assert client.get("/api/folders", headers=auth).status_code == 200
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def run(client: TestClient, auth, workers: int, max_pending: int, clients: int):
+    password_hasher.shutdown()
+    password_hasher.workers, password_hasher.max_pending = workers, max_pending
+    password_hasher.start()
+
+    start = time.perf_counter()
+    threads, logins, statuses = login_storm(clients, LOGINS_PER_CLIENT)
+    folders = other_requests(client, auth, lambda: any(t.is_alive() for t in threads))
+    elapsed = time.perf_counter() - start
+    ok = [l for l, s in zip(logins, statuses) if s == 200]
+    label = f"{workers} proc, {max_pending} max" if workers else "inline"
+    print(
+        f"{label:>16} | {clients:>7} | {statuses.count(200):>4} | {statuses.count(503):>4} | "
+        f"{percentile(ok, 0.5):6.2f} s | {percentile(ok, 0.99):6.2f} s | "
+        f"{percentile(folders, 0.5) * 1000:7.1f} ms | {percentile(folders, 0.99) * 1000:7.1f} ms | {elapsed:5.1f} s"
+    )
+
+
+def benchmark():
+    with TestClient(app) as client:
+        token = client.post(
+            "/api/auth/login", json={"username": "admin", "password": "benchmark-only"}
+        ).json()["access_token"]
+        auth = {"Authorization": f"Bearer {token}"}
+
+        deadline = time.perf_counter() + 2
+        idle = other_requests(client, auth, lambda: time.perf_counter() < deadline)
+        print(f"{os.cpu_count()} CPU(s); GET /api/folders with no logins: "
+              f"p50 {percentile(idle, 0.5) * 1000:.1f} ms, p99 {percentile(idle, 0.99) * 1000:.1f} ms")
+        print(f"{'hashing':>16} | {'clients':>7} | {'200':>4} | {'503':>4} | {'login p50':>8} | {'login p99':>8} | "
+              f"{'folders p50':>10} | {'folders p99':>10} | {'storm':>7}")
+        run(client, auth, workers=0, max_pending=32, clients=CLIENTS)
+        run(client, auth, workers=2, max_pending=32, clients=CLIENTS)
+        # Overload: more concurrent logins than the queue admits are shed with 503
+        run(client, auth, workers=2, max_pending=4, clients=CLIENTS)
+
+    engine.dispose()
+    os.remove(DB_PATH)
+    shutil.rmtree(SPOOL_DIR)
+
+
+if __name__ == "__main__":
+    benchmark()
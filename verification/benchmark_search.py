@@ -0,0 +1,126 @@
+import sys
+import os
+import itertools
+import random
+import tempfile
+import time
+
+# Add backend to path
+sys.path.append(os.getcwd())
+
+# Settings are loaded at import time; provide harmless defaults for a standalone run
+os.environ.setdefault("SANDESH_NAMESPACE", "local")
+os.environ.setdefault("SANDESH_ADMIN_USER", "admin")
+os.environ.setdefault("SANDESH_ADMIN_PASSWORD", "benchmark-only")
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+
+from sqlalchemy import create_engine, select, or_
+from sqlalchemy.orm import sessionmaker
+
+from backend.infrastructure.db.models import Base, UserModel, FolderModel, EmailModel, MessageBodyModel
+from backend.infrastructure.db.repositories import EmailRepository
+from backend.core.entities.email import Email
+from backend.core.value_objects.search_query import SearchQuery
+
+EMAILS = 200000
+USERS = 50
+QUERIES = ["budget", "quarterly report", "maint*", "term4321", "zebra"]
+RUNS = 20
+
+WORDS = (
+    "meeting schedule report quarterly budget review team project deadline update "
+    "please find attached the latest numbers for discussion thanks regards office "
+    "network server maintenance window tonight access badge lunch friday agenda "
+    "minutes action items follow up owner status blocked done next steps"
+).split()
+# Long tail of rarer words, drawn with a Zipf (1/rank) skew like real mail text
+VOCABULARY = WORDS + [f"term{i}" for i in range(20000)]
+CUM_WEIGHTS = list(itertools.accumulate(1 / rank for rank in range(1, len(VOCABULARY) + 1)))
+
+
+def make_text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choices(VOCABULARY, cum_weights=CUM_WEIGHTS, k=words))
+
+
+def populate(session):
+    rng = random.Random(7)
+    for u in range(USERS):
+        session.add(UserModel(username=f"user{u}", password_hash="hash"))
+    session.flush()
+    for u in range(USERS):
+        session.add(FolderModel(name="Inbox", user_id=u + 1))
+    session.flush()
+
+    repo = EmailRepository(session)
+    batch = []
+    for i in range(EMAILS):
+        owner = i % USERS + 1
+        batch.append(Email(
+            id=None, owner_id=owner, folder_id=owner, sender="sender@local",
+            sender_display_name="Sender", sender_email="sender@local",
+            subject=make_text(rng, 5), body=make_text(rng, rng.randint(40, 400)),
+            recipients=[f"user{owner - 1}@local"]
+        ))
+        if len(batch) == 1000:
+            repo.save_many(batch)
+            batch = []
+    repo.save_many(batch)
+    session.commit()
+
+
+def like_scan(session, owner_id, words):
+    # What a search without an index has to do: decode-free LIKE over every row
+    # (only possible on raw bodies; compressed bodies cannot be matched at all)
+    stmt = (
+        select(EmailModel.id)
+        .outerjoin(MessageBodyModel, MessageBodyModel.hash == EmailModel.body_hash)
+        .where(EmailModel.owner_id == owner_id)
+        .limit(25)
+    )
+    for word in words:
+        pattern = f"%{word.rstrip('*')}%"
+        stmt = stmt.where(or_(EmailModel.subject.like(pattern), MessageBodyModel.body.like(pattern)))
+    return session.execute(stmt).all()
+
+
+def benchmark():
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    SessionLocal = sessionmaker(bind=engine)
+
+    print(f"Indexing {EMAILS} emails for {USERS} users (raw bodies, so LIKE can compare)...")
+    os.environ["SANDESH_BODY_CODEC"] = "raw"
+    with SessionLocal() as session:
+        from backend.infrastructure.db.body_codec import BodyCodec
+        import backend.infrastructure.db.repositories as repositories
+        repositories.body_codec = BodyCodec(codec="raw")
+        start = time.perf_counter()
+        populate(session)
+        print(f"populate + index: {time.perf_counter() - start:.1f} s, db {os.path.getsize(path) / 1024 / 1024:.0f} MB")
+
+    with SessionLocal() as session:
+        repo = EmailRepository(session)
+        print(f"{'query':>18} | {'LIKE scan':>10} | {'FTS5 bm25':>10} | hits")
+        for q in QUERIES:
+            query = SearchQuery.parse(q)
+
+            start = time.perf_counter()
+            for _ in range(RUNS):
+                like_scan(session, 7, query.terms)
+            like_ms = (time.perf_counter() - start) / RUNS * 1000
+
+            start = time.perf_counter()
+            for _ in range(RUNS):
+                hits = repo.search(7, query, limit=25)
+            fts_ms = (time.perf_counter() - start) / RUNS * 1000
+
+            print(f"{q:>18} | {like_ms:7.2f} ms | {fts_ms:7.2f} ms | {len(hits)}")
+
+    engine.dispose()
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    benchmark()
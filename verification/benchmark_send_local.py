@@ -0,0 +1,117 @@
+import sys
+import os
+import shutil
+import tempfile
+import time
+
+# Add backend to path
+sys.path.append(os.getcwd())
+
+# Settings are loaded at import time; point them at a scratch database
+fd, DB_PATH = tempfile.mkstemp(suffix=".db")
+os.close(fd)
+SPOOL_DIR = tempfile.mkdtemp(prefix="sandesh-spool-")
+os.environ["SANDESH_NAMESPACE"] = "local"
+os.environ.setdefault("SANDESH_ADMIN_USER", "admin")
+os.environ.setdefault("SANDESH_ADMIN_PASSWORD", "benchmark-only")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ["SANDESH_SMTP_SPOOL_DIR"] = SPOOL_DIR
+
+from backend.infrastructure.db.session import engine, Base, SessionLocal
+from backend.infrastructure.db.models import UserModel, FolderModel, EmailModel
+from backend.infrastructure.db.migrations import run_migrations
+from backend.infrastructure.db.repositories import (
+    EmailRepository, FolderRepository, UserRepository, UnitOfWork
+)
+from backend.infrastructure.db.writer import write_queue, run_write
+from backend.infrastructure.smtp.smtp_client import SMTPClient
+from backend.infrastructure.smtp.smtp_server import create_smtp_controller, delivery_metrics
+from backend.services.mail_service import MailService
+from backend.core.entities.email import Email
+
+PORT = 2598
+SENDS = 200
+RECIPIENT_COUNTS = [1, 10]
+
+
+def setup(recipients: int):
+    with SessionLocal() as session:
+        for i in range(recipients + 1):
+            session.add(UserModel(username=f"user{i}", password_hash="hash"))
+        session.flush()
+        for i in range(recipients + 1):
+            session.add(FolderModel(name="Inbox", user_id=i + 1))
+            session.add(FolderModel(name="Sent", user_id=i + 1))
+        session.commit()
+
+
+def send_via_relay(session, sender, to, subject, body):
+    """The previous path: commit the Sent copy, then SMTP to our own server."""
+    def save_sent_copy(uow: UnitOfWork):
+        sent = uow.folders.get_by_name_and_user("Sent", sender.id)
+        uow.emails.save(Email(
+            id=None, owner_id=sender.id, folder_id=sent.id, sender="user0 <user0@local>",
+            subject=subject, body=body, recipients=to, is_read=True
+        ))
+
+    run_write(write_queue, session, save_sent_copy)
+    SMTPClient(port=PORT).send_message(sender="user0 <user0@local>", recipients=list(to), subject=subject, body=body)
+
+
+def run(recipients: int, loopback: bool):
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    run_migrations(engine)
+    setup(recipients)
+    to = [f"user{i}@local" for i in range(1, recipients + 1)]
+    body = "Lunch is at noon today. " * 40
+
+    with SessionLocal() as session:
+        service = MailService(
+            EmailRepository(session), FolderRepository(session), UserRepository(session),
+            SMTPClient(port=PORT), writer=write_queue
+        )
+        sender = UserRepository(session).get_by_username("user0")
+
+        start = time.perf_counter()
+        for i in range(SENDS):
+            if loopback:
+                service.send_mail(sender, to, f"Message {i}", body)
+            else:
+                send_via_relay(session, sender, to, f"Message {i}", body)
+        # Relayed copies are only stored once the spool has drained
+        while delivery_metrics.snapshot()["pending"] > 0:
+            time.sleep(0.005)
+        elapsed = time.perf_counter() - start
+
+        stored = session.query(EmailModel).count()
+    assert stored == SENDS * (recipients + 1), f"expected {SENDS * (recipients + 1)} emails, found {stored}"
+    return elapsed
+
+
+def benchmark():
+    write_queue.start()
+    controller = create_smtp_controller(hostname="127.0.0.1", port=PORT)
+    controller.handler.start()
+    controller.start()
+    try:
+        print(f"{SENDS} sends, time until every copy is stored")
+        print(f"{'recipients':>10} | {'SMTP relay':>12} | {'in-process':>12} | speedup")
+        for recipients in RECIPIENT_COUNTS:
+            relay = run(recipients, loopback=False)
+            loopback = run(recipients, loopback=True)
+            print(
+                f"{recipients:>10} | {relay / SENDS * 1000:9.2f} ms | {loopback / SENDS * 1000:9.2f} ms | "
+                f"{relay / loopback:6.1f}x"
+            )
+    finally:
+        controller.stop()
+        controller.handler.shutdown()
+        write_queue.stop()
+        engine.dispose()
+        os.remove(DB_PATH)
+        shutil.rmtree(SPOOL_DIR)
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,172 @@
+import sys
+import os
+import multiprocessing
+import shutil
+import smtplib
+import tempfile
+import threading
+import time
+from email.message import EmailMessage
+
+# Add backend to path
+sys.path.append(os.getcwd())
+
+# Settings are loaded at import time; point them at a scratch database
+fd, DB_PATH = tempfile.mkstemp(suffix=".db")
+os.close(fd)
+os.environ.setdefault("SANDESH_NAMESPACE", "local")
+os.environ.setdefault("SANDESH_ADMIN_USER", "admin")
+os.environ.setdefault("SANDESH_ADMIN_PASSWORD", "benchmark-only")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+SPOOL_DIR = tempfile.mkdtemp(prefix="sandesh-spool-")
+os.environ["SANDESH_SMTP_SPOOL_DIR"] = SPOOL_DIR
+
+from aiosmtpd.controller import Controller
+from backend.infrastructure.db.session import engine, Base, SessionLocal
+from backend.infrastructure.db.models import UserModel, FolderModel, EmailModel
+from backend.infrastructure.db.migrations import run_migrations
+from backend.infrastructure.db.writer import write_queue
+from backend.infrastructure.db.repositories import EmailRepository, FolderRepository, UserRepository
+from backend.infrastructure.smtp.smtp_client import smtp_client
+from backend.infrastructure.smtp.smtp_server import (
+    SandeshSMTPHandler, create_smtp_controller, delivery_metrics, parse_message
+)
+from backend.infrastructure.smtp.spool import MailSpool
+from backend.services.mail_service import MailService
+
+PORT = 2599
+MESSAGES = 240
+SENDER_COUNTS = [1, 4, 16]
+RECIPIENTS = [f"user{i}@local" for i in range(20)]
+
+
+def deliver_message(mail_from: str, rcpt_tos, data: bytes):
+    """Parse and deliver one message straight to the database (no spool)."""
+    subject, body = parse_message(data)
+    with SessionLocal() as session:
+        MailService(
+            EmailRepository(session), FolderRepository(session), UserRepository(session),
+            smtp_client, writer=write_queue
+        ).deliver_incoming_mail(sender=mail_from, recipients=rcpt_tos, subject=subject, body=body)
+
+
+class OnLoopHandler(SandeshSMTPHandler):
+    """The original behaviour: parse and deliver on the event loop itself."""
+
+    async def handle_DATA(self, server, session, envelope):
+        deliver_message(envelope.mail_from, envelope.rcpt_tos, envelope.content)
+        return '250 OK'
+
+
+def setup():
+    Base.metadata.create_all(engine)
+    run_migrations(engine)
+    with SessionLocal() as session:
+        for i in range(len(RECIPIENTS)):
+            session.add(UserModel(username=f"user{i}", password_hash="hash"))
+        session.flush()
+        for i in range(len(RECIPIENTS)):
+            session.add(FolderModel(name="Inbox", user_id=i + 1))
+        session.commit()
+
+
+def make_message(i: int) -> EmailMessage:
+    msg = EmailMessage()
+    msg.set_content("Build finished. " * 200)
+    msg["Subject"] = f"CI notification {i}"
+    msg["From"] = "CI <ci@local>"
+    msg["To"] = ", ".join(RECIPIENTS)
+    return msg
+
+
+def warm_up(_):
+    # Spawned workers import and start lazily; keep that out of the timings
+    return os.getpid()
+
+
+def sender(count: int) -> int:
+    # Runs in a separate process, like a real SMTP client
+    rejected = 0
+    with smtplib.SMTP("127.0.0.1", PORT) as smtp:
+        for i in range(count):
+            try:
+                smtp.send_message(make_message(i))
+            except smtplib.SMTPException:
+                rejected += 1
+    return rejected
+
+
+def probe(stop: threading.Event, samples: list):
+    """Round-trip NOOPs on an idle session: how long other clients wait on the loop."""
+    with smtplib.SMTP("127.0.0.1", PORT) as smtp:
+        while not stop.is_set():
+            start = time.perf_counter()
+            smtp.noop()
+            samples.append((time.perf_counter() - start) * 1000)
+            time.sleep(0.005)
+
+
+def wait_for_delivery():
+    while delivery_metrics.snapshot()["pending"] > 0:
+        time.sleep(0.01)
+
+
+def run(pool, senders: int):
+    samples = []
+    stop = threading.Event()
+    prober = threading.Thread(target=probe, args=(stop, samples))
+    prober.start()
+
+    start = time.perf_counter()
+    rejected = sum(pool.map(sender, [MESSAGES // senders] * senders))
+    accepted = time.perf_counter() - start
+    wait_for_delivery()
+    delivered = time.perf_counter() - start
+
+    stop.set()
+    prober.join()
+    samples.sort()
+    p99 = samples[int(len(samples) * 0.99) - 1] if samples else 0.0
+    return MESSAGES / accepted, MESSAGES / delivered, p99, rejected
+
+
+def benchmark():
+    setup()
+    write_queue.start()
+    pool = multiprocessing.get_context("spawn").Pool(max(SENDER_COUNTS))
+    pool.map(warm_up, range(max(SENDER_COUNTS)))
+    try:
+        print(f"{MESSAGES} messages to {len(RECIPIENTS)} local recipients each, senders in separate processes")
+        print(f"{'handler':>9} | {'senders':>7} | {'accepted/s':>10} | {'stored/s':>8} | {'NOOP p99':>9} | rejected")
+        for name in ("on-loop", "spool"):
+            if name == "on-loop":
+                handler = OnLoopHandler(MailSpool(SPOOL_DIR))
+                controller = Controller(handler, hostname="127.0.0.1", port=PORT, data_size_limit=204800)
+            else:
+                controller = create_smtp_controller(hostname="127.0.0.1", port=PORT)
+                controller.handler.start()
+            controller.start()
+            try:
+                for senders in SENDER_COUNTS:
+                    accepted, stored, p99, rejected = run(pool, senders)
+                    print(
+                        f"{name:>9} | {senders:>7} | {accepted:10.1f} | {stored:8.1f} | "
+                        f"{p99:6.1f} ms | {rejected}"
+                    )
+            finally:
+                controller.stop()
+                controller.handler.shutdown()
+        print("spool metrics:", delivery_metrics.snapshot())
+    finally:
+        pool.close()
+        write_queue.stop()
+        shutil.rmtree(SPOOL_DIR)
+
+    with SessionLocal() as session:
+        print("emails stored:", session.query(EmailModel).count())
+    engine.dispose()
+    os.remove(DB_PATH)
+
+
+if __name__ == "__main__":
+    benchmark()
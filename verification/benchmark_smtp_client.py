@@ -0,0 +1,65 @@
+import sys
+import os
+import smtplib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.message import EmailMessage
+
+# Add backend to path
+sys.path.append(os.getcwd())
+
+# Settings are loaded at import time; provide harmless defaults for a standalone run
+os.environ.setdefault("SANDESH_NAMESPACE", "local")
+os.environ.setdefault("SANDESH_ADMIN_USER", "admin")
+os.environ.setdefault("SANDESH_ADMIN_PASSWORD", "benchmark-only")
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+
+from aiosmtpd.controller import Controller
+from aiosmtpd.handlers import Sink
+from backend.infrastructure.smtp.smtp_client import SMTPClient
+
+PORT = 2597
+MESSAGES = 400
+THREAD_COUNTS = [1, 8]
+
+
+def send_per_connection(sender, recipients, subject, body):
+    """The previous client: one SMTP session (connect, EHLO, QUIT) per message."""
+    msg = EmailMessage()
+    msg.set_content(body)
+    msg["Subject"] = subject
+    msg["From"] = sender
+    msg["To"] = ", ".join(recipients)
+    with smtplib.SMTP("127.0.0.1", PORT) as smtp:
+        smtp.send_message(msg)
+
+
+def run(send, threads: int) -> float:
+    def one(i):
+        send("Alice <alice@local>", ["partner@example.com"], f"Invoice {i}", "Please find it attached. " * 20)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        list(pool.map(one, range(MESSAGES)))
+    return MESSAGES / (time.perf_counter() - start)
+
+
+def benchmark():
+    # A sink server isolates the client's own cost from delivery
+    controller = Controller(Sink(), hostname="127.0.0.1", port=PORT)
+    controller.start()
+    client = SMTPClient("127.0.0.1", PORT, pool_size=max(THREAD_COUNTS))
+    try:
+        print(f"{MESSAGES} messages to a sink SMTP server")
+        print(f"{'threads':>7} | {'per-message session':>20} | {'pooled':>12} | speedup")
+        for threads in THREAD_COUNTS:
+            single = run(send_per_connection, threads)
+            pooled = run(client.send_message, threads)
+            print(f"{threads:>7} | {single:14.1f} msg/s | {pooled:6.1f} msg/s | {pooled / single:6.1f}x")
+    finally:
+        client.close()
+        controller.stop()
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,109 @@
+import sys
+import os
+import random
+import shutil
+import tempfile
+import time
+
+# Add backend to path
+sys.path.append(os.getcwd())
+
+from fastapi import FastAPI, Request
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import FileResponse
+from fastapi.staticfiles import StaticFiles
+from fastapi.testclient import TestClient
+from backend.api.static_assets import StaticAssets
+
+ROUNDS = 100
+WORDS = ["const", "function", "return", "useState", "props", "className", "=>", "export", "import", "null"]
+
+
+def build(directory: str):
+    """A Vite-like build: a ~600 KB JS bundle, a ~150 KB stylesheet and index.html."""
+    rng = random.Random(3)
+    os.makedirs(os.path.join(directory, "assets"))
+    with open(os.path.join(directory, "assets", "index-BX3k9aQ2.js"), "w") as f:
+        f.write(" ".join(f"{rng.choice(WORDS)}{rng.randint(0, 500)}" for _ in range(80000)))
+    with open(os.path.join(directory, "assets", "index-Cq8Zr1Lm.css"), "w") as f:
+        f.write("".join(f".c{i}{{margin:{i % 16}px;color:#{rng.randint(0, 0xffffff):06x}}}\n" for i in range(6000)))
+    with open(os.path.join(directory, "index.html"), "w") as f:
+        f.write(
+            '<!doctype html><html lang="en"><head><meta charset="UTF-8"><title>Sandesh</title>'
+            '<script type="module" crossorigin src="/assets/index-BX3k9aQ2.js"></script>'
+            '<link rel="stylesheet" crossorigin href="/assets/index-Cq8Zr1Lm.css"></head>'
+            '<body><div id="root"></div></body></html>' + " " * 400
+        )
+
+
+def before_app(directory: str) -> FastAPI:
+    # What main.py did: StaticFiles + FileResponse, gzipped per request by the middleware
+    app = FastAPI()
+    app.add_middleware(GZipMiddleware, minimum_size=500)
+    app.mount("/assets", StaticFiles(directory=os.path.join(directory, "assets")), name="assets")
+
+    @app.get("/{full_path:path}")
+    async def spa(full_path: str):
+        return FileResponse(os.path.join(directory, "index.html"))
+    return app
+
+
+def after_app(directory: str) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(GZipMiddleware, minimum_size=500)
+    assets = StaticAssets(directory)
+    assets.load()
+
+    @app.get("/assets/{path:path}")
+    async def asset(path: str, request: Request):
+        return assets.response(f"assets/{path}", request.headers.get("accept-encoding"), request.headers.get("if-none-match"))
+
+    @app.get("/{full_path:path}")
+    async def spa(full_path: str, request: Request):
+        return assets.response("index.html", request.headers.get("accept-encoding"), request.headers.get("if-none-match"))
+    return app
+
+
+def page_load(client: TestClient) -> int:
+    """One cold page load: index.html plus its bundles. Returns bytes on the wire."""
+    sent = 0
+    for url in ["/inbox", "/assets/index-BX3k9aQ2.js", "/assets/index-Cq8Zr1Lm.css"]:
+        response = client.get(url, headers={"Accept-Encoding": "gzip, deflate, br"})
+        assert response.status_code == 200
+        sent += response.num_bytes_downloaded
+    return sent
+
+
+def timed(client: TestClient):
+    sent = page_load(client)  # warm up
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        page_load(client)
+    return (time.perf_counter() - start) / ROUNDS, sent
+
+
+def benchmark():
+    directory = tempfile.mkdtemp(prefix="sandesh-static-")
+    build(directory)
+
+    start = time.perf_counter()
+    after = after_app(directory)
+    load_time = time.perf_counter() - start
+
+    print(f"Cold page load (index.html + JS + CSS, gzip/br accepted), mean of {ROUNDS}")
+    print(f"{'serving':>26} | {'per load':>10} | {'on the wire':>11}")
+    with TestClient(before_app(directory)) as client:
+        old, old_sent = timed(client)
+    print(f"{'StaticFiles + GZip':>26} | {old * 1000:7.2f} ms | {old_sent // 1024:>8} KB")
+    with TestClient(after) as client:
+        new, new_sent = timed(client)
+        etag = client.get("/inbox").headers["ETag"]
+        assert client.get("/inbox", headers={"If-None-Match": etag}).status_code == 304
+    print(f"{'precompressed, in memory':>26} | {new * 1000:7.2f} ms | {new_sent // 1024:>8} KB")
+    print(f"Speedup {old / new:.1f}x; one-off load and compression at startup took {load_time * 1000:.0f} ms")
+
+    shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,181 @@
+"""
+Behavioral check for delta sync (GET /api/sync) and the `mail_changes` log.
+
+Asserts outcomes rather than timings: a replica built from sync responses
+matches the server's listings after adds, reads, moves and deletes; paged
+responses converge to the same state as one full response; an unchanged
+mailbox returns nothing; sync points past the head or behind pruned removals
+answer 410; and one user's changes (including a reused email id) never reach
+another user's sync. Exits non-zero on the first failure.
+"""
+import sys
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Add backend to path
+sys.path.append(os.getcwd())
+
+# Settings are loaded at import time; point them at a scratch database.
+# Password hashing workers re-import this module and inherit the environment.
+if __name__ == "__main__":
+    fd, DB_PATH = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    SPOOL_DIR = tempfile.mkdtemp(prefix="sandesh-spool-")
+    os.environ["SANDESH_NAMESPACE"] = "local"
+    os.environ["SANDESH_ADMIN_USER"] = "admin"
+    os.environ["SANDESH_ADMIN_PASSWORD"] = "verification-only"
+    os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+    os.environ["SANDESH_SMTP_SPOOL_DIR"] = SPOOL_DIR
+
+from fastapi.testclient import TestClient
+from backend.main import app
+from backend.infrastructure.db.session import engine, SessionLocal
+from backend.infrastructure.db.repositories import ChangeLogRepository
+
+
+def expect(condition: bool, what: str):
+    if not condition:
+        raise AssertionError(what)
+    print(f"ok  {what}")
+
+
+def login(client, username: str, password: str) -> dict:
+    token = client.post("/api/auth/login", json={"username": username, "password": password}).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def send(client, auth, to: str, subject: str):
+    """Queue a message and wait until the outbox has delivered it."""
+    queued = client.post("/api/mail/send", json={"to": [to], "subject": subject, "body": "Body"}, headers=auth)
+    assert queued.status_code == 202, queued.text
+    for _ in range(200):
+        status = client.get(f"/api/mail/outbox/{queued.json()['id']}", headers=auth).json()["status"]
+        if status in ("sent", "failed"):
+            assert status == "sent", status
+            return
+        time.sleep(0.05)
+    raise AssertionError(f"{subject!r} was not delivered")
+
+
+def sync(client, auth, since=None, limit=None):
+    params = {key: value for key, value in (("since", since), ("limit", limit)) if value is not None}
+    response = client.get("/api/sync", params=params, headers=auth)
+    return response if response.status_code != 200 else response.json()
+
+
+def apply(replica: dict, changes: dict):
+    """Apply one sync response to a client-side {id: (folder_id, is_read)} replica."""
+    for item in changes["added"] + changes["changed"]:
+        replica[item["id"]] = (item["folder_id"], item["is_read"])
+    for email_id in changes["removed"]:
+        replica.pop(email_id, None)
+
+
+def server_state(client, auth) -> dict:
+    state = {}
+    for folder in client.get("/api/folders", headers=auth).json():
+        items = client.get(f"/api/mail/{folder['id']}", params={"limit": 100}, headers=auth).json()["items"]
+        state.update({item["id"]: (folder["id"], item["is_read"]) for item in items})
+    return state
+
+
+def main():
+    with TestClient(app) as client:
+        admin = login(client, "admin", "verification-only")
+        created = client.post("/api/users", json={"username": "bob", "password": "verification-only"}, headers=admin)
+        assert created.status_code == 200, created.text
+        bob = login(client, "bob", "verification-only")
+        folders = {folder["name"]: folder["id"] for folder in client.get("/api/folders", headers=bob).json()}
+
+        start = sync(client, bob)
+        expect(start["added"] == [] and len(start["folders"]) == 3, "a first sync returns the modseq and folders only")
+        s0 = start["modseq"]
+        idle = sync(client, bob, since=s0)
+        expect(
+            idle["modseq"] == s0 and not (idle["added"] or idle["changed"] or idle["removed"] or idle["folders"]),
+            "an unchanged mailbox syncs to nothing"
+        )
+
+        for i in range(4):
+            send(client, admin, "bob@local", f"Message {i}")
+        replica = {}
+        changes = sync(client, bob, since=s0)
+        apply(replica, changes)
+        ids = [item["id"] for item in changes["added"]]
+        expect(
+            [item["subject"] for item in changes["added"]] == [f"Message {i}" for i in range(4)],
+            "delivered mail is reported as added, in delivery order"
+        )
+        expect(changes["folders"] and not changes["more"], "a change carries the folder counters")
+        s1 = changes["modseq"]
+
+        client.get(f"/api/message/{ids[0]}", headers=bob)
+        client.put(f"/api/message/{ids[1]}/move", json={"folder_id": folders["Trash"]}, headers=bob)
+        client.post("/api/messages/batch", json={"action": "delete", "ids": [ids[2]]}, headers=bob)
+
+        changes = sync(client, bob, since=s1)
+        changed = {item["id"]: (item["folder_id"], item["is_read"]) for item in changes["changed"]}
+        expect(changes["added"] == [], "nothing new is reported as added")
+        expect(changed.get(ids[0], (None, None))[1] is True, "reading an email reports it changed")
+        expect(changed.get(ids[1], (None,))[0] == folders["Trash"], "moving an email reports it changed")
+        expect(changes["removed"] == [ids[2]], "deleting an email reports it removed")
+        apply(replica, changes)
+        expect(replica == server_state(client, bob), "the replica matches the server's listings")
+
+        full = sync(client, bob, since=s0)
+        expect(
+            sorted(item["id"] for item in full["added"]) == sorted([ids[0], ids[1], ids[3]]),
+            "emails added and then changed since a sync point still read as added"
+        )
+
+        paged, cursor, pages = {}, s0, 0
+        while True:
+            page = sync(client, bob, since=cursor, limit=1)
+            apply(paged, page)
+            cursor, pages = page["modseq"], pages + 1
+            if not page["more"]:
+                break
+        final = {}
+        apply(final, full)
+        expect(pages > 1 and paged == final, "limit=1 pages converge to the full response")
+        expect(cursor == full["modseq"], "the last page ends at the head")
+
+        gone = sync(client, bob, since=full["modseq"] + 1)
+        expect(gone.status_code == 410, "a sync point past the head answers 410")
+
+        # Another user's writes never reach bob, even when bob's deleted id is reused
+        admin_start = sync(client, admin)["modseq"]
+        send(client, admin, "admin@local", "Admin only")
+        head = full["modseq"]
+        expect(sync(client, bob, since=head)["modseq"] == head, "another user's mail leaves the modseq alone")
+        mine = sync(client, admin, since=admin_start)
+        expect(
+            {item["subject"] for item in mine["added"]} == {"Admin only"} and mine["removed"] == [],
+            "a user's sync holds only their own changes"
+        )
+        since_delete = sync(client, bob, since=s1)
+        expect(
+            since_delete["removed"] == [ids[2]]
+            and {item["id"] for item in since_delete["changed"]} <= set(ids) and since_delete["added"] == [],
+            "a deleted id stays removed for its old owner even if reused"
+        )
+
+        # Pruned removals move the floor: older sync points must resync
+        with SessionLocal() as session:
+            pruned = ChangeLogRepository(session).prune_removed(datetime.utcnow() + timedelta(days=1))
+            session.commit()
+        expect(pruned >= 1, "removal entries are pruned")
+        expect(sync(client, bob, since=s1).status_code == 410, "a sync point behind a pruned removal answers 410")
+        expect(sync(client, bob, since=head)["removed"] == [], "a sync point past the pruned removals still works")
+
+    engine.dispose()
+    os.remove(DB_PATH)
+    shutil.rmtree(SPOOL_DIR)
+    print("delta sync: all checks passed")
+
+
+if __name__ == "__main__":
+    main()
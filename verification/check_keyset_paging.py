@@ -0,0 +1,147 @@
+"""
+Behavioral check for keyset-paginated folder listings (GET /api/mail/{folder_id}).
+
+Asserts outcomes rather than timings: every email appears exactly once and in
+(timestamp DESC, id DESC) order across pages, ties on timestamp are broken by
+id, an exactly full last page ends the listing, mail arriving mid-pagination
+does not shift later pages, and bad cursors are refused. Exits non-zero on the
+first failure.
+"""
+import sys
+import os
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+
+# Add backend to path
+sys.path.append(os.getcwd())
+
+# Settings are loaded at import time; point them at a scratch database.
+# Password hashing workers re-import this module and inherit the environment.
+if __name__ == "__main__":
+    fd, DB_PATH = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    SPOOL_DIR = tempfile.mkdtemp(prefix="sandesh-spool-")
+    os.environ["SANDESH_NAMESPACE"] = "local"
+    os.environ["SANDESH_ADMIN_USER"] = "admin"
+    os.environ["SANDESH_ADMIN_PASSWORD"] = "verification-only"
+    os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+    os.environ["SANDESH_SMTP_SPOOL_DIR"] = SPOOL_DIR
+
+from fastapi.testclient import TestClient
+from backend.main import app
+from backend.infrastructure.db.session import engine, SessionLocal
+from backend.infrastructure.db.repositories import EmailRepository, FolderRepository
+from backend.core.entities.email import Email
+
+EMAILS = 49
+PAGE = 7  # 49 = 7 full pages: the last one must still end the listing
+START = datetime(2025, 1, 1)
+
+
+def expect(condition: bool, what: str):
+    if not condition:
+        raise AssertionError(what)
+    print(f"ok  {what}")
+
+
+def seed(count: int, minute_offset: int = 0) -> int:
+    """Emails in admin's Inbox, three per timestamp so ties must be broken by id."""
+    with SessionLocal() as session:
+        inbox = FolderRepository(session).get_by_name_and_user("Inbox", 1)
+        EmailRepository(session).save_many([
+            Email(
+                id=None, owner_id=1, folder_id=inbox.id, sender="Alice <alice@local>",
+                sender_display_name="Alice", sender_email="alice@local",
+                subject=f"Message {i}", body="Body", recipients=["admin@local"],
+                timestamp=START + timedelta(minutes=minute_offset + i // 3)
+            )
+            for i in range(count)
+        ])
+        session.commit()
+        return inbox.id
+
+
+def expected_order(inbox_id: int):
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql(
+            "SELECT id FROM emails WHERE folder_id = ? ORDER BY timestamp DESC, id DESC", (inbox_id,)
+        ).all()
+    return [row[0] for row in rows]
+
+
+def walk(client, url, auth, limit: int):
+    """Follow next_cursor to the end; returns (ids in order, pages)."""
+    ids, pages, cursor = [], 0, None
+    while True:
+        params = {"limit": limit, **({"cursor": cursor} if cursor else {})}
+        response = client.get(url, params=params, headers=auth)
+        assert response.status_code == 200, response.text
+        body = response.json()
+        assert len(body["items"]) <= limit
+        ids.extend(item["id"] for item in body["items"])
+        pages += 1
+        cursor = body["next_cursor"]
+        if cursor is None:
+            return ids, pages
+
+
+def walk_from(client, url, auth, cursor) -> list:
+    """Remaining ids after `cursor`, one PAGE at a time."""
+    ids = []
+    while cursor:
+        body = client.get(url, params={"limit": PAGE, "cursor": cursor}, headers=auth).json()
+        ids.extend(item["id"] for item in body["items"])
+        cursor = body["next_cursor"]
+    return ids
+
+
+def main():
+    with TestClient(app) as client:
+        inbox_id = seed(EMAILS)
+        token = client.post(
+            "/api/auth/login", json={"username": "admin", "password": "verification-only"}
+        ).json()["access_token"]
+        auth = {"Authorization": f"Bearer {token}"}
+        url = f"/api/mail/{inbox_id}"
+        order = expected_order(inbox_id)
+
+        ids, pages = walk(client, url, auth, PAGE)
+        expect(ids == order, "pages concatenate to (timestamp DESC, id DESC) order, ties broken by id")
+        expect(len(set(ids)) == EMAILS, "no email is repeated or skipped")
+        expect(pages == EMAILS // PAGE, "an exactly full last page carries no next_cursor")
+
+        for limit in (1, 2, 5, 48, 50):
+            expect(walk(client, url, auth, limit)[0] == order, f"limit={limit} yields the same sequence")
+
+        total = client.get(url, params={"include_total": True}, headers=auth).json()["total"]
+        expect(total == EMAILS, "include_total counts the whole folder")
+
+        # New mail lands at the head; a listing already in progress must not shift
+        first = client.get(url, params={"limit": PAGE}, headers=auth).json()
+        seed(5, minute_offset=10_000)
+        rest = walk_from(client, url, auth, first["next_cursor"])
+        expect(
+            [item["id"] for item in first["items"]] + rest == order,
+            "mail arriving mid-pagination does not shift later pages"
+        )
+
+        for bad in ("!!", "bm90LWpzb24", "WyJub3QtYS1kYXRlIiwgMV0"):
+            response = client.get(url, params={"cursor": bad}, headers=auth)
+            expect(response.status_code == 400, f"malformed cursor {bad!r} answers 400")
+        expect(
+            client.get(url, params={"cursor": "!!"}, headers={**auth, "If-None-Match": "*"}).status_code == 400,
+            "a malformed cursor is refused before the conditional check"
+        )
+        expect(client.get(url, params={"limit": 0}, headers=auth).status_code == 422, "limit=0 is rejected")
+        unknown = client.get("/api/mail/999999", headers=auth)
+        expect(unknown.status_code == 200 and unknown.json()["items"] == [], "an unknown folder lists nothing")
+
+    engine.dispose()
+    os.remove(DB_PATH)
+    shutil.rmtree(SPOOL_DIR)
+    print("keyset paging: all checks passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Behavioral check for migration 10, which rebuilds `mail_changes` to key it by
+(user_id, email_id).
+
+Builds a database with the layout shipped before the migration (keyed by
+email_id alone), fills the change log, and asserts that the rebuild keeps
+every row and both indexes, that the new key admits the same email id for two
+users, that rerunning applies nothing, and that a fresh database (already at
+the current layout) passes through untouched. Exits non-zero on the first
+failure.
+"""
+import sys
+import os
+import tempfile
+from datetime import datetime
+
+# Add backend to path
+sys.path.append(os.getcwd())
+
+# Settings are loaded at import time; the app database itself is not used
+if __name__ == "__main__":
+    fd, DB_PATH = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    os.environ["SANDESH_NAMESPACE"] = "local"
+    os.environ["SANDESH_ADMIN_USER"] = "admin"
+    os.environ["SANDESH_ADMIN_PASSWORD"] = "verification-only"
+    os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+
+from sqlalchemy import create_engine
+from backend.infrastructure.db.session import Base
+from backend.infrastructure.db import models  # noqa: F401 (registers the tables)
+from backend.infrastructure.db.migrations import run_migrations
+
+# `mail_changes` as created before migration 10
+OLD_LAYOUT = [
+    "CREATE TABLE mail_changes ("
+    "email_id INTEGER NOT NULL, "
+    "user_id INTEGER NOT NULL, "
+    "modseq INTEGER NOT NULL, "
+    "created_modseq INTEGER NOT NULL, "
+    "removed BOOLEAN NOT NULL, "
+    "changed_at DATETIME NOT NULL, "
+    "PRIMARY KEY (email_id), "
+    "FOREIGN KEY(user_id) REFERENCES users (id))",
+    "CREATE INDEX ix_mail_changes_user_modseq ON mail_changes (user_id, modseq)",
+    "CREATE INDEX ix_mail_changes_removed ON mail_changes (changed_at) WHERE removed = 1",
+]
+
+INSERT = (
+    "INSERT INTO mail_changes (email_id, user_id, modseq, created_modseq, removed, changed_at) "
+    "VALUES (?, ?, ?, ?, ?, ?)"
+)
+ROWS = [
+    # email_id, user_id, modseq, created_modseq, removed, changed_at
+    (1, 1, 3, 1, 0, "2025-01-01 10:00:00.000000"),
+    (2, 1, 4, 2, 1, "2025-01-01 11:00:00.000000"),
+    (3, 2, 1, 1, 0, "2025-01-02 09:00:00.000000"),
+    (4, 2, 2, 0, 1, "2025-01-02 09:30:00.000000"),
+]
+
+
+def expect(condition: bool, what: str):
+    if not condition:
+        raise AssertionError(what)
+    print(f"ok  {what}")
+
+
+def scratch_engine():
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    return create_engine(f"sqlite:///{path}"), path
+
+
+def primary_key(conn) -> list:
+    info = conn.exec_driver_sql("PRAGMA table_info(mail_changes)").all()
+    return [row[1] for row in sorted((row for row in info if row[5]), key=lambda row: row[5])]
+
+
+def indexes(conn) -> dict:
+    return dict(conn.exec_driver_sql(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = 'mail_changes' AND sql IS NOT NULL"
+    ).all())
+
+
+def rows(conn) -> list:
+    return conn.exec_driver_sql(
+        "SELECT email_id, user_id, modseq, created_modseq, removed, changed_at FROM mail_changes ORDER BY email_id"
+    ).all()
+
+
+def check_old_layout():
+    engine, path = scratch_engine()
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.exec_driver_sql("DROP TABLE mail_changes")
+        for ddl in OLD_LAYOUT:
+            conn.exec_driver_sql(ddl)
+        conn.exec_driver_sql(INSERT, ROWS)
+        conn.exec_driver_sql(
+            "CREATE TABLE schema_migrations (version INTEGER PRIMARY KEY, description VARCHAR NOT NULL, "
+            "applied_at DATETIME NOT NULL)"
+        )
+        conn.exec_driver_sql(
+            "INSERT INTO schema_migrations VALUES (?, 'before mail_changes rekey', ?)",
+            [(version, datetime.utcnow()) for version in range(1, 10)]
+        )
+        expect(primary_key(conn) == ["email_id"], "the old layout is keyed by email_id alone")
+
+    applied = run_migrations(engine)
+    expect(applied[:1] == [10], "migration 10 applies to the old layout")
+
+    with engine.connect() as conn:
+        expect(primary_key(conn) == ["user_id", "email_id"], "the rebuilt table is keyed by (user_id, email_id)")
+        expect([tuple(row) for row in rows(conn)] == ROWS, "every change log row survives the rebuild")
+        found = indexes(conn)
+        expect(
+            set(found) == {"ix_mail_changes_user_modseq", "ix_mail_changes_removed"},
+            "both indexes exist on the rebuilt table"
+        )
+        expect("WHERE removed = 1" in found["ix_mail_changes_removed"], "the removal index stays partial")
+        expect(
+            conn.exec_driver_sql("SELECT count(*) FROM sqlite_master WHERE name = 'mail_changes_old'").scalar() == 0,
+            "the old table is dropped"
+        )
+
+    with engine.begin() as conn:
+        # Email id 1 was user 1's; after a delete SQLite may hand it to user 2
+        conn.exec_driver_sql(INSERT, [(1, 2, 5, 5, 0, "2025-01-03 00:00:00.000000")])
+        expect(
+            conn.exec_driver_sql("SELECT count(*) FROM mail_changes WHERE email_id = 1").scalar() == 2,
+            "the same email id can be logged for two users"
+        )
+
+    expect(run_migrations(engine) == [], "a rerun applies nothing")
+    engine.dispose()
+    os.remove(path)
+
+
+def check_fresh_database():
+    engine, path = scratch_engine()
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.exec_driver_sql(INSERT, [(1, 7, 1, 1, 0, "2025-01-01 00:00:00.000000")])
+        before = indexes(conn)
+
+    applied = run_migrations(engine)
+    with engine.connect() as conn:
+        expect(10 in applied and primary_key(conn) == ["user_id", "email_id"], "a fresh database keeps its layout")
+        expect(len(rows(conn)) == 1 and indexes(conn) == before, "a fresh database is not rebuilt")
+    engine.dispose()
+    os.remove(path)
+
+
+def main():
+    check_old_layout()
+    check_fresh_database()
+    os.remove(DB_PATH)
+    print("mail_changes migration: all checks passed")
+
+
+if __name__ == "__main__":
+    main()
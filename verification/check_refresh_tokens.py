@@ -0,0 +1,154 @@
+"""
+Behavioral check for refresh-token rotation, reuse detection and family
+revocation (POST /api/auth/refresh and /api/auth/logout).
+
+Asserts outcomes rather than timings: a refresh rotates the token; a rotated
+token presented again within the grace period is refused without touching its
+family, and after the grace period revokes its whole family but no other
+login's; logout and deactivation revoke what they should; an expired token is
+refused as expired rather than as reuse; and only token digests are stored.
+Exits non-zero on the first failure.
+"""
+import sys
+import os
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+
+# Add backend to path
+sys.path.append(os.getcwd())
+
+# Settings are loaded at import time; point them at a scratch database.
+# Password hashing workers re-import this module and inherit the environment.
+if __name__ == "__main__":
+    fd, DB_PATH = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    SPOOL_DIR = tempfile.mkdtemp(prefix="sandesh-spool-")
+    os.environ["SANDESH_NAMESPACE"] = "local"
+    os.environ["SANDESH_ADMIN_USER"] = "admin"
+    os.environ["SANDESH_ADMIN_PASSWORD"] = "verification-only"
+    os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+    os.environ["SANDESH_SMTP_SPOOL_DIR"] = SPOOL_DIR
+
+from fastapi.testclient import TestClient
+from backend.main import app
+from backend.services import auth_service
+from backend.infrastructure.db.session import engine
+from backend.infrastructure.security.jwt import hash_refresh_token
+
+logins = 0
+
+
+def expect(condition: bool, what: str):
+    if not condition:
+        raise AssertionError(what)
+    print(f"ok  {what}")
+
+
+def login(username: str) -> dict:
+    """Log in from a fresh client address, clear of the per-IP login limit."""
+    global logins
+    logins += 1
+    client = TestClient(app, client=(f"192.0.2.{logins}", 50000))
+    response = client.post("/api/auth/login", json={"username": username, "password": "verification-only"})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def refresh(client, token: str):
+    return client.post("/api/auth/refresh", json={"refresh_token": token})
+
+
+def reasons(token: str) -> set:
+    """Revocation reasons recorded for every token in `token`'s family."""
+    with engine.connect() as conn:
+        return {row[0] for row in conn.exec_driver_sql(
+            "SELECT reason FROM refresh_token_revocations WHERE family_id = "
+            "(SELECT family_id FROM refresh_token_revocations WHERE token_hash = ? "
+            "UNION SELECT family_id FROM refresh_tokens WHERE token_hash = ?)",
+            (hash_refresh_token(token),) * 2
+        )}
+
+
+def main():
+    with TestClient(app) as client:
+        admin = {"Authorization": f"Bearer {login('admin')['access_token']}"}
+        created = client.post("/api/users", json={"username": "bob", "password": "verification-only"}, headers=admin)
+        assert created.status_code == 200, created.text
+        bob_id = created.json()["id"]
+
+        # Rotation
+        first = login("bob")
+        r0 = first["refresh_token"]
+        rotated = refresh(client, r0)
+        expect(rotated.status_code == 200, "a live refresh token is accepted")
+        r1 = rotated.json()["refresh_token"]
+        expect(r1 != r0, "each refresh rotates the token")
+        me = client.get("/api/users/me", headers={"Authorization": f"Bearer {rotated.json()['access_token']}"})
+        expect(me.status_code == 200 and me.json()["username"] == "bob", "the new access token works")
+
+        # A concurrent refresh (another tab) within the grace period
+        expect(refresh(client, r0).status_code == 401, "a just-rotated token is refused")
+        again = refresh(client, r1)
+        expect(again.status_code == 200, "a refusal within the grace period leaves the family alive")
+        r2 = again.json()["refresh_token"]
+
+        other = login("bob")["refresh_token"]
+
+        # The same replay after the grace period is treated as theft
+        grace, auth_service.REFRESH_REUSE_GRACE = auth_service.REFRESH_REUSE_GRACE, timedelta(0)
+        try:
+            expect(refresh(client, r0).status_code == 401, "an old rotated token is refused")
+            expect(refresh(client, r2).status_code == 401, "reuse revokes the live token of the family")
+            expect("reused" in reasons(r2), "the family is recorded as revoked for reuse")
+            survivor = refresh(client, other)
+            expect(survivor.status_code == 200, "reuse leaves other logins alone")
+            other = survivor.json()["refresh_token"]
+
+            # Expiry is not reuse, even with no grace at all
+            expiring = login("bob")["refresh_token"]
+            with engine.begin() as conn:
+                conn.exec_driver_sql(
+                    "UPDATE refresh_tokens SET expires_at = ? WHERE token_hash = ?",
+                    (datetime.utcnow() - timedelta(minutes=1), hash_refresh_token(expiring))
+                )
+            expect(refresh(client, expiring).status_code == 401, "an expired token is refused")
+            expect(refresh(client, expiring).status_code == 401, "an expired token stays refused")
+            expect(reasons(expiring) == {"expired"}, "an expired token is revoked as expired, not as reused")
+        finally:
+            auth_service.REFRESH_REUSE_GRACE = grace
+
+        # Logout
+        leaving = refresh(client, login("bob")["refresh_token"]).json()["refresh_token"]
+        expect(client.post("/api/auth/logout", json={"refresh_token": leaving}).status_code == 200, "logout succeeds")
+        expect(refresh(client, leaving).status_code == 401, "a signed-out token is refused")
+        expect(reasons(leaving) == {"rotated", "logout"}, "logout revokes the whole family")
+        expect(
+            client.post("/api/auth/logout", json={"refresh_token": "not-a-token"}).status_code == 200,
+            "logout with an unknown token is harmless"
+        )
+
+        # Deactivation
+        expect(client.delete(f"/api/users/{bob_id}", headers=admin).status_code == 200, "bob is deactivated")
+        expect(refresh(client, other).status_code == 401, "a deactivated user's token is refused")
+        expect(reasons(other) == {"rotated", "deactivated"}, "deactivation revokes the user's tokens")
+
+        expect(refresh(client, "not-a-token").status_code == 401, "an unknown token is refused")
+
+        with engine.connect() as conn:
+            stored = {row[0] for row in conn.exec_driver_sql(
+                "SELECT token_hash FROM refresh_tokens UNION SELECT token_hash FROM refresh_token_revocations"
+            )}
+        issued = [r0, r1, r2, other, leaving]
+        expect(not stored & set(issued + [expiring]), "no raw token is stored")
+        expect({hash_refresh_token(token) for token in issued} <= stored, "tokens are stored by SHA-256 digest")
+        expect(hash_refresh_token(expiring) not in stored, "the next login prunes revocations of expired tokens")
+
+    engine.dispose()
+    os.remove(DB_PATH)
+    shutil.rmtree(SPOOL_DIR)
+    print("refresh tokens: all checks passed")
+
+
+if __name__ == "__main__":
+    main()
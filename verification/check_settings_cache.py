@@ -0,0 +1,112 @@
+"""
+Behavioral check for the process-wide system settings cache.
+
+Asserts outcomes rather than timings: reads within the revalidation window
+issue no SQL; callers get copies they cannot corrupt the cache through; a
+committed update is visible at once in this process, a rolled-back one never;
+and a change committed by another process (a bumped version) is picked up at
+the next revalidation, which otherwise costs one single-column SELECT.
+Exits non-zero on the first failure.
+"""
+import sys
+import os
+import tempfile
+import time
+
+# Add backend to path
+sys.path.append(os.getcwd())
+
+# Settings are loaded at import time; point them at a scratch database
+if __name__ == "__main__":
+    fd, DB_PATH = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    os.environ["SANDESH_NAMESPACE"] = "local"
+    os.environ["SANDESH_ADMIN_USER"] = "admin"
+    os.environ["SANDESH_ADMIN_PASSWORD"] = "verification-only"
+    os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+    os.environ["SANDESH_SETTINGS_CACHE_SECONDS"] = "0.2"
+
+from sqlalchemy import event
+from backend.infrastructure.db.session import engine, SessionLocal, Base
+from backend.infrastructure.db import models  # noqa: F401 (registers the tables)
+from backend.infrastructure.db.migrations import run_migrations
+from backend.infrastructure.db.repositories import SystemSettingsRepository
+from backend.infrastructure.db.settings_cache import settings_cache
+
+statements = []
+
+
+def expect(condition: bool, what: str):
+    if not condition:
+        raise AssertionError(what)
+    print(f"ok  {what}")
+
+
+def read():
+    """Settings as a fresh request would read them; returns (settings, SQL issued)."""
+    statements.clear()
+    with SessionLocal() as session:
+        current = SystemSettingsRepository(session).get()
+    return current, list(statements)
+
+
+def wait_out_window():
+    time.sleep(settings_cache.revalidate_seconds + 0.05)
+
+
+def main():
+    Base.metadata.create_all(engine)
+    run_migrations(engine)
+    with SessionLocal() as session:
+        SystemSettingsRepository(session).get()  # Creates the singleton row
+        session.commit()
+
+    event.listen(engine, "before_cursor_execute", lambda conn, cursor, sql, *args: statements.append(sql))
+
+    first, sql = read()
+    expect(first.mail_namespace == "local" and len(sql) == 1, "a cold read loads the row")
+    cached, sql = read()
+    expect(cached.mail_namespace == "local" and sql == [], "a read within the window issues no SQL")
+
+    cached.mail_namespace = "tampered"
+    expect(read()[0].mail_namespace == "local", "callers get copies, not the cached entity")
+
+    wait_out_window()
+    current, sql = read()
+    expect(
+        current.mail_namespace == "local" and len(sql) == 1 and "version" in sql[0] and "mail_namespace" not in sql[0],
+        "an unchanged version revalidates with one single-column SELECT"
+    )
+
+    with SessionLocal() as session:
+        repo = SystemSettingsRepository(session)
+        changed = repo.get()
+        changed.mail_namespace = "rolledback"
+        repo.update(changed)
+        session.rollback()
+    expect(read()[0].mail_namespace == "local", "a rolled-back update leaves the cache alone")
+
+    with SessionLocal() as session:
+        repo = SystemSettingsRepository(session)
+        changed = repo.get()
+        changed.mail_namespace = "office"
+        repo.update(changed)
+        session.commit()
+    expect(read()[0].mail_namespace == "office", "a committed update is visible at once in this process")
+
+    # Another worker process commits a change: only the version tells us
+    with engine.begin() as conn:
+        conn.exec_driver_sql("UPDATE system_settings SET mail_namespace = 'remote', version = version + 1")
+    expect(read()[0].mail_namespace == "office", "another process's change may lag within the window")
+    wait_out_window()
+    expect(read()[0].mail_namespace == "remote", "another process's change is seen at the next revalidation")
+
+    engine.dispose()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(DB_PATH + suffix):
+            os.remove(DB_PATH + suffix)
+    print("settings cache: all checks passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Behavioral check for precompressed static asset serving (backend/api/static_assets.py)
+through the application's own routes and GZipMiddleware.
+
+Asserts outcomes rather than timings: hashed bundles are cached as immutable
+and index.html is revalidated; the negotiated encoding honours q-values and
+decodes back to the file byte for byte, never compressed twice; fresh `.br` /
+`.gz` siblings are served as-is and stale ones ignored; every encoding shares
+one ETag and a match answers 304; files outside the build are not reachable;
+and `precompress` writes siblings once. Exits non-zero on the first failure.
+"""
+import sys
+import os
+import gzip
+import shutil
+import tempfile
+
+# Add backend to path
+sys.path.append(os.getcwd())
+
+ASSET = "assets/index-BX3k9aQ2.js"
+STYLE = "assets/index-Cq8Zr1Lm.css"
+PLAIN = "assets/logo.svg"
+
+# main.py serves `static/` relative to the working directory, found at import time
+if __name__ == "__main__":
+    fd, DB_PATH = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    os.environ["SANDESH_NAMESPACE"] = "local"
+    os.environ["SANDESH_ADMIN_USER"] = "admin"
+    os.environ["SANDESH_ADMIN_PASSWORD"] = "verification-only"
+    os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+
+    WORKDIR = tempfile.mkdtemp(prefix="sandesh-static-")
+    STATIC = os.path.join(WORKDIR, "static")
+    os.makedirs(os.path.join(STATIC, "assets"))
+    FILES = {
+        "index.html": b"<!doctype html><html><head><title>Sandesh</title></head><body>" + b" " * 800 + b"</body></html>",
+        ASSET: b"".join(b"export const v%d = %d;\n" % (i, i * 7) for i in range(2000)),
+        STYLE: b"".join(b".c%d{margin:%dpx}\n" % (i, i % 16) for i in range(1000)),
+        PLAIN: b"<svg xmlns='http://www.w3.org/2000/svg'/>",
+    }
+    for rel, data in FILES.items():
+        with open(os.path.join(STATIC, rel), "wb") as f:
+            f.write(data)
+    # Prebuilt brotli variant (brotli itself may not be installed) and a stale gzip one
+    with open(os.path.join(STATIC, ASSET + ".br"), "wb") as f:
+        f.write(b"prebuilt-br")
+    with open(os.path.join(STATIC, STYLE + ".gz"), "wb") as f:
+        f.write(b"stale-gz")
+    os.utime(os.path.join(STATIC, STYLE + ".gz"), (0, 0))
+    with open(os.path.join(WORKDIR, "secret.txt"), "w") as f:
+        f.write("outside the build")
+    os.chdir(WORKDIR)
+
+from fastapi.testclient import TestClient
+from backend.main import app, static_assets
+from backend.api.static_assets import IMMUTABLE, REVALIDATE, precompress
+
+
+def expect(condition: bool, what: str):
+    if not condition:
+        raise AssertionError(what)
+    print(f"ok  {what}")
+
+
+def raw(client, url: str, accept_encoding: str = "identity", **headers):
+    """The response and its body as sent (httpx would otherwise decode gzip)."""
+    with client.stream("GET", url, headers={"Accept-Encoding": accept_encoding, **headers}) as response:
+        return response, b"".join(response.iter_raw())
+
+
+def main():
+    client = TestClient(app)
+
+    response, body = raw(client, f"/{ASSET}", "gzip, br")
+    expect(response.headers["cache-control"] == IMMUTABLE, "hashed bundles are cached as immutable")
+    expect(response.headers.get("content-encoding") == "br" and body == b"prebuilt-br", "a fresh .br sibling is served as-is")
+    expect("Accept-Encoding" in response.headers.get("vary", ""), "negotiated responses vary on Accept-Encoding")
+
+    response, body = raw(client, f"/{ASSET}", "gzip, br;q=0.5")
+    expect(
+        response.headers.get("content-encoding") == "gzip" and gzip.decompress(body) == FILES[ASSET],
+        "q-values are honoured and gzip decodes to the file, compressed once"
+    )
+    # Not "gzip;q=0": GZipMiddleware only looks for the substring and would compress anyway
+    response, body = raw(client, f"/{ASSET}", "deflate, br;q=0")
+    expect("content-encoding" not in response.headers and body == FILES[ASSET], "refused encodings fall back to identity")
+    response, body = raw(client, f"/{ASSET}", "*")
+    expect(response.headers.get("content-encoding") == "br", "a wildcard accepts the preferred encoding")
+
+    response, body = raw(client, f"/{STYLE}", "gzip")
+    expect(gzip.decompress(body) == FILES[STYLE], "a stale .gz sibling is ignored")
+
+    response, body = raw(client, "/inbox", "gzip")
+    expect(response.headers["cache-control"] == REVALIDATE, "index.html is revalidated on use")
+    expect(gzip.decompress(body) == FILES["index.html"], "SPA routes are answered with index.html")
+
+    response, body = raw(client, f"/{PLAIN}")
+    expect(response.headers["cache-control"] == REVALIDATE, "unhashed files under assets/ are not immutable")
+    expect(set(static_assets.get(PLAIN).variants) == {"identity"}, "small files are not precompressed")
+
+    etags = {raw(client, f"/{ASSET}", encoding)[0].headers["etag"] for encoding in ("identity", "gzip", "br")}
+    expect(len(etags) == 1, "every encoding of a file shares one ETag")
+    etag = etags.pop()
+    for header in (etag, "*", f'"other", {etag}'):
+        response, body = raw(client, f"/{ASSET}", "gzip", **{"If-None-Match": header})
+        expect(response.status_code == 304 and body == b"", f"If-None-Match {header!r} answers 304 with no body")
+    expect(raw(client, f"/{ASSET}", "gzip", **{"If-None-Match": '"other"'})[0].status_code == 200, "a stale ETag gets the file")
+
+    head = client.head(f"/{ASSET}")
+    expect(head.status_code == 200 and head.content == b"", "HEAD on a bundle answers without a body")
+
+    for url in ("/assets/missing-AAAAAAAA.js", f"/{ASSET}.br", "/assets/..%2f..%2fsecret.txt", "/assets/%2e%2e/%2e%2e/secret.txt"):
+        expect(client.get(url).status_code == 404, f"{url} is not served")
+
+    build = os.path.join(WORKDIR, "precompress")
+    shutil.copytree(STATIC, build)
+    for name in os.listdir(os.path.join(build, "assets")):
+        if name.endswith((".gz", ".br")):
+            os.remove(os.path.join(build, "assets", name))
+    written = precompress(build)
+    expect(written >= 3 and os.path.exists(os.path.join(build, ASSET + ".gz")), "precompress writes siblings")
+    expect(not os.path.exists(os.path.join(build, PLAIN + ".gz")), "precompress skips files too small to gain")
+    expect(precompress(build) == 0, "a second precompress run writes nothing")
+    with open(os.path.join(build, ASSET + ".gz"), "rb") as f:
+        expect(gzip.decompress(f.read()) == FILES[ASSET], "a written sibling decodes to its source")
+
+    os.chdir("/")
+    shutil.rmtree(WORKDIR)
+    os.remove(DB_PATH)
+    print("static assets: all checks passed")
+
+
+if __name__ == "__main__":
+    main()
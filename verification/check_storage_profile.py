@@ -0,0 +1,102 @@
+"""
+Behavioral check for the SQLite storage profile and connection pool.
+
+Asserts outcomes rather than timings: every pooled connection, not just the
+first, carries the configured PRAGMAs (including values overridden through
+SANDESH_* variables); WAL lets a reader see the last commit while a writer
+holds an open transaction; the pool stops at pool_size + max_overflow; and an
+invalid profile is refused before any PRAGMA is interpolated. Exits non-zero
+on the first failure.
+"""
+import sys
+import os
+import tempfile
+
+# Add backend to path
+sys.path.append(os.getcwd())
+
+# Settings are loaded at import time; point them at a scratch database
+if __name__ == "__main__":
+    fd, DB_PATH = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    os.environ["SANDESH_NAMESPACE"] = "local"
+    os.environ["SANDESH_ADMIN_USER"] = "admin"
+    os.environ["SANDESH_ADMIN_PASSWORD"] = "verification-only"
+    os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+    os.environ["SANDESH_SQLITE_CACHE_SIZE_KB"] = "4096"
+    os.environ["SANDESH_SQLITE_BUSY_TIMEOUT_MS"] = "1500"
+    os.environ["SANDESH_DB_POOL_SIZE"] = "2"
+    os.environ["SANDESH_DB_POOL_MAX_OVERFLOW"] = "1"
+    os.environ["SANDESH_DB_POOL_TIMEOUT"] = "1"
+
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+from backend.infrastructure.db.session import engine
+from backend.infrastructure.db.storage_profile import StorageProfile
+
+EXPECTED = {
+    "journal_mode": "wal",
+    "synchronous": 1,  # NORMAL
+    "cache_size": -4096,
+    "mmap_size": 268435456,
+    "temp_store": 2,  # MEMORY
+    "busy_timeout": 1500,
+}
+
+
+def expect(condition: bool, what: str):
+    if not condition:
+        raise AssertionError(what)
+    print(f"ok  {what}")
+
+
+def pragmas(conn) -> dict:
+    return {name: conn.exec_driver_sql(f"PRAGMA {name}").scalar() for name in EXPECTED}
+
+
+def main():
+    # Hold every connection the pool may hand out at once
+    connections = [engine.connect() for _ in range(3)]
+    expect(
+        all(pragmas(conn) == EXPECTED for conn in connections),
+        "every pooled connection carries the profile, with SANDESH_* overrides"
+    )
+    try:
+        engine.connect()
+    except PoolTimeout:
+        expect(True, "the pool stops at pool_size + max_overflow")
+    else:
+        raise AssertionError("the pool stops at pool_size + max_overflow")
+
+    writer, reader = connections[0], connections[1]
+    writer.exec_driver_sql("CREATE TABLE t (v INTEGER)")
+    writer.exec_driver_sql("INSERT INTO t VALUES (1)")
+    writer.commit()
+    writer.exec_driver_sql("INSERT INTO t VALUES (2)")  # Left open: holds the write lock
+    expect(
+        reader.exec_driver_sql("SELECT count(*) FROM t").scalar() == 1,
+        "a reader sees the last commit while a write transaction is open"
+    )
+    writer.rollback()
+
+    for conn in connections:
+        conn.close()
+    with engine.connect() as conn:
+        expect(pragmas(conn) == EXPECTED, "a connection returned to the pool keeps the profile")
+
+    for bad in ({"journal_mode": "WAL; DROP TABLE t"}, {"synchronous": "SOMETIMES"}, {"temp_store": "DISK"}):
+        try:
+            StorageProfile(**bad)
+        except ValueError:
+            expect(True, f"an invalid {next(iter(bad))} is refused")
+        else:
+            raise AssertionError(f"an invalid {next(iter(bad))} is refused")
+
+    engine.dispose()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(DB_PATH + suffix):
+            os.remove(DB_PATH + suffix)
+    print("storage profile: all checks passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Behavioral check for the single-writer queue's batch-failure replay.
+
+Asserts outcomes rather than timings: when one job in a group-committed batch
+raises, its batch-mates still commit and get their own results, the failing
+job gets its own exception and none of its writes survive, a job that only
+fails once its batch-mates are committed (a unique conflict) fails alone, and
+inline mode (no writer thread) rolls a failing job back. Exits non-zero on
+the first failure.
+"""
+import sys
+import os
+import tempfile
+import threading
+from collections import Counter
+from typing import Optional
+
+# Add backend to path
+sys.path.append(os.getcwd())
+
+# Settings are loaded at import time; point them at a scratch database
+if __name__ == "__main__":
+    fd, DB_PATH = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    os.environ["SANDESH_NAMESPACE"] = "local"
+    os.environ["SANDESH_ADMIN_USER"] = "admin"
+    os.environ["SANDESH_ADMIN_PASSWORD"] = "verification-only"
+    os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+from backend.infrastructure.db.session import engine, SessionLocal, Base
+from backend.infrastructure.db import models  # noqa: F401 (registers the tables)
+from backend.infrastructure.db.migrations import run_migrations
+from backend.infrastructure.db.writer import WriteQueue
+
+calls: Counter = Counter()
+
+
+class Boom(Exception):
+    pass
+
+
+def expect(condition: bool, what: str):
+    if not condition:
+        raise AssertionError(what)
+    print(f"ok  {what}")
+
+
+def add_user(name: str, fail: bool = False, label: Optional[str] = None):
+    """A write job inserting one user; optionally raises after writing."""
+    def job(session):
+        calls[label or name] += 1
+        session.execute(
+            text("INSERT INTO users (username, password_hash, is_admin, is_active, version) VALUES (:u, 'x', 0, 1, 1)"),
+            {"u": name}
+        )
+        session.flush()
+        if fail:
+            raise Boom(name)
+        return name.upper()
+    return job
+
+
+def usernames() -> set:
+    with engine.connect() as conn:
+        return {row[0] for row in conn.exec_driver_sql("SELECT username FROM users")}
+
+
+def main():
+    Base.metadata.create_all(engine)
+    run_migrations(engine)
+
+    writer = WriteQueue(SessionLocal, max_batch=64)
+    writer.start()
+
+    # Hold the writer inside a job so the next ones queue up and batch together
+    entered, release = threading.Event(), threading.Event()
+
+    def gate(session):
+        entered.set()
+        release.wait(10)
+        return "gate"
+
+    gate_future = writer.submit(gate)
+    entered.wait(10)
+    futures = {
+        "alice": writer.submit(add_user("alice")),
+        "bob": writer.submit(add_user("bob", fail=True)),
+        "carol": writer.submit(add_user("carol")),
+        "alice_again": writer.submit(add_user("alice", label="alice_again")),
+    }
+    release.set()
+
+    expect(gate_future.result(10) == "gate", "the gate job commits on its own")
+    expect(futures["alice"].result(10) == "ALICE", "a job before the failure still returns its result")
+    expect(futures["carol"].result(10) == "CAROL", "a job after the failure still returns its result")
+
+    error = futures["bob"].exception(10)
+    expect(isinstance(error, Boom) and str(error) == "bob", "the failing job gets its own exception")
+
+    conflict = futures["alice_again"].exception(10)
+    expect(isinstance(conflict, IntegrityError), "a job conflicting with a committed batch-mate fails alone")
+
+    expect(usernames() == {"alice", "carol"}, "only the good jobs' writes are committed")
+    expect(calls["alice"] == 2, "the batch was rolled back and replayed job by job")
+    expect(calls["carol"] == 1, "jobs after the failure run once, in the replay")
+    expect(calls["bob"] == 2, "the failing job is retried once, alone")
+    expect(calls["alice_again"] == 1, "the conflicting job only fails once alice is committed")
+
+    # A failing batch must not poison the writer's connection for the next one
+    expect(writer.run(add_user("dave")) == "DAVE", "the writer keeps committing after a failed batch")
+    writer.stop()
+
+    # Without a writer thread, jobs run inline in their own transaction
+    inline = WriteQueue(SessionLocal)
+    expect(inline.run(add_user("erin")) == "ERIN", "inline mode commits a good job")
+    try:
+        inline.run(add_user("frank", fail=True))
+    except Boom:
+        pass
+    else:
+        raise AssertionError("inline mode raises the job's exception")
+    expect(usernames() == {"alice", "carol", "dave", "erin"}, "inline mode rolls a failing job back")
+
+    engine.dispose()
+    os.remove(DB_PATH)
+    print("writer replay: all checks passed")
+
+
+if __name__ == "__main__":
+    main()